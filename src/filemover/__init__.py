@@ -1,2 +1,3 @@
 from .mover import Mover
-__all__ = ["Mover"]
\ No newline at end of file
+from .mover_group import MoverGroup
+__all__ = ["Mover", "MoverGroup"]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from json.decoder import JSONDecodeError
+import threading
+import hashlib
+import json
+import os
+
+CACHE_SCHEMA_VERSION = 1
+DEFAULT_MAX_ENTRIES = 100_000
+HASH_CHUNK_SIZE = 1024 * 1024
+# 128-bit BLAKE2b digests are plenty to tell files apart and keep the cache small
+HASH_DIGEST_SIZE = 16
+
+class ContentCompareConfig:
+    def __init__(self, **kwargs) -> None:
+        self._enabled = kwargs.get('enabled', False)
+        self._cache_file = kwargs.get('cache_file', None)
+        self._max_entries = kwargs.get('max_entries', DEFAULT_MAX_ENTRIES)
+
+        if not isinstance(self._enabled, bool):
+            raise TypeError("Enabled must be a boolean value")
+        if self._cache_file is not None and not isinstance(self._cache_file, str):
+            raise TypeError("Cache file must be a string")
+        if self._cache_file:
+            self._cache_file = os.path.expandvars(self._cache_file)
+        if not isinstance(self._max_entries, int) or isinstance(self._max_entries, bool) or self._max_entries < 1:
+            raise ValueError("Max entries must be a positive integer")
+
+    def __repr__(self):
+        return f"ContentCompareConfig(enabled={self._enabled}, cache_file='{self._cache_file}', max_entries={self._max_entries})"
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+    @property
+    def cache_file(self) -> str | None:
+        return self._cache_file
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+def hash_file(path: str) -> str:
+    """
+    Return the hex BLAKE2b digest of a file's contents
+    """
+    digest = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+class HashCache:
+    """
+    A persistent cache of file content hashes keyed by device and inode. An entry is only used while the file's size and
+    mtime match the ones it was hashed with, so repeated runs never rehash a file that hasn't changed. The least recently
+    used entries are dropped once there are more than max_entries
+    """
+    def __init__(self, file_path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._file_path = file_path
+        self._max_entries = max_entries
+        # "<st_dev>:<st_ino>" -> [st_size, st_mtime_ns, digest], least recently used first
+        self._entries: dict[str, list] = {}
+        self._changed = False
+        # Entries hashed since the last save or pop_new_entries call
+        self._new_entries: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __repr__(self):
+        return f"HashCache(file_path='{self._file_path}', entries={len(self._entries)})"
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    def _load(self):
+        data = None
+        try:
+            with open(self._file_path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, JSONDecodeError):
+            pass
+        if not data or data.get("_version") != CACHE_SCHEMA_VERSION:
+            return
+        self._entries = data.get("entries", {})
+
+    def save(self):
+        """
+        Write the cache to disk if anything was hashed since it was loaded
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            while len(self._entries) > self._max_entries:
+                del self._entries[next(iter(self._entries))]
+            data = {"_version": CACHE_SCHEMA_VERSION, "entries": self._entries}
+            self._changed = False
+            self._new_entries = {}
+        temp_path = f"{self._file_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, self._file_path)
+
+    def get_hash(self, path: str, file_stat: os.stat_result) -> str:
+        """
+        Return the hash of a file's contents, from the cache if the file hasn't changed since it was last hashed\n
+        ---\n
+        Keyword arguments:\n
+        path -- the path of the file\n
+        file_stat -- an up to date stat of the file
+        """
+        key = f"{file_stat.st_dev}:{file_stat.st_ino}"
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[:2] == [file_stat.st_size, file_stat.st_mtime_ns]:
+                self._entries[key] = entry
+                return entry[2]
+        digest = hash_file(path)
+        with self._lock:
+            self._entries[key] = self._new_entries[key] = [file_stat.st_size, file_stat.st_mtime_ns, digest]
+            self._changed = True
+        return digest
+
+    def pop_new_entries(self) -> dict[str, list]:
+        """
+        Return the entries hashed since the last call (or since the cache was loaded or saved), so a cache that is never
+        saved itself (like a worker process's) can hand them to one that is (see merge)
+        """
+        with self._lock:
+            new_entries = self._new_entries
+            self._new_entries = {}
+        return new_entries
+
+    def merge(self, entries: dict[str, list]):
+        """
+        Add entries hashed by another cache of the same file, replacing any older ones for the same files\n
+        ---\n
+        Keyword arguments:\n
+        entries -- the entries to add, as returned by pop_new_entries
+        """
+        if not entries:
+            return
+        with self._lock:
+            for key, entry in entries.items():
+                self._entries.pop(key, None)
+                self._entries[key] = entry
+            self._changed = True
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import threading
+import sys
+import os
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+# Windows and macOS filesystems are case-insensitive by default, so names are compared casefolded there. On a
+# case-sensitive volume this only errs on the side of reporting a collision
+if sys.platform in ['win32', 'darwin']:
+    _normalize_name = str.casefold
+else:
+    _normalize_name = str
+
+class DestinationIndex:
+    """
+    A per-run index of the file names in each destination directory. Each directory is listed once (the first time a
+    path in it is checked) and then updated as files are written, so collision checks don't need a stat per file.
+    Directories with more than max_entries files aren't held in memory and fall back to checking each path with a stat
+    """
+    def __init__(self, max_entries: int | None = DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        # None means the directory is too large (or couldn't be listed) and is checked with stats instead
+        self._directories: dict[str, set[str] | None] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"DestinationIndex(max_entries={self._max_entries}, directories={len(self._directories)})"
+
+    @property
+    def max_entries(self) -> int | None:
+        return self._max_entries
+
+    def _list_directory(self, directory: str) -> set[str] | None:
+        names = set()
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    names.add(_normalize_name(entry.name))
+                    if self._max_entries and len(names) > self._max_entries:
+                        return None
+        except FileNotFoundError:
+            # The directory will be created by the first copy into it
+            return set()
+        except OSError:
+            return None
+        return names
+
+    def _get_names(self, directory: str) -> set[str] | None:
+        if directory not in self._directories:
+            with self._lock:
+                if directory not in self._directories:
+                    self._directories[directory] = self._list_directory(directory)
+        return self._directories[directory]
+
+    def exists(self, path: str) -> bool:
+        """
+        Return True if a file exists at the path (or has been added to the index during this run)
+        """
+        directory, name = os.path.split(path)
+        names = self._get_names(directory)
+        if names is None:
+            return os.path.exists(path)
+        return _normalize_name(name) in names
+
+    def add(self, path: str):
+        """
+        Record that a file has been (or is about to be) written to the path
+        """
+        directory, name = os.path.split(path)
+        names = self._get_names(directory)
+        if names is not None:
+            names.add(_normalize_name(name))
+
+    def discard(self, path: str):
+        """
+        Record that the file at the path has been removed (or was never written)
+        """
+        directory, name = os.path.split(path)
+        names = self._directories.get(directory)
+        if names is not None:
+            names.discard(_normalize_name(name))
+
+    def invalidate(self, directory: str):
+        """
+        Forget a directory's listing so it's listed again on the next check
+        """
+        with self._lock:
+            self._directories.pop(directory, None)
@@ -0,0 +1,455 @@
+from __future__ import annotations
+from filemover.scanner import ScannedFile
+from contextlib import ExitStack, contextmanager
+from enum import Enum
+from typing import Callable, Iterator
+import shutil
+import errno
+import uuid
+import time
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows. Reflinks are never attempted there
+    fcntl = None
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# From linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+# Errors that mean a copy primitive isn't supported for this pair of files (rather than a real I/O failure)
+UNSUPPORTED_COPY_ERRNOS = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOTTY, errno.EBADF, errno.ETXTBSY}
+# Errors from os.link when the filesystem doesn't support hardlinks (or the file has too many)
+UNSUPPORTED_LINK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOSYS, errno.EMLINK}
+# Atomic writes go to a hidden file with this suffix next to the destination, which is renamed over the destination once
+# it's complete
+TEMP_FILE_SUFFIX = '.filemover.tmp'
+# Temporary files that haven't changed for this long were left by a copy that never finished (e.g., the mover crashed)
+STALE_TEMP_FILE_SECONDS = 60 * 60
+
+class CopyBackendType(Enum):
+    AUTO = 'auto'
+    SHUTIL = 'shutil'
+    REFLINK = 'reflink'
+    COPY_FILE_RANGE = 'copy_file_range'
+    SENDFILE = 'sendfile'
+    CHUNKED = 'chunked'
+
+    @classmethod
+    def from_string(cls, position: str) -> 'CopyBackendType':
+        if position not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return CopyBackendType(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == CopyBackendType.AUTO:
+            return "Use the fastest copy the filesystem supports (reflink, then copy_file_range, then sendfile, then chunked)"
+        elif self == CopyBackendType.SHUTIL:
+            return "Copy files with Python's shutil.copyfile"
+        elif self == CopyBackendType.REFLINK:
+            return "Clone files with a reflink (copy-on-write) where supported, falling back to a chunked copy"
+        elif self == CopyBackendType.COPY_FILE_RANGE:
+            return "Copy files in the kernel with copy_file_range, falling back to a chunked copy"
+        elif self == CopyBackendType.SENDFILE:
+            return "Copy files in the kernel with sendfile, falling back to a chunked copy"
+        elif self == CopyBackendType.CHUNKED:
+            return "Copy files by reading and writing chunks in Python"
+        else:
+            return "UNKNOWN"
+
+class LinkMode(Enum):
+    COPY = 'copy'
+    HARDLINK = 'hardlink'
+    REFLINK = 'reflink'
+    AUTO = 'auto'
+
+    @classmethod
+    def from_string(cls, position: str) -> 'LinkMode':
+        if position not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return LinkMode(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == LinkMode.COPY:
+            return "Always copy file contents"
+        elif self == LinkMode.HARDLINK:
+            return "Hardlink destinations to the source on the same filesystem, falling back to a copy"
+        elif self == LinkMode.REFLINK:
+            return "Clone destinations with a reflink (copy-on-write) on the same filesystem, falling back to a copy"
+        elif self == LinkMode.AUTO:
+            return "Reflink where supported, then hardlink on the same filesystem, falling back to a copy"
+        else:
+            return "UNKNOWN"
+
+class FsyncMode(Enum):
+    NONE = 'none'
+    PER_FILE = 'per_file'
+    PER_RUN = 'per_run'
+
+    @classmethod
+    def from_string(cls, position: str) -> 'FsyncMode':
+        if position not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return FsyncMode(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == FsyncMode.NONE:
+            return "Leave flushing copies to disk to the operating system"
+        elif self == FsyncMode.PER_FILE:
+            return "Flush each copy and its directory to disk as soon as it's written"
+        elif self == FsyncMode.PER_RUN:
+            return "Flush each copy to disk as it's written, and each destination directory once at the end of the run"
+        else:
+            return "UNKNOWN"
+
+def fsync_file(path: str) -> None:
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def fsync_directory(path: str) -> None:
+    """
+    Flush a directory's entries (e.g., a file renamed into it) to disk. Does nothing on Windows, where directories can't
+    be opened (NTFS journals renames itself)
+    """
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class _UnsupportedCopy(Exception):
+    """
+    Raised by a copy strategy when its primitive can't be used. The offset is how far the strategy got, so the next
+    strategy can continue from there
+    """
+    def __init__(self, offset: int) -> None:
+        super().__init__(offset)
+        self.offset = offset
+
+def _reflink_data(source_fd: int, destination_fd: int, offset: int, chunk_size: int) -> None:
+    if fcntl is None or offset != 0:
+        raise _UnsupportedCopy(offset)
+    try:
+        fcntl.ioctl(destination_fd, FICLONE, source_fd)
+    except OSError as e:
+        if e.errno in UNSUPPORTED_COPY_ERRNOS:
+            raise _UnsupportedCopy(offset)
+        raise
+
+def _copy_file_range_data(source_fd: int, destination_fd: int, offset: int, chunk_size: int) -> None:
+    if not hasattr(os, 'copy_file_range'):
+        raise _UnsupportedCopy(offset)
+    while True:
+        try:
+            copied = os.copy_file_range(source_fd, destination_fd, chunk_size, offset, offset)
+        except OSError as e:
+            if e.errno in UNSUPPORTED_COPY_ERRNOS:
+                raise _UnsupportedCopy(offset)
+            raise
+        if copied == 0:
+            return
+        offset += copied
+
+def _sendfile_data(source_fd: int, destination_fd: int, offset: int, chunk_size: int) -> None:
+    if not hasattr(os, 'sendfile'):
+        raise _UnsupportedCopy(offset)
+    # sendfile writes at the destination's file position
+    os.lseek(destination_fd, offset, os.SEEK_SET)
+    while True:
+        try:
+            sent = os.sendfile(destination_fd, source_fd, offset, chunk_size)
+        except OSError as e:
+            if e.errno in UNSUPPORTED_COPY_ERRNOS:
+                raise _UnsupportedCopy(offset)
+            raise
+        if sent == 0:
+            return
+        offset += sent
+
+def _write_all(file, data: memoryview) -> None:
+    written = 0
+    while written < len(data):
+        written += file.write(data[written:])
+
+def _chunked_data(source_fd: int, destination_fd: int, offset: int, chunk_size: int) -> None:
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    os.lseek(source_fd, offset, os.SEEK_SET)
+    os.lseek(destination_fd, offset, os.SEEK_SET)
+    with open(source_fd, 'rb', buffering=0, closefd=False) as source_file, open(destination_fd, 'wb', buffering=0, closefd=False) as destination_file:
+        while True:
+            read = source_file.readinto(buffer)
+            if not read:
+                return
+            _write_all(destination_file, view[:read])
+
+CopyStrategy = Callable[[int, int, int, int], None]
+
+def copy_metadata(source: ScannedFile, destination_path: str) -> None:
+    """
+    Copy the permission bits, timestamps and extended attributes of a source file to a destination file (the same as
+    shutil.copystat), using the stat data cached from scanning instead of re-statting the source
+    """
+    source_stat = source.stat
+    os.utime(destination_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    if hasattr(os, 'listxattr'):
+        try:
+            for name in os.listxattr(source.path):
+                try:
+                    os.setxattr(destination_path, name, os.getxattr(source.path, name))
+                except OSError:
+                    pass
+        except OSError:
+            pass
+    try:
+        os.chmod(destination_path, source_stat.st_mode & 0o7777)
+    except NotImplementedError:
+        pass
+
+def copy_file(source: ScannedFile, destination_path: str) -> None:
+    """
+    Copy a scanned file's contents and metadata to the destination path (the same as shutil.copy2)\n
+    ---\n
+    Keyword arguments:\n
+    source -- the scanned source file. Its cached stat data is used so the source isn't re-statted\n
+    destination_path -- the full path to copy the file to
+    """
+    # shutil uses the cached stat of a DirEntry for its own source checks
+    shutil.copyfile(source.entry if source.entry is not None else source.path, destination_path)
+    copy_metadata(source, destination_path)
+
+def fan_out_copy(source: ScannedFile, destination_paths: list[str], chunk_size: int = DEFAULT_CHUNK_SIZE, fsync: bool = False) -> None:
+    """
+    Copy a scanned file to several destinations while only reading it once. Each chunk is read into a shared buffer and
+    written to every destination before the next chunk is read. If any write fails, every partially written destination
+    is removed\n
+    ---\n
+    Keyword arguments:\n
+    source -- the scanned source file\n
+    destination_paths -- the full paths to copy the file to\n
+    chunk_size -- the number of bytes read from the source at a time\n
+    fsync -- whether to flush each destination to disk before closing it
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    opened_paths = []
+    try:
+        with ExitStack() as stack:
+            source_file = stack.enter_context(open(source.path, 'rb', buffering=0))
+            destination_files = []
+            for path in destination_paths:
+                destination_files.append(stack.enter_context(open(path, 'wb', buffering=0)))
+                opened_paths.append(path)
+            while True:
+                read = source_file.readinto(buffer)
+                if not read:
+                    break
+                chunk = view[:read]
+                for destination_file in destination_files:
+                    _write_all(destination_file, chunk)
+            if fsync:
+                for destination_file in destination_files:
+                    os.fsync(destination_file.fileno())
+    except BaseException:
+        for path in opened_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+    for path in destination_paths:
+        copy_metadata(source, path)
+
+def remove_stale_temp_files(directory: str, max_age: float = STALE_TEMP_FILE_SECONDS) -> list[str]:
+    """
+    Remove the temporary files left in a directory by copies that never finished and return their paths. Files changed in
+    the last max_age seconds are kept, since another mover may still be writing them
+    """
+    removed = []
+    cutoff = time.time() - max_age
+    try:
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                if not (entry.name.startswith('.') and entry.name.endswith(TEMP_FILE_SUFFIX)):
+                    continue
+                try:
+                    # The change time moves with every write, unlike the modification time copied from the source
+                    if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_ctime < cutoff:
+                        os.remove(entry.path)
+                        removed.append(entry.path)
+                except FileNotFoundError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return removed
+
+class CopyBackend:
+    """
+    Copies file contents with an ordered list of copy strategies. When a strategy's primitive isn't supported (e.g.,
+    reflinks across filesystems) the next strategy continues from where it stopped, ending with a chunked copy.\n
+    With atomic writes, each copy is written to a temporary file in the destination directory and renamed over the
+    destination once it's complete, so the destination never holds a partial file
+    """
+    def __init__(self, backend_type: CopyBackendType = CopyBackendType.AUTO, chunk_size: int = DEFAULT_CHUNK_SIZE, atomic: bool = True, fsync: FsyncMode = FsyncMode.NONE) -> None:
+        self._backend_type = backend_type
+        self._chunk_size = chunk_size
+        self._atomic = atomic
+        self._fsync = fsync
+        # Devices reflinks have failed on, so they aren't tried (with a temporary file each) for every later copy
+        self._reflink_unsupported_devices: set[int] = set()
+        if backend_type == CopyBackendType.AUTO:
+            self._strategies: list[CopyStrategy] = [_reflink_data, _copy_file_range_data, _sendfile_data, _chunked_data]
+        elif backend_type == CopyBackendType.REFLINK:
+            self._strategies = [_reflink_data, _chunked_data]
+        elif backend_type == CopyBackendType.COPY_FILE_RANGE:
+            self._strategies = [_copy_file_range_data, _chunked_data]
+        elif backend_type == CopyBackendType.SENDFILE:
+            self._strategies = [_sendfile_data, _chunked_data]
+        else:
+            self._strategies = [_chunked_data]
+
+    def __repr__(self):
+        return f"CopyBackend(backend_type={self._backend_type}, chunk_size={self._chunk_size}, atomic={self._atomic}, fsync={self._fsync})"
+
+    @property
+    def backend_type(self) -> CopyBackendType:
+        return self._backend_type
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+    @property
+    def atomic(self) -> bool:
+        return self._atomic
+    @property
+    def fsync(self) -> FsyncMode:
+        return self._fsync
+
+    @contextmanager
+    def _open_destination(self, destination_path: str, atomic: bool | None = None) -> Iterator[str]:
+        """
+        Yield the path a copy to destination_path should be written to. With atomic writes this is a temporary file that
+        replaces the destination when the block finishes, or is removed if the block raises
+        """
+        if atomic is None:
+            atomic = self._atomic
+        if atomic:
+            directory, name = os.path.split(destination_path)
+            write_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}{TEMP_FILE_SUFFIX}")
+        else:
+            write_path = destination_path
+        try:
+            yield write_path
+            if atomic:
+                os.replace(write_path, destination_path)
+        except BaseException:
+            if atomic:
+                try:
+                    os.remove(write_path)
+                except OSError:
+                    pass
+            raise
+        if self._fsync == FsyncMode.PER_FILE:
+            fsync_directory(os.path.dirname(destination_path) or '.')
+
+    def _copy_data(self, source_path: str, destination_path: str, strategies: list[CopyStrategy]) -> None:
+        with open(source_path, 'rb', buffering=0) as source_file, open(destination_path, 'wb', buffering=0) as destination_file:
+            offset = 0
+            for strategy in strategies:
+                try:
+                    strategy(source_file.fileno(), destination_file.fileno(), offset, self._chunk_size)
+                    break
+                except _UnsupportedCopy as e:
+                    offset = e.offset
+            else:
+                raise OSError(errno.ENOTSUP, "No supported copy strategy", destination_path)
+            if self._fsync != FsyncMode.NONE:
+                os.fsync(destination_file.fileno())
+
+    def copy(self, source: ScannedFile, destination_path: str) -> None:
+        """
+        Copy a scanned file's contents and metadata to the destination path
+        """
+        with self._open_destination(destination_path) as write_path:
+            if self._backend_type == CopyBackendType.SHUTIL:
+                copy_file(source, write_path)
+                if self._fsync != FsyncMode.NONE:
+                    fsync_file(write_path)
+                return
+            self._copy_data(source.path, write_path, self._strategies)
+            copy_metadata(source, write_path)
+
+    def hardlink(self, source: ScannedFile, destination_path: str) -> bool:
+        """
+        Write the destination as a hardlink to the source (sharing its contents and metadata). Returns False if the
+        filesystem doesn't support hardlinks or the destination is on another filesystem
+        """
+        try:
+            if os.path.samestat(source.stat, os.stat(destination_path)):
+                # Already a hardlink of the source. Renaming another link over it would do nothing and leave the
+                # temporary link behind
+                return True
+        except FileNotFoundError:
+            pass
+        try:
+            # Links can't replace an existing file, so they always go through a temporary name
+            with self._open_destination(destination_path, atomic=True) as write_path:
+                os.link(source.path, write_path)
+        except OSError as e:
+            if e.errno in UNSUPPORTED_LINK_ERRNOS:
+                return False
+            raise
+        return True
+
+    def reflink(self, source: ScannedFile, destination_path: str) -> bool:
+        """
+        Write the destination as a reflink (copy-on-write clone) of the source. Returns False if the filesystem doesn't
+        support reflinks (or has failed to make one before) or the destination is on another filesystem
+        """
+        return self._try_reflink(source, destination_path)
+
+    def _try_reflink(self, source: ScannedFile, destination_path: str) -> bool:
+        device = os.stat(os.path.dirname(destination_path) or '.').st_dev
+        if device != source.stat.st_dev or device in self._reflink_unsupported_devices:
+            return False
+        try:
+            with self._open_destination(destination_path) as write_path:
+                self._copy_data(source.path, write_path, [_reflink_data])
+                copy_metadata(source, write_path)
+        except OSError as e:
+            if e.errno == errno.ENOTSUP:
+                self._reflink_unsupported_devices.add(device)
+                return False
+            raise
+        return True
+
+    def copy_to_many(self, source: ScannedFile, destination_paths: list[str]) -> None:
+        """
+        Copy a scanned file to several destinations. Reflinks are tried first where the backend allows them. The chunked
+        backends then read the source once for every remaining destination, while the kernel copy backends copy each
+        destination separately
+        """
+        if self._backend_type in [CopyBackendType.SHUTIL, CopyBackendType.COPY_FILE_RANGE, CopyBackendType.SENDFILE]:
+            for destination_path in destination_paths:
+                self.copy(source, destination_path)
+            return
+        remaining = destination_paths
+        if _reflink_data in self._strategies:
+            remaining = [path for path in destination_paths if not self._try_reflink(source, path)]
+        if len(remaining) == 1:
+            # Reflinking this destination already failed, so don't try it again
+            with self._open_destination(remaining[0]) as write_path:
+                self._copy_data(source.path, write_path, [strategy for strategy in self._strategies if strategy != _reflink_data])
+                copy_metadata(source, write_path)
+        elif len(remaining) > 1:
+            with ExitStack() as stack:
+                write_paths = [stack.enter_context(self._open_destination(path)) for path in remaining]
+                fan_out_copy(source, write_paths, self._chunk_size, fsync=self._fsync != FsyncMode.NONE)
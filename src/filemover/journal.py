@@ -0,0 +1,160 @@
+from __future__ import annotations
+from filemover.move_task import MoveTask
+from filemover.scanner import ScannedFile
+from json.decoder import JSONDecodeError
+import json
+import os
+
+DEFAULT_BATCH_SIZE = 256
+
+class JournalConfig:
+    def __init__(self, **kwargs) -> None:
+        self._enabled = kwargs.get('enabled', False)
+        self._journal_file = kwargs.get('journal_file', None)
+        self._batch_size = kwargs.get('batch_size', DEFAULT_BATCH_SIZE)
+        self._fsync = kwargs.get('fsync', False)
+
+        if not isinstance(self._enabled, bool):
+            raise TypeError("Enabled must be a boolean value")
+        if self._journal_file is not None and not isinstance(self._journal_file, str):
+            raise TypeError("Journal file must be a string")
+        if self._journal_file:
+            self._journal_file = os.path.expandvars(self._journal_file)
+        if not isinstance(self._batch_size, int) or isinstance(self._batch_size, bool) or self._batch_size < 1:
+            raise ValueError("Batch size must be a positive integer")
+        if not isinstance(self._fsync, bool):
+            raise TypeError("Fsync must be a boolean value")
+
+    def __repr__(self):
+        return f"JournalConfig(enabled={self._enabled}, journal_file='{self._journal_file}', batch_size={self._batch_size}, fsync={self._fsync})"
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+    @property
+    def journal_file(self) -> str | None:
+        return self._journal_file
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+    @property
+    def fsync(self) -> bool:
+        return self._fsync
+
+class RunJournal:
+    """
+    A write-ahead journal of the files a run is working on, so an interrupted run can be resumed.\n
+    A "begin" record (the source's size and mtime, destinations, collisions and whether the source is removed) is written
+    for a batch of tasks before any of them start, and a "done" record once each task has finished. Done records are
+    buffered and written with the next batch, since losing one only means the task is checked again on resume. When a run
+    finishes (even if some files failed), the journal is cut down to the files that were never finished, or deleted if
+    there aren't any
+    """
+    def __init__(self, file_path: str, batch_size: int = DEFAULT_BATCH_SIZE, fsync: bool = False) -> None:
+        self._file_path = file_path
+        self._batch_size = batch_size
+        self._fsync = fsync
+        # The state of each source file from an interrupted run
+        self._entries: dict[str, dict] = {}
+        self._pending: list[str] = []
+        # The begin record of each file this run started but hasn't finished
+        self._unfinished: dict[str, str] = {}
+        self._load()
+        self._file = open(file_path, "a")
+
+    def __repr__(self):
+        return f"RunJournal(file_path='{self._file_path}', entries={len(self._entries)})"
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+    @property
+    def is_resuming(self) -> bool:
+        return len(self._entries) > 0
+
+    def _load(self):
+        try:
+            with open(self._file_path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except JSONDecodeError:
+                        # The last line may have been cut off by the crash
+                        continue
+                    if record.get("op") == "begin":
+                        self._entries[record["source"]] = record
+                    elif record.get("op") == "done" and record.get("source") in self._entries:
+                        self._entries[record["source"]]["done"] = True
+        except FileNotFoundError:
+            pass
+
+    def get(self, source: ScannedFile) -> dict | None:
+        """
+        Return the journal record for a source file from an interrupted run, or None if there isn't one or the file has
+        changed since
+        """
+        record = self._entries.get(source.path)
+        if record is None or (record.get("size"), record.get("mtime_ns")) != (source.size, source.mtime_ns):
+            return None
+        return record
+
+    def _write(self, lines: list[str]):
+        self._file.write("".join(lines))
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+
+    def begin(self, tasks: list[MoveTask]):
+        """
+        Durably record that a batch of tasks is about to start (along with any buffered done records)
+        """
+        lines = self._pending
+        self._pending = []
+        for task in tasks:
+            line = json.dumps({
+                "op": "begin",
+                "source": task.source.path,
+                "size": task.source.size,
+                "mtime_ns": task.source.mtime_ns,
+                "destinations": task.destinations,
+                "collisions": task.collisions,
+                "remove_source": task.remove_source,
+            }, separators=(',', ':')) + "\n"
+            self._unfinished[task.source.path] = line
+            lines.append(line)
+        self._write(lines)
+
+    def done(self, task: MoveTask):
+        self._unfinished.pop(task.source.path, None)
+        self._pending.append(json.dumps({"op": "done", "source": task.source.path}, separators=(',', ':')) + "\n")
+        if len(self._pending) >= self._batch_size:
+            self._write(self._pending)
+            self._pending = []
+
+    def close(self, interrupted: bool):
+        """
+        Close the journal. An interrupted run's journal is kept as is so the next run can resume it. Otherwise only the
+        begin records of files that failed are kept (so the next run redoes them), and the journal is deleted if every file
+        was finished
+        """
+        if self._file.closed:
+            return
+        if self._pending:
+            self._write(self._pending)
+            self._pending = []
+        self._file.close()
+        if interrupted:
+            return
+        if not self._unfinished:
+            os.remove(self._file_path)
+            return
+        temp_path = f"{self._file_path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write("".join(self._unfinished.values()))
+            if self._fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, self._file_path)
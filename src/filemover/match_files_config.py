@@ -1,10 +1,78 @@
+from __future__ import annotations
 from enum import Enum
+from datetime import datetime
+from typing import Callable, TYPE_CHECKING
+from operator import attrgetter
+import time
 import os
 import re
 
+if TYPE_CHECKING:
+    from filemover.scanner import ScannedFile
+
+# A compiled rule predicate. Called with the file name without its extension, the same name lowercased (only
+# computed when a rule needs it) and the extension without the leading dot
+RulePredicate = Callable[[str, str, str], bool]
+# A compiled file size or time rule predicate. Called with the file's stat result
+StatPredicate = Callable[[os.stat_result], bool]
+
+# Relative cost of evaluating each kind of compiled rule. Cheaper rules are evaluated first so AND/OR can short-circuit
+# before reaching the expensive ones
+EXACT_RULE_COST = 0
+SUBSTRING_RULE_COST = 1
+REGEX_RULE_COST = 2
+# Size and time rules need the file's stat, which is a syscall unless the scan already has it, so they're always last
+STAT_RULE_COST = 3
+
+SIZE_UNITS = {
+    'b': 1,
+    'kb': 1000, 'mb': 1000 ** 2, 'gb': 1000 ** 3, 'tb': 1000 ** 4,
+    'kib': 1024, 'mib': 1024 ** 2, 'gib': 1024 ** 3, 'tib': 1024 ** 4,
+}
+SIZE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*$', re.IGNORECASE)
+AGE_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60, 'w': 7 * 24 * 60 * 60}
+AGE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*$', re.IGNORECASE)
+
+def parse_size(value: int | str) -> int:
+    """
+    Parse a file size in bytes, either as a number or a string with a unit (e.g., "10MB" or "1.5 GiB")
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        if value < 0:
+            raise ValueError(f"File size must not be negative: {value}")
+        return value
+    if isinstance(value, str):
+        match = SIZE_PATTERN.match(value)
+        if match and match.group(2).lower() in SIZE_UNITS:
+            return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+        if match and not match.group(2):
+            return int(float(match.group(1)))
+    raise ValueError(f"Invalid file size: {value}. Must be a number of bytes or a size with a unit (e.g., \"10MB\" or \"1.5GiB\")")
+
+def parse_time(value: int | float | str) -> tuple[float, bool]:
+    """
+    Parse a file time rule value. Returns the value in seconds and whether it's relative (an age, as a number of seconds
+    or a duration like "12h" or "7d") rather than absolute (an ISO 8601 date or date and time, e.g., "2024-01-31")
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value < 0:
+            raise ValueError(f"File age must not be negative: {value}")
+        return float(value), True
+    if isinstance(value, str):
+        match = AGE_PATTERN.match(value)
+        if match:
+            return float(match.group(1)) * AGE_UNITS[match.group(2).lower()], True
+        try:
+            return datetime.fromisoformat(value.strip()).timestamp(), False
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid file time: {value}. Must be an age in seconds, a duration (e.g., \"12h\" or \"7d\") or an ISO 8601 date (e.g., \"2024-01-31\")")
+
 class FileMatchType(Enum):
     FILE_TYPE = "file_type"
     FILE_NAME = "file_name"
+    FILE_SIZE = "file_size"
+    FILE_TIME = "file_time"
 
     @classmethod
     def from_string(cls, position: str) -> 'FileMatchType':
@@ -18,6 +86,10 @@ class FileMatchType(Enum):
             return "Match file types/extensions"
         elif self == FileMatchType.FILE_NAME:
             return "Match file names"
+        elif self == FileMatchType.FILE_SIZE:
+            return "Match file sizes"
+        elif self == FileMatchType.FILE_TIME:
+            return "Match file modification or change times"
         else:
             return "UNKNOWN"
 
@@ -80,6 +152,63 @@ class FileNameMatchMode(Enum):
         else:
             return "UNKNOWN"
 
+class FileSizeMatchMode(Enum):
+    MIN = "min"
+    MAX = "max"
+
+    @classmethod
+    def from_string(cls, position: str) -> 'FileSizeMatchMode':
+        if position.lower() not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return FileSizeMatchMode(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == FileSizeMatchMode.MIN:
+            return "Match files at least a specific size"
+        elif self == FileSizeMatchMode.MAX:
+            return "Match files at most a specific size"
+        else:
+            return "UNKNOWN"
+
+class FileTimeMatchMode(Enum):
+    OLDER_THAN = "older_than"
+    NEWER_THAN = "newer_than"
+
+    @classmethod
+    def from_string(cls, position: str) -> 'FileTimeMatchMode':
+        if position.lower() not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return FileTimeMatchMode(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == FileTimeMatchMode.OLDER_THAN:
+            return "Match files older than an age or from before a date"
+        elif self == FileTimeMatchMode.NEWER_THAN:
+            return "Match files newer than an age or from after a date"
+        else:
+            return "UNKNOWN"
+
+class FileTimeAttribute(Enum):
+    MTIME = "mtime"
+    CTIME = "ctime"
+
+    @classmethod
+    def from_string(cls, position: str) -> 'FileTimeAttribute':
+        if position.lower() not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return FileTimeAttribute(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == FileTimeAttribute.MTIME:
+            return "The time the file's contents were last modified"
+        elif self == FileTimeAttribute.CTIME:
+            return "The time the file was created on Windows, or its metadata last changed elsewhere"
+        else:
+            return "UNKNOWN"
+
 class FileMatchRuleOperator(Enum):
     AND = "and"
     OR = "or"
@@ -117,11 +246,24 @@ class FileMatchRule:
         elif self.type == FileMatchType.FILE_NAME:
             self.mode = FileNameMatchMode.from_string(mode)
             self.case_sensitive = kwargs.get("case_sensitive", True)
+        elif self.type == FileMatchType.FILE_SIZE:
+            self.mode = FileSizeMatchMode.from_string(mode)
+        elif self.type == FileMatchType.FILE_TIME:
+            self.mode = FileTimeMatchMode.from_string(mode)
+            self.time_attribute = FileTimeAttribute.from_string(kwargs.get("time_attribute", FileTimeAttribute.MTIME.value))
         else:
             raise ValueError("Invalid File Match Rule type")
 
         value = kwargs.get("value")
-        if not value:
+        if self.needs_stat:
+            # 0 is a valid size or age, so only a missing value is an error. Parse now so bad values fail early
+            if value is None:
+                raise ValueError("Missing parameter ""value"" from File Match rule")
+            if self.type == FileMatchType.FILE_SIZE:
+                parse_size(value)
+            else:
+                parse_time(value)
+        elif not value:
             raise ValueError("Missing parameter ""value"" from File Match rule")
         
         if not isinstance(value, str) \
@@ -138,87 +280,212 @@ class FileMatchRule:
             raise ValueError("Invalid \"value\" type for specified \"mode\". A list type matching mode was specified, but the specified \"value\" is not a list")
 
         self.value = value
-        
-    
-    def matches_filename(self, filename: str) -> bool:
-        name, extension = os.path.splitext(filename)
-        extension = extension[1:]
+        self._compiled: tuple[int, RulePredicate | StatPredicate, bool] | None = None
+
+    @property
+    def needs_stat(self) -> bool:
+        """
+        Whether the rule matches on the file's stat (size or times) rather than its name
+        """
+        return self.type in [FileMatchType.FILE_SIZE, FileMatchType.FILE_TIME]
+
+    @property
+    def is_relative_time(self) -> bool:
+        """
+        Whether the rule matches on a file's age, so a file that doesn't match now can match later without changing
+        """
+        return self.type == FileMatchType.FILE_TIME and parse_time(self.value)[1]
+
+    def _compile_regex(self) -> re.Pattern:
+        if not isinstance(self.value, str):
+            raise ValueError(f'Invalid File Match Rule type. "{self.mode.value}" rule "value" must be a string for "{self.type.value}"')
+        try:
+            return re.compile(self.value)
+        except re.error as e:
+            raise ValueError(f'Invalid regular expression "{self.value}" for File Match rule: {e}')
+
+    def compile(self) -> tuple[int, RulePredicate | StatPredicate, bool]:
+        """
+        Build a specialised predicate for this rule with any values precomputed (compiled regexes, frozensets of exact
+        values, lowercased values, parsed sizes and times). Returns the rule's relative cost, the predicate, and whether the
+        predicate needs the lowercased file name. Size and time rule predicates take the file's stat result instead of its
+        name (see needs_stat)
+        """
+        if self._compiled is not None:
+            return self._compiled
 
         if self.type == FileMatchType.FILE_TYPE:
-            if self.mode == FileTypeMatchMode.SINGLE_EXACT:
+            if self.mode in [FileTypeMatchMode.REGEX_INCLUDE, FileTypeMatchMode.REGEX_EXCLUDE]:
+                match = self._compile_regex().match
+                if self.mode == FileTypeMatchMode.REGEX_INCLUDE:
+                    self._compiled = (REGEX_RULE_COST, lambda name, lower_name, extension: match(extension) is not None, False)
+                else:
+                    self._compiled = (REGEX_RULE_COST, lambda name, lower_name, extension: match(extension) is None, False)
+            elif self.mode == FileTypeMatchMode.SINGLE_EXACT:
                 if not isinstance(self.value, str):
                     raise ValueError(f'Invalid File Match Rule type. "{self.mode.value}" rule "value" must be a string for "{self.type.value}"')
-                return extension == self.value
+                value = self.value
+                self._compiled = (EXACT_RULE_COST, lambda name, lower_name, extension: extension == value, False)
             elif self.mode == FileTypeMatchMode.MULTIPLE_EXACT:
                 if not isinstance(self.value, list):
                     raise ValueError(f'Invalid File Match Rule type. "{self.mode.value}" rule "value" must be a list for "{self.type.value}"')
-                return extension in self.value
-            elif self.mode == FileTypeMatchMode.REGEX_INCLUDE:
-                if not isinstance(self.value, str):
-                    raise ValueError(f'Invalid File Match Rule type. "{self.mode.value}" rule "value" must be a string for "{self.type.value}"')
-                return re.match(self.value, extension) is not None
-            elif self.mode == FileTypeMatchMode.REGEX_EXCLUDE:
-                if not isinstance(self.value, str):
-                    raise ValueError(f'Invalid File Match Rule type. "{self.mode.value}" rule "value" must be a string for "{self.type.value}"')
-                return re.match(self.value, extension) is None
+                values = frozenset(self.value)
+                self._compiled = (EXACT_RULE_COST, lambda name, lower_name, extension: extension in values, False)
         elif self.type == FileMatchType.FILE_NAME:
-            if self.mode == FileNameMatchMode.SINGLE_EXACT:
-                if not isinstance(self.value, str):
-                    raise ValueError("Invalid \"value\" type for specified match mode")
-                if not self.case_sensitive:
-                    return name.lower() == self.value.lower()
-                return name == self.value
+            if self.mode in [FileNameMatchMode.REGEX_INCLUDE, FileNameMatchMode.REGEX_EXCLUDE]:
+                # Case sensitivity has no effect on regex rules (use an inline flag like (?i) instead)
+                match = self._compile_regex().match
+                if self.mode == FileNameMatchMode.REGEX_INCLUDE:
+                    self._compiled = (REGEX_RULE_COST, lambda name, lower_name, extension: match(name) is not None, False)
+                else:
+                    self._compiled = (REGEX_RULE_COST, lambda name, lower_name, extension: match(name) is None, False)
             elif self.mode == FileNameMatchMode.MULTIPLE_EXACT:
-                if not self.case_sensitive:
-                    return name.lower() in [v.lower() for v in self.value]
-                return name in self.value
-            elif self.mode == FileNameMatchMode.CONTAINS:
-                if not isinstance(self.value, str):
-                    raise ValueError("Invalid \"value\" type for specified match mode")
-                if not self.case_sensitive:
-                    return self.value.lower() in name.lower()
-                return self.value in name
-            elif self.mode == FileNameMatchMode.STARTS_WITH:
-                if not isinstance(self.value, str):
-                    raise ValueError("Invalid \"value\" type for specified match mode")
-                if not self.case_sensitive:
-                    return name.lower().startswith(self.value.lower())
-                return name.startswith(self.value)
-            elif self.mode == FileNameMatchMode.ENDS_WITH:
-                if not isinstance(self.value, str):
-                    raise ValueError("Invalid \"value\" type for specified match mode")
-                if not self.case_sensitive:
-                    return name.lower().endswith(self.value.lower())
-                return name.endswith(self.value)
-            elif self.mode == FileNameMatchMode.REGEX_INCLUDE:
-                if not isinstance(self.value, str):
+                if not isinstance(self.value, list):
                     raise ValueError("Invalid \"value\" type for specified match mode")
-                return re.match(self.value, name) is not None
-            elif self.mode == FileNameMatchMode.REGEX_EXCLUDE:
+                if self.case_sensitive:
+                    values = frozenset(self.value)
+                    self._compiled = (EXACT_RULE_COST, lambda name, lower_name, extension: name in values, False)
+                else:
+                    values = frozenset(v.lower() for v in self.value)
+                    self._compiled = (EXACT_RULE_COST, lambda name, lower_name, extension: lower_name in values, True)
+            else:
                 if not isinstance(self.value, str):
                     raise ValueError("Invalid \"value\" type for specified match mode")
-                return re.match(self.value, name) is None
+                value = self.value if self.case_sensitive else self.value.lower()
+                uses_lower = not self.case_sensitive
+                if self.mode == FileNameMatchMode.SINGLE_EXACT:
+                    if uses_lower:
+                        predicate = lambda name, lower_name, extension: lower_name == value
+                    else:
+                        predicate = lambda name, lower_name, extension: name == value
+                    self._compiled = (EXACT_RULE_COST, predicate, uses_lower)
+                elif self.mode == FileNameMatchMode.CONTAINS:
+                    if uses_lower:
+                        predicate = lambda name, lower_name, extension: value in lower_name
+                    else:
+                        predicate = lambda name, lower_name, extension: value in name
+                    self._compiled = (SUBSTRING_RULE_COST, predicate, uses_lower)
+                elif self.mode == FileNameMatchMode.STARTS_WITH:
+                    if uses_lower:
+                        predicate = lambda name, lower_name, extension: lower_name.startswith(value)
+                    else:
+                        predicate = lambda name, lower_name, extension: name.startswith(value)
+                    self._compiled = (SUBSTRING_RULE_COST, predicate, uses_lower)
+                elif self.mode == FileNameMatchMode.ENDS_WITH:
+                    if uses_lower:
+                        predicate = lambda name, lower_name, extension: lower_name.endswith(value)
+                    else:
+                        predicate = lambda name, lower_name, extension: name.endswith(value)
+                    self._compiled = (SUBSTRING_RULE_COST, predicate, uses_lower)
+        elif self.type == FileMatchType.FILE_SIZE:
+            size = parse_size(self.value)
+            if self.mode == FileSizeMatchMode.MIN:
+                self._compiled = (STAT_RULE_COST, lambda file_stat: file_stat.st_size >= size, False)
+            elif self.mode == FileSizeMatchMode.MAX:
+                self._compiled = (STAT_RULE_COST, lambda file_stat: file_stat.st_size <= size, False)
+        elif self.type == FileMatchType.FILE_TIME:
+            seconds, is_relative = parse_time(self.value)
+            get_time = attrgetter('st_mtime' if self.time_attribute == FileTimeAttribute.MTIME else 'st_ctime')
+            if is_relative:
+                # The age is measured when each file is matched, so long runs and watch mode see up to date ages
+                if self.mode == FileTimeMatchMode.OLDER_THAN:
+                    self._compiled = (STAT_RULE_COST, lambda file_stat: time.time() - get_time(file_stat) > seconds, False)
+                elif self.mode == FileTimeMatchMode.NEWER_THAN:
+                    self._compiled = (STAT_RULE_COST, lambda file_stat: time.time() - get_time(file_stat) < seconds, False)
+            else:
+                if self.mode == FileTimeMatchMode.OLDER_THAN:
+                    self._compiled = (STAT_RULE_COST, lambda file_stat: get_time(file_stat) < seconds, False)
+                elif self.mode == FileTimeMatchMode.NEWER_THAN:
+                    self._compiled = (STAT_RULE_COST, lambda file_stat: get_time(file_stat) > seconds, False)
         else:
             raise ValueError("Invalid File Match Rule type")
-        
-        raise ValueError("Invalid File Match Rule configuration")
+
+        if self._compiled is None:
+            raise ValueError("Invalid File Match Rule configuration")
+        return self._compiled
+
+    def matches_filename(self, filename: str) -> bool:
+        if self.needs_stat:
+            raise ValueError(f'"{self.type.value}" rules match files, not file names')
+        _, predicate, uses_lower = self.compile()
+        name, extension = os.path.splitext(filename)
+        return predicate(name, name.lower() if uses_lower else name, extension[1:])
 
 class FileMatchConfig:
     def __init__(self, **kwargs) -> None:
         self.enabled = kwargs.get("enabled", True)
         self.operator = FileMatchRuleOperator.from_string(kwargs.get("operator", "and"))
         self.rules = [FileMatchRule(**rule) for rule in kwargs.get('rules', [])]
+        self._matcher: Callable[[str, ScannedFile | None], bool] | None = None
+
+    @property
+    def needs_stat(self) -> bool:
+        """
+        Whether any rule matches on file size or time (so files have to be matched with matches_file)
+        """
+        return self.enabled and any(rule.needs_stat for rule in self.rules)
+
+    @property
+    def has_relative_time_rules(self) -> bool:
+        """
+        Whether any rule matches on file age, so files can start (or stop) matching without changing
+        """
+        return self.enabled and any(rule.is_relative_time for rule in self.rules)
+
+    def compile(self) -> Callable[[str, ScannedFile | None], bool]:
+        """
+        Turn the rule set into a single predicate that takes a file name and (for size and time rules) the scanned file.
+        The file name is split (and lowercased, if any rule needs it) once per call and the rules are evaluated cheapest
+        first. Size and time rules are evaluated after every name rule, so a file's stat is only read when the name rules
+        haven't already decided the match. The predicate is cached and used by matches_filename and matches_file, so call
+        this again after changing the rules
+        """
+        if not self.enabled:
+            self._matcher = lambda filename, scanned=None: True
+            return self._matcher
+        if self.operator not in [FileMatchRuleOperator.AND, FileMatchRuleOperator.OR]:
+            raise ValueError("Invalid File Match configuration")
+
+        compiled_rules = sorted((rule.compile() for rule in self.rules if not rule.needs_stat), key=lambda compiled: compiled[0])
+        predicates = tuple(predicate for _, predicate, _ in compiled_rules)
+        stat_predicates = tuple(rule.compile()[1] for rule in self.rules if rule.needs_stat)
+        uses_lower = any(rule_uses_lower for _, _, rule_uses_lower in compiled_rules)
+        is_and = self.operator == FileMatchRuleOperator.AND
+        splitext = os.path.splitext
+
+        def matcher(filename: str, scanned: ScannedFile | None = None) -> bool:
+            name, extension = splitext(filename)
+            extension = extension[1:]
+            lower_name = name.lower() if uses_lower else name
+            for predicate in predicates:
+                if predicate(name, lower_name, extension) != is_and:
+                    return not is_and
+            if stat_predicates:
+                if scanned is None:
+                    raise ValueError("File size and time rules can't match a file name on its own")
+                file_stat = scanned.stat
+                for stat_predicate in stat_predicates:
+                    if stat_predicate(file_stat) != is_and:
+                        return not is_and
+            return is_and
+
+        self._matcher = matcher
+        return matcher
     
     def matches_filename(self, filename: str) -> bool:
         """
-        Return True if the specified filename is matched by the file match rules included in the config. If no rules are specified or the "enabled" flag is set to False, all files will be matched
+        Return True if the specified filename is matched by the file match rules included in the config. If no rules are specified or the "enabled" flag is set to False, all files will be matched.
+        Raises a ValueError if there are file size or time rules (use matches_file instead)
         """
-        if not self.enabled:
-            return True
-        
-        if self.operator == FileMatchRuleOperator.AND:
-            return all(rule.matches_filename(filename) for rule in self.rules)
-        elif self.operator == FileMatchRuleOperator.OR:
-            return any(rule.matches_filename(filename) for rule in self.rules)
-        
-        raise ValueError("Invalid File Match configuration")
+        if self._matcher is None:
+            self.compile()
+        return self._matcher(filename) # type: ignore
+
+    def matches_file(self, scanned: ScannedFile) -> bool:
+        """
+        Return True if the scanned file is matched by the file match rules included in the config. The file's stat (cached
+        from the scan when possible) is only read if there are file size or time rules and the name rules pass
+        """
+        if self._matcher is None:
+            self.compile()
+        return self._matcher(scanned.name, scanned) # type: ignore
@@ -1,18 +1,63 @@
 from __future__ import annotations
+from contextlib import contextmanager
+from abc import ABC, abstractmethod
+from typing import Iterator
+from enum import Enum
+import threading
+import sqlite3
+import re
+import time
 import json
 import os
 from json.decoder import JSONDecodeError
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 2
+COUNTERS = ["executions", "copied", "moved", "deleted", "skipped", "errors"]
+PHASES = ["scan", "match", "collision_check", "copy", "delete"]
+# Phases spent finding files for tasks, as opposed to running them
+PLANNING_PHASES = ["scan", "match", "collision_check"]
+# Phases run by the workers. Parallel workers' time adds up to more than the run's, so it's kept apart from the phase times
+WORKER_PHASES = ["copy", "delete"]
+# The fields of a run record, in order. Runs are stored as lists (not dicts) to keep the history compact
+HISTORY_FIELDS = ["started_at", "finished_at", "copied", "moved", "deleted", "skipped", "errors", "bytes_copied", *[f"{phase}_seconds" for phase in PHASES], *[f"{phase}_worker_seconds" for phase in WORKER_PHASES]]
+DEFAULT_HISTORY_LIMIT = 100
+SQLITE_BUSY_TIMEOUT_SECONDS = 30
+RUN_PLACEHOLDER_PATTERN = re.compile(r'"@run(\d+)@"')
+
+# One lock per JSON metadata file, shared by every backend instance in the process (e.g., movers run by a MoverGroup)
+_json_file_locks: dict[str, threading.Lock] = {}
+_json_file_locks_lock = threading.Lock()
+
+def _get_json_file_lock(file_path: str) -> threading.Lock:
+    key = os.path.realpath(file_path)
+    with _json_file_locks_lock:
+        return _json_file_locks.setdefault(key, threading.Lock())
 
 class ExecutionResults:
-    def __init__(self, executions: int = 1, copied: int = 0, moved: int = 0, deleted: int = 0, skipped: int = 0, errors: int = 0) -> None:
+    def __init__(self, executions: int = 1, copied: int = 0, moved: int = 0, deleted: int = 0, skipped: int = 0, errors: int = 0, deferred: int = 0, hardlinked: int = 0, reflinked: int = 0, bytes_copied: int = 0, started_at: float | None = None, finished_at: float | None = None, phase_times: dict[str, float] | None = None, worker_times: dict[str, float] | None = None) -> None:
         self._executions = executions
         self._copied = copied
         self._moved = moved
         self._deleted = deleted
         self._skipped = skipped
         self._errors = errors
+        # Files whose processing was put off because they were still being written (not saved to metadata)
+        self._deferred = deferred
+        # Copies that were made as hardlinks or reflinks instead (included in copied and moved, not saved to metadata)
+        self._hardlinked = hardlinked
+        self._reflinked = reflinked
+        self._bytes_copied = bytes_copied
+        self._started_at = started_at
+        self._finished_at = finished_at
+        self._phase_times = dict.fromkeys(PHASES, 0.0)
+        if phase_times:
+            self._phase_times.update(phase_times)
+        # Summed across workers, so in a pool these can be longer than the run
+        self._worker_times = dict.fromkeys(WORKER_PHASES, 0.0)
+        if worker_times:
+            self._worker_times.update(worker_times)
+        # The path of each file that couldn't be processed and why
+        self._failed_files: list[tuple[str, str]] = []
     
     @property
     def executions(self) -> int:
@@ -32,6 +77,47 @@ class ExecutionResults:
     @property
     def errors(self) -> int:
         return self._errors
+    @property
+    def deferred(self) -> int:
+        return self._deferred
+    @property
+    def hardlinked(self) -> int:
+        return self._hardlinked
+    @property
+    def reflinked(self) -> int:
+        return self._reflinked
+    @property
+    def bytes_copied(self) -> int:
+        return self._bytes_copied
+    @property
+    def started_at(self) -> float | None:
+        return self._started_at
+    @property
+    def finished_at(self) -> float | None:
+        return self._finished_at
+    @property
+    def phase_times(self) -> dict[str, float]:
+        return self._phase_times
+    @property
+    def worker_times(self) -> dict[str, float]:
+        return self._worker_times
+    @property
+    def planning_time(self) -> float:
+        return sum(self._phase_times[phase] for phase in PLANNING_PHASES)
+    @property
+    def failed_files(self) -> list[tuple[str, str]]:
+        return self._failed_files
+    @property
+    def duration(self) -> float | None:
+        if self._started_at is None or self._finished_at is None:
+            return None
+        return self._finished_at - self._started_at
+    @property
+    def files_per_second(self) -> float | None:
+        duration = self.duration
+        if not duration:
+            return None
+        return (self._copied + self._moved + self._deleted) / duration
     
     def increment_copied(self, amount: int = 1):
         self._copied += amount
@@ -43,6 +129,62 @@ class ExecutionResults:
         self._skipped += amount
     def increment_errors(self, amount: int = 1):
         self._errors += amount
+    def increment_deferred(self, amount: int = 1):
+        self._deferred += amount
+    def increment_hardlinked(self, amount: int = 1):
+        self._hardlinked += amount
+    def increment_reflinked(self, amount: int = 1):
+        self._reflinked += amount
+    def increment_bytes_copied(self, amount: int):
+        self._bytes_copied += amount
+    def add_phase_time(self, phase: str, seconds: float):
+        self._phase_times[phase] += seconds
+    def add_worker_time(self, phase: str, seconds: float):
+        self._worker_times[phase] += seconds
+    def add_task_time(self, seconds: float):
+        """
+        Add the wall time a run spent running its tasks (rather than planning them) to the worker phases, split in
+        proportion to the workers' time in each. It's capped at the workers' time so waits between tasks (e.g., for
+        retries) aren't counted
+        """
+        worker_seconds = sum(self._worker_times.values())
+        if worker_seconds <= 0:
+            return
+        seconds = min(seconds, worker_seconds)
+        for phase, phase_seconds in self._worker_times.items():
+            self._phase_times[phase] += seconds * phase_seconds / worker_seconds
+    def add_failed_file(self, path: str, error: str):
+        """
+        Record a file that couldn't be processed. Each failed file counts as an error
+        """
+        self._failed_files.append((path, error))
+        self._errors += 1
+
+    def start(self):
+        self._started_at = time.time()
+    def finish(self):
+        self._finished_at = time.time()
+
+    def merge(self, other: 'ExecutionResults'):
+        """
+        Add the counters and phase times from another set of results (e.g., the results of a single file processed by a
+        worker) to these results
+        """
+        self._executions += other.executions
+        self._copied += other.copied
+        self._moved += other.moved
+        self._deleted += other.deleted
+        self._skipped += other.skipped
+        self._errors += other.errors
+        self._deferred += other.deferred
+        self._hardlinked += other.hardlinked
+        self._reflinked += other.reflinked
+        self._bytes_copied += other.bytes_copied
+        for phase, seconds in other.phase_times.items():
+            self._phase_times[phase] += seconds
+        for phase, seconds in other.worker_times.items():
+            self._worker_times[phase] += seconds
+        self._failed_files.extend(other.failed_files)
     
     def get_dict(self) -> dict:
         return {
@@ -54,12 +196,91 @@ class ExecutionResults:
             "errors": self._errors,
         }
 
-class Metadata:
-    def __init__(self, file_path) -> None:
-        self.file_path = file_path
+    def get_history_record(self) -> list:
+        """
+        Return this run as a list of values in the order of HISTORY_FIELDS. Times are rounded to milliseconds
+        """
+        return [
+            round(self._started_at, 3) if self._started_at is not None else None,
+            round(self._finished_at, 3) if self._finished_at is not None else None,
+            self._copied, self._moved, self._deleted, self._skipped, self._errors, self._bytes_copied,
+            *[round(self._phase_times[phase], 3) for phase in PHASES],
+            *[round(self._worker_times[phase], 3) for phase in WORKER_PHASES],
+        ]
+
+    @classmethod
+    def from_history_record(cls, record: list) -> 'ExecutionResults':
+        values = dict(zip(HISTORY_FIELDS, record))
+        return cls(
+            copied=values.get("copied", 0),
+            moved=values.get("moved", 0),
+            deleted=values.get("deleted", 0),
+            skipped=values.get("skipped", 0),
+            errors=values.get("errors", 0),
+            bytes_copied=values.get("bytes_copied", 0),
+            started_at=values.get("started_at"),
+            finished_at=values.get("finished_at"),
+            phase_times={phase: values.get(f"{phase}_seconds") or 0.0 for phase in PHASES},
+            worker_times={phase: values.get(f"{phase}_worker_seconds") or 0.0 for phase in WORKER_PHASES},
+        )
+
+class MetadataBackendType(Enum):
+    JSON = 'json'
+    SQLITE = 'sqlite'
+
+    @classmethod
+    def from_string(cls, position: str) -> 'MetadataBackendType':
+        if position not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return MetadataBackendType(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == MetadataBackendType.JSON:
+            return "Keep metadata for every mover in a single JSON file, which is rewritten on each update"
+        elif self == MetadataBackendType.SQLITE:
+            return "Keep metadata in a SQLite database, which is updated in place and safe for concurrent movers"
+        else:
+            return "UNKNOWN"
+
+class MetadataBackend(ABC):
+    """
+    Stores the cumulative counters and a bounded history of runs for each mover id
+    """
+    def __init__(self, file_path: str) -> None:
+        self._file_path = file_path
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @abstractmethod
+    def update(self, mover_id: str, counters: dict[str, int], run: list | None = None, history_limit: int = DEFAULT_HISTORY_LIMIT):
+        """
+        Add counters (with the same keys as ExecutionResults.get_dict) to a mover's totals and append a run record (in
+        the order of HISTORY_FIELDS) to its history, keeping only the latest history_limit runs
+        """
+
+    @abstractmethod
+    def get(self, mover_id: str) -> dict[str, int] | None:
+        """
+        Return a mover's totals, or None if nothing has been recorded for it
+        """
+
+    @abstractmethod
+    def get_history(self, mover_id: str) -> list[list]:
+        """
+        Return a mover's run records, oldest first
+        """
+
+class JsonMetadataBackend(MetadataBackend):
+    def __init__(self, file_path: str) -> None:
+        super().__init__(file_path)
+        self._lock = _get_json_file_lock(file_path)
         if not os.path.exists(file_path):
             try:
-                with open(file_path, 'w') as f:
+                # Appending never truncates, in case another instance wrote the file since the check
+                with self._lock, open(file_path, 'a') as f:
                     f.close()
             except BaseException as e:
                 print(f"Failed to open provided metadata file")
@@ -75,44 +296,190 @@ class Metadata:
     def _validate_data(self, data: dict | None) -> dict:
         if data is None:
             return {"_version": SCHEMA_VERSION}
+        if data.get("_version") == 1:
+            # Version 2 added per-run history, which starts out empty
+            data["_version"] = SCHEMA_VERSION
         if not data.get("_version") == SCHEMA_VERSION:
-            # Add migrations here in the future... for now uhhhhh deal with it
             raise Exception(f"Metadata file has unknown schema version {data.get('_version')}. Current version: {SCHEMA_VERSION}")
         return data
 
-    def _load_data(self) -> dict:
+    def load_data(self) -> dict:
         data = None
-        with open(self.file_path, "r") as f:
+        with open(self._file_path, "r") as f:
             try:
                 data = json.load(f)
             except JSONDecodeError:
                 pass
         return self._validate_data(data)
-    
+
     def _save_data(self, data: dict):
         if not self._is_data_valid(data):
             return
         validated = self._validate_data(data)
-        with open(self.file_path, "w") as f:
-            f.write(json.dumps(validated, indent=4, sort_keys=True))
-        
+        # Run records are written on a single line each so the history doesn't take a line per value
+        rows = []
+        for mover_data in validated.values():
+            if isinstance(mover_data, dict) and "history" in mover_data:
+                placeholders = []
+                for run in mover_data["history"]:
+                    placeholders.append(f"@run{len(rows)}@")
+                    rows.append(json.dumps(run, separators=(',', ':')))
+                mover_data["history"] = placeholders
+        text = json.dumps(validated, indent=4, sort_keys=True)
+        text = RUN_PLACEHOLDER_PATTERN.sub(lambda match: rows[int(match.group(1))], text)
+        # Written to a temporary file and renamed over the metadata file, so a reader never sees a partial file
+        temp_path = f"{self._file_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(text)
+        os.replace(temp_path, self._file_path)
+
+    def update(self, mover_id: str, counters: dict[str, int], run: list | None = None, history_limit: int = DEFAULT_HISTORY_LIMIT):
+        # Concurrent movers sharing the file would otherwise overwrite each other's updates
+        with self._lock:
+            data = self.load_data()
+            if not data.get(mover_id):
+                data[mover_id] = ExecutionResults(executions=0).get_dict()
+            for counter in COUNTERS:
+                data[mover_id][counter] = data[mover_id].get(counter, 0) + counters.get(counter, 0)
+            if run is not None and history_limit > 0:
+                history = data[mover_id].get("history", [])
+                history.append(run)
+                data[mover_id]["history"] = history[-history_limit:]
+            self._save_data(data)
+
+    def get(self, mover_id: str) -> dict[str, int] | None:
+        return self.load_data().get(mover_id)
+
+    def get_history(self, mover_id: str) -> list[list]:
+        return (self.get(mover_id) or {}).get("history", [])
+
+class SqliteMetadataBackend(MetadataBackend):
+    """
+    Keeps each mover's counters in a row of a SQLite database (in WAL mode), with its run history in a second table.
+    Updates are a single atomic increment of one row, so concurrent movers sharing the database don't lose each other's
+    updates and the cost of an update doesn't grow with the number of movers.\n
+    When the database is first created, counters and history from a JSON metadata file (migrate_from) are imported into it
+    """
+    def __init__(self, file_path: str, migrate_from: str | None = None) -> None:
+        super().__init__(file_path)
+        created = not os.path.exists(file_path)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"CREATE TABLE IF NOT EXISTS movers (mover_id TEXT PRIMARY KEY, {', '.join(f'{counter} INTEGER NOT NULL DEFAULT 0' for counter in COUNTERS)})")
+            connection.execute(f"CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, mover_id TEXT NOT NULL, {', '.join(HISTORY_FIELDS)})")
+            # Fields added to run records since the table was created
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(runs)")}
+            for field in HISTORY_FIELDS:
+                if field not in columns:
+                    connection.execute(f"ALTER TABLE runs ADD COLUMN {field}")
+            connection.execute("CREATE INDEX IF NOT EXISTS runs_mover_id ON runs (mover_id, id)")
+            connection.execute("CREATE TABLE IF NOT EXISTS schema (version INTEGER NOT NULL)")
+            row = connection.execute("SELECT version FROM schema").fetchone()
+            if row is None:
+                connection.execute("INSERT INTO schema (version) VALUES (?)", (SCHEMA_VERSION,))
+            elif row[0] == 1:
+                # Version 2 only added the runs table, which was created above
+                connection.execute("UPDATE schema SET version = ?", (SCHEMA_VERSION,))
+            elif row[0] != SCHEMA_VERSION:
+                raise Exception(f"Metadata database has unknown schema version {row[0]}. Current version: {SCHEMA_VERSION}")
+            if created and migrate_from and os.path.exists(migrate_from):
+                self._migrate_json(connection, migrate_from)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per operation, so the backend can be shared by threads and survives forking into worker processes.
+        # The transaction is committed (or rolled back on an error) before the connection is closed
+        connection = sqlite3.connect(self._file_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _migrate_json(self, connection: sqlite3.Connection, json_path: str):
+        data = JsonMetadataBackend(json_path).load_data()
+        for mover_id, mover_data in data.items():
+            if mover_id.startswith("_") or not isinstance(mover_data, dict):
+                continue
+            self._increment(connection, mover_id, mover_data)
+            for run in mover_data.get("history", []):
+                self._add_run(connection, mover_id, run)
+
+    def _increment(self, connection: sqlite3.Connection, mover_id: str, counters: dict[str, int]):
+        connection.execute(
+            f"INSERT INTO movers (mover_id, {', '.join(COUNTERS)}) VALUES (?, {', '.join('?' for _ in COUNTERS)}) "
+            f"ON CONFLICT(mover_id) DO UPDATE SET {', '.join(f'{counter} = {counter} + excluded.{counter}' for counter in COUNTERS)}",
+            (mover_id, *[counters.get(counter, 0) for counter in COUNTERS]),
+        )
+
+    def _add_run(self, connection: sqlite3.Connection, mover_id: str, run: list):
+        connection.execute(
+            f"INSERT INTO runs (mover_id, {', '.join(HISTORY_FIELDS)}) VALUES (?, {', '.join('?' for _ in HISTORY_FIELDS)})",
+            # Runs recorded before fields were added to run records are shorter
+            (mover_id, *run, *[None] * (len(HISTORY_FIELDS) - len(run))),
+        )
+
+    def update(self, mover_id: str, counters: dict[str, int], run: list | None = None, history_limit: int = DEFAULT_HISTORY_LIMIT):
+        with self._connect() as connection:
+            self._increment(connection, mover_id, counters)
+            if run is not None and history_limit > 0:
+                self._add_run(connection, mover_id, run)
+                connection.execute(
+                    "DELETE FROM runs WHERE mover_id = ? AND id <= (SELECT id FROM runs WHERE mover_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (mover_id, mover_id, history_limit),
+                )
+
+    def get(self, mover_id: str) -> dict[str, int] | None:
+        with self._connect() as connection:
+            row = connection.execute(f"SELECT {', '.join(COUNTERS)} FROM movers WHERE mover_id = ?", (mover_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(COUNTERS, row))
+
+    def get_history(self, mover_id: str) -> list[list]:
+        with self._connect() as connection:
+            rows = connection.execute(f"SELECT {', '.join(HISTORY_FIELDS)} FROM runs WHERE mover_id = ? ORDER BY id", (mover_id,)).fetchall()
+        return [list(row) for row in rows]
+
+def create_metadata_backend(file_path: str, backend_type: MetadataBackendType = MetadataBackendType.JSON) -> MetadataBackend:
+    """
+    Create the metadata backend for a metadata file. A SQLite backend given a ".json" path uses a ".db" file next to it
+    and imports the JSON file's counters the first time
+    """
+    if backend_type == MetadataBackendType.SQLITE:
+        stem, extension = os.path.splitext(file_path)
+        if extension.lower() == ".json":
+            return SqliteMetadataBackend(f"{stem}.db", migrate_from=file_path)
+        return SqliteMetadataBackend(file_path)
+    return JsonMetadataBackend(file_path)
+
+class Metadata:
+    def __init__(self, file_path, backend_type: MetadataBackendType = MetadataBackendType.JSON, history_limit: int = DEFAULT_HISTORY_LIMIT) -> None:
+        self.file_path = file_path
+        self._backend = create_metadata_backend(file_path, backend_type)
+        self._history_limit = history_limit
+
+    @property
+    def backend(self) -> MetadataBackend:
+        return self._backend
+    @property
+    def history_limit(self) -> int:
+        return self._history_limit
 
     def update(self, mover_id: str, results: ExecutionResults):
-        data = self._load_data()
-        if not data.get(mover_id):
-            data[mover_id] = ExecutionResults(executions=0).get_dict()
-        data[mover_id]["executions"] += results.executions
-        data[mover_id]["copied"] += results.copied
-        data[mover_id]["moved"] += results.moved
-        data[mover_id]["deleted"] += results.deleted
-        data[mover_id]["skipped"] += results.skipped
-        data[mover_id]["errors"] += results.errors
-        self._save_data(data)
+        # Only timed runs (not hand-built results) are added to the history
+        run = results.get_history_record() if results.started_at is not None else None
+        self._backend.update(mover_id, results.get_dict(), run, self._history_limit)
 
+    def get_history(self, mover_id: str) -> list[ExecutionResults]:
+        """
+        Return the results of a mover's most recent runs (up to the history limit), oldest first
+        """
+        return [ExecutionResults.from_history_record(run) for run in self._backend.get_history(mover_id)]
 
     def get_data(self, mover_id: str):
-        data = self._load_data()
-        if not data.get(mover_id):
+        data = self._backend.get(mover_id)
+        if not data:
             return ExecutionResults(executions=0)
         return ExecutionResults(
             executions=data.get("executions", 0), 
@@ -123,38 +490,26 @@ class Metadata:
             errors=data.get("errors", 0),
         )
 
-    def get_execution_count(self, mover_id: str):
-        data = self._load_data()
-        if not data.get(mover_id):
+    def _get_count(self, mover_id: str, counter: str) -> int:
+        data = self._backend.get(mover_id)
+        if not data:
             return 0
-        return data[mover_id]["executions"]
+        return data.get(counter, 0)
+
+    def get_execution_count(self, mover_id: str):
+        return self._get_count(mover_id, "executions")
 
     def get_moved_count(self, mover_id: str):
-        data = self._load_data()
-        if not data.get(mover_id):
-            return 0
-        return data[mover_id]["moved"]
+        return self._get_count(mover_id, "moved")
 
     def get_copied_count(self, mover_id: str):
-        data = self._load_data()
-        if not data.get(mover_id):
-            return 0
-        return data[mover_id]["copied"]
+        return self._get_count(mover_id, "copied")
     
     def get_deleted_count(self, mover_id: str):
-        data = self._load_data()
-        if not data.get(mover_id):
-            return 0
-        return data[mover_id]["deleted"]
+        return self._get_count(mover_id, "deleted")
     
     def get_skipped_count(self, mover_id: str):
-        data = self._load_data()
-        if not data.get(mover_id):
-            return 0
-        return data[mover_id]["skipped"]
+        return self._get_count(mover_id, "skipped")
 
     def get_error_count(self, mover_id: str):
-        data = self._load_data()
-        if not data.get(mover_id):
-            return 0
-        return data[mover_id]["errors"]
+        return self._get_count(mover_id, "errors")
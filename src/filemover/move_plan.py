@@ -0,0 +1,178 @@
+from __future__ import annotations
+from filemover.scanner import ScannedFile
+from filemover.move_task import MoveTask
+from enum import Enum
+from typing import Iterable, Iterator
+import json
+import sys
+
+PLAN_VERSION = 1
+
+class PlanAction(Enum):
+    MOVE = 'move'
+    COPY = 'copy'
+    DELETE = 'delete'
+    SKIP = 'skip'
+
+    @classmethod
+    def from_string(cls, position: str) -> 'PlanAction':
+        if position not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return PlanAction(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == PlanAction.MOVE:
+            return "Write the file to its destinations, then remove the source"
+        elif self == PlanAction.COPY:
+            return "Write the file to its destinations and keep the source"
+        elif self == PlanAction.DELETE:
+            return "Remove the source without writing it anywhere (every destination is skipped)"
+        elif self == PlanAction.SKIP:
+            return "Do nothing"
+        else:
+            return "UNKNOWN"
+
+class DestinationAction(Enum):
+    WRITE = 'write'
+    OVERWRITE = 'overwrite'
+    SKIP = 'skip'
+
+    @classmethod
+    def from_string(cls, position: str) -> 'DestinationAction':
+        if position not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return DestinationAction(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == DestinationAction.WRITE:
+            return "Write a new file"
+        elif self == DestinationAction.OVERWRITE:
+            return "Overwrite the existing file"
+        elif self == DestinationAction.SKIP:
+            return "Leave the existing file alone"
+        else:
+            return "UNKNOWN"
+
+class PlanEntry:
+    """
+    What a mover will do with a single source file: the action for the source, why, and the action for each destination.
+    The source's size and modification time are recorded so an executor can tell when the file has changed since planning
+    """
+    __slots__ = ('_source', '_size', '_mtime_ns', '_action', '_reason', '_destinations', '_remove_source')
+
+    def __init__(self, source: str, size: int, mtime_ns: int, action: PlanAction, reason: str, destinations: list[tuple[str, DestinationAction]], remove_source: bool) -> None:
+        self._source = source
+        self._size = size
+        self._mtime_ns = mtime_ns
+        self._action = action
+        self._reason = reason
+        self._destinations = destinations
+        self._remove_source = remove_source
+
+    def __repr__(self):
+        return f"PlanEntry(source='{self._source}', action={self._action}, reason='{self._reason}', destinations={len(self._destinations)})"
+
+    @classmethod
+    def from_task(cls, task: MoveTask, overwrite: bool, reason: str) -> 'PlanEntry':
+        destinations = []
+        for path in task.destinations:
+            if path not in task.collisions:
+                destinations.append((path, DestinationAction.WRITE))
+            else:
+                destinations.append((path, DestinationAction.OVERWRITE if overwrite else DestinationAction.SKIP))
+        writes = any(action != DestinationAction.SKIP for _, action in destinations)
+        if writes and task.remove_source:
+            action = PlanAction.MOVE
+        elif writes:
+            action = PlanAction.COPY
+        elif task.remove_source:
+            action = PlanAction.DELETE
+        else:
+            action, reason = PlanAction.SKIP, "destinations_exist"
+        return cls(task.source.path, task.source.size, task.source.mtime_ns, action, reason, destinations, task.remove_source)
+
+    @classmethod
+    def skipped(cls, source: ScannedFile, reason: str) -> 'PlanEntry':
+        return cls(source.path, source.size, source.mtime_ns, PlanAction.SKIP, reason, [], False)
+
+    @classmethod
+    def from_json(cls, line: str) -> 'PlanEntry':
+        data = json.loads(line)
+        return cls(
+            data["source"],
+            data["size"],
+            data["mtime_ns"],
+            PlanAction.from_string(data["action"]),
+            data.get("reason", ""),
+            [(path, DestinationAction.from_string(action)) for path, action in data.get("destinations", [])],
+            data.get("remove_source", False),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "source": self._source,
+            "size": self._size,
+            "mtime_ns": self._mtime_ns,
+            "action": self._action.value,
+            "reason": self._reason,
+            "destinations": [[path, action.value] for path, action in self._destinations],
+            "remove_source": self._remove_source,
+        }, separators=(',', ':'))
+
+    def to_task(self, source: ScannedFile) -> MoveTask:
+        paths = [path for path, _ in self._destinations]
+        collisions = [path for path, action in self._destinations if action != DestinationAction.WRITE]
+        return MoveTask(source, paths, collisions, self._remove_source)
+
+    @property
+    def source(self) -> str:
+        return self._source
+    @property
+    def size(self) -> int:
+        return self._size
+    @property
+    def mtime_ns(self) -> int:
+        return self._mtime_ns
+    @property
+    def action(self) -> PlanAction:
+        return self._action
+    @property
+    def reason(self) -> str:
+        return self._reason
+    @property
+    def destinations(self) -> list[tuple[str, DestinationAction]]:
+        return self._destinations
+    @property
+    def remove_source(self) -> bool:
+        return self._remove_source
+
+def write_plan(entries: Iterable[PlanEntry], file_path: str, mover_name: str) -> int:
+    """
+    Write plan entries to a JSON-lines file (or standard output if file_path is "-"), one entry per line after a header
+    line. Entries are written as they're produced so the plan never has to fit in memory. Returns the number of entries
+    """
+    count = 0
+    output = sys.stdout if file_path == "-" else open(file_path, "w")
+    try:
+        output.write(json.dumps({"_version": PLAN_VERSION, "mover_name": mover_name}) + "\n")
+        for entry in entries:
+            output.write(entry.to_json() + "\n")
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return count
+
+def read_plan(file_path: str) -> Iterator[PlanEntry]:
+    """
+    Read the entries of a plan file one at a time
+    """
+    with open(file_path, "r") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("_version") != PLAN_VERSION:
+            raise ValueError(f"Plan file has unknown version {header.get('_version')}. Current version: {PLAN_VERSION}")
+        for line in f:
+            if line.strip():
+                yield PlanEntry.from_json(line)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from filemover.scanner import ScannedFile
+
+class MoveTask:
+    """
+    The work to do for a single matched source file: copy it to each destination, then remove the source if the keep
+    source behavior says so. Tasks only hold picklable data so they can be handed to worker threads or processes
+    """
+    def __init__(self, source: ScannedFile, destinations: list[str], collisions: list[str], remove_source: bool) -> None:
+        self._source = source
+        self._destinations = destinations
+        self._collisions = collisions
+        self._remove_source = remove_source
+
+    def __repr__(self):
+        return f"MoveTask(source='{self._source.path}', destinations={self._destinations}, collisions={self._collisions}, remove_source={self._remove_source})"
+
+    @property
+    def source(self) -> ScannedFile:
+        return self._source
+    @property
+    def destinations(self) -> list[str]:
+        return self._destinations
+    @property
+    def collisions(self) -> list[str]:
+        return self._collisions
+    @property
+    def remove_source(self) -> bool:
+        return self._remove_source
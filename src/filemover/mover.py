@@ -1,20 +1,89 @@
 from __future__ import annotations
-from filemover.mover_config import MoverConfig, DestinationCollisionBehavior, KeepSourceBehavior, CollisionAvoidanceBehavior
+from filemover.mover_config import MoverConfig, DestinationCollisionBehavior, KeepSourceBehavior, CollisionAvoidanceBehavior, ExecutorType
 from filemover.logger import create_logger
-from filemover.metadata import Metadata, ExecutionResults
-import shutil
+from filemover.metadata import Metadata, MetadataBackendType, ExecutionResults, DEFAULT_HISTORY_LIMIT
+from filemover.scanner import ScannedFile, scan_directory
+from filemover.file_copy import STALE_TEMP_FILE_SECONDS, CopyBackend, LinkMode, FsyncMode, fsync_directory, remove_stale_temp_files
+from filemover.move_task import MoveTask
+from filemover.destination_index import DestinationIndex
+from filemover.source_index import SourceIndex
+from filemover.journal import RunJournal
+from filemover.retry import RetryQueue, DeferralQueue
+from filemover.settle import SettleChecker, Observation
+from filemover.content_hash import HashCache
+from filemover.move_plan import PlanEntry, PlanAction, DestinationAction, write_plan, read_plan
+from filemover.watcher import create_watcher
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator
+import threading
+import hashlib
+import errno
+import json
+import time
+import re
 import os
 
+# Config properties that change which files are matched or where they go. The source index is reset when any change
+FINGERPRINT_PROPERTIES = [
+    'source_directory', 'source_directories', 'destination_directory', 'destination_directories', 'match_files',
+    'rename', 'recursive', 'keep_source_behavior', 'destination_collision_behavior', 'collision_avoidance_behavior',
+]
+# How often watch mode re-lists destination directories to pick up changes made outside the mover
+WATCH_INDEX_REFRESH_SECONDS = 60
+
+# Each worker process builds its own Mover from the original config (see _init_worker_mover)
+_worker_mover: Mover | None = None
+
+def _init_worker_mover(kwargs: dict):
+    global _worker_mover
+    _worker_mover = Mover(**kwargs)
+
+def _execute_task_in_worker(task: MoveTask) -> tuple[ExecutionResults, dict[str, list]]:
+    if _worker_mover is None:
+        raise RuntimeError("Worker process mover was not initialized")
+    results = _worker_mover._execute_task(task)
+    # Workers never save their hash cache, so send what they hashed back for the parent to save
+    hash_entries = _worker_mover._hash_cache.pop_new_entries() if _worker_mover._hash_cache is not None else {}
+    return results, hash_entries
+
 class Mover:
     def __init__(self, **kwargs):
+        self._kwargs = kwargs
         log_file = kwargs.get('log_file', None)
         verbose = kwargs.get('verbose', True)
         self.mover_id = kwargs.get('id', None)
         metadata_file = kwargs.get('metadata_file', 'filemover.json')
+        self._metadata_file = metadata_file
+        metadata_backend = MetadataBackendType.from_string(kwargs.get('metadata_backend', MetadataBackendType.JSON.value))
+        metadata_history_limit = kwargs.get('metadata_history_limit', DEFAULT_HISTORY_LIMIT)
+        if not isinstance(metadata_history_limit, int) or isinstance(metadata_history_limit, bool) or metadata_history_limit < 0:
+            raise ValueError("Metadata history limit must be a non-negative integer")
         self.config = MoverConfig(**kwargs)
         self.logger = create_logger(self.config.mover_name, verbose, log_file)
         if self.mover_id:
-            self.metadata = Metadata(metadata_file)
+            self.metadata = Metadata(metadata_file, metadata_backend, metadata_history_limit)
+        self._copy_backend = CopyBackend(self.config.copy_backend, self.config.copy_chunk_size, self.config.atomic_writes, self.config.fsync)
+        self._destination_index = self._create_destination_index()
+        # st_dev of each destination directory, used to detect when a move can be a rename
+        self._directory_devices: dict[str, int] = {}
+        # Destination directories known to exist, so each is only checked (and created) once per run
+        self._known_directories: set[str] = set()
+        # Temporary files can only be left by an earlier process, so they're cleaned up on the first run only
+        self._removed_stale_temp_files = False
+        self._source_index: SourceIndex | None = None
+        self._journal: RunJournal | None = None
+        self._settle_checker = SettleChecker(self.config.settle_config) if self.config.settle_config else None
+        self._hash_cache: HashCache | None = None
+        self._hash_cache_lock = threading.Lock()
+        # Destination directories written to during the run, flushed to disk once at the end with the per_run fsync mode
+        self._written_directories: set[str] = set()
+        # Fail early if there's nowhere to keep the index or journal
+        if self.config.incremental_config:
+            self._get_source_index_path()
+        if self.config.journal_config:
+            self._get_journal_path()
+        if self.config.compare_contents_config:
+            self._get_hash_cache_path()
 
     def __str__(self):
         return f"{self.config.mover_name}: {self.config.mover_description}"
@@ -22,22 +91,180 @@ class Mover:
     def __repr__(self):
         return f"Mover(name={self.config.mover_name}, description={self.config.mover_description})"
 
-    def _copy_file(self, source_file_path, destination_file_path) -> bool:
-        destination_directory = os.path.dirname(destination_file_path)
-        if not os.path.exists(destination_directory):
-            os.makedirs(destination_directory)
-        
-        self.logger.debug(f"Copying file \"{source_file_path}\" to \"{destination_file_path}\"")
+    def _get_hash_cache(self) -> HashCache:
+        # Loaded on first use, since worker processes only need it once they hit a collision
+        if self._hash_cache is None:
+            with self._hash_cache_lock:
+                if self._hash_cache is None:
+                    self._hash_cache = HashCache(self._get_hash_cache_path(), self.config.compare_contents_config.max_entries)
+        return self._hash_cache
+
+    def _is_identical(self, source: ScannedFile, destination_file_path) -> bool:
+        """
+        Return True if the destination file has the same contents as the source. Sizes are compared first, so files are only
+        hashed (or their hashes looked up in the hash cache) when their sizes match
+        """
+        try:
+            destination_stat = os.stat(destination_file_path)
+        except OSError:
+            return False
+        if destination_stat.st_size != source.size:
+            return False
+        hash_cache = self._get_hash_cache()
+        return hash_cache.get_hash(source.path, source.stat) == hash_cache.get_hash(destination_file_path, destination_stat)
+
+    def _prepare_destination(self, destination_file_path, collides: bool | None = None, source: ScannedFile | None = None) -> bool:
+        """
+        Create the destination directory if needed and apply the destination collision behavior. Returns False if the copy
+        to this destination should be skipped (including when contents are compared and the destination is identical)
+        """
+        self._ensure_directory(os.path.dirname(destination_file_path))
 
-        if os.path.exists(destination_file_path):
-            if self.config.keep_source_behavior == DestinationCollisionBehavior.IGNORE:
-                self.logger.warning(f"File \"{destination_file_path}\" already exists. Skipping copy")
+        # Reuse the result of the collision check when the caller already did one
+        if collides is None:
+            collides = os.path.exists(destination_file_path)
+        if collides:
+            if source is not None and self.config.compare_contents_config and self._is_identical(source, destination_file_path):
+                self.logger.debug(f"File \"{destination_file_path}\" already exists with the same contents. Skipping copy")
+                return False
+            if self.config.destination_collision_behavior == DestinationCollisionBehavior.IGNORE:
+                if self.config.compare_contents_config:
+                    self.logger.warning(f"File \"{destination_file_path}\" already exists with different contents. Skipping copy")
+                else:
+                    self.logger.warning(f"File \"{destination_file_path}\" already exists. Skipping copy")
                 return False
-        shutil.copy2(source_file_path, destination_file_path)
-        self.logger.debug(f"Successfully copied file \"{source_file_path}\" to \"{destination_file_path}\"")
         return True
 
-    def _handle_source_file_removal(self, source_path, destinations, collisions) -> bool:
+    def _link_file(self, source: ScannedFile, destination_file_path, results: ExecutionResults) -> bool:
+        """
+        Write the destination as a reflink or hardlink of the source, as the link mode allows. Returns False if it has to be
+        copied instead (the link mode is "copy", the destination is on another filesystem or the filesystem doesn't support
+        the link)
+        """
+        link_mode = self.config.link_mode
+        if link_mode == LinkMode.COPY:
+            return False
+        device = self._get_directory_device(os.path.dirname(destination_file_path))
+        if device != source.stat.st_dev:
+            return False
+        # The copy backend remembers devices that don't support reflinks
+        if link_mode in [LinkMode.REFLINK, LinkMode.AUTO] and self._copy_backend.reflink(source, destination_file_path):
+            self.logger.debug(f"Reflinked file \"{source.path}\" to \"{destination_file_path}\"")
+            results.increment_reflinked()
+            return True
+        if link_mode in [LinkMode.HARDLINK, LinkMode.AUTO]:
+            # Hardlinks can fail for a single file (e.g., too many links), so failures aren't remembered like reflinks
+            if self._copy_backend.hardlink(source, destination_file_path):
+                self.logger.debug(f"Hardlinked file \"{source.path}\" to \"{destination_file_path}\"")
+                results.increment_hardlinked()
+                return True
+        return False
+
+    def _copy_file(self, source: ScannedFile | str, destination_file_path, collides: bool | None = None, results: ExecutionResults | None = None) -> bool:
+        """
+        Copy a file to a destination, or link it there if the link mode allows and results are given to count the link in
+        """
+        if not isinstance(source, ScannedFile):
+            source = ScannedFile.from_path(source)
+        self.logger.debug(f"Copying file \"{source.path}\" to \"{destination_file_path}\"")
+        if not self._prepare_destination(destination_file_path, collides, source):
+            return False
+        if results is not None and self._link_file(source, destination_file_path, results):
+            return True
+        self._copy_backend.copy(source, destination_file_path)
+        if results is not None:
+            results.increment_bytes_copied(source.size)
+        self.logger.debug(f"Successfully copied file \"{source.path}\" to \"{destination_file_path}\"")
+        return True
+
+    def _copy_to_destinations(self, source: ScannedFile, destination_file_paths: list[str], collisions: list[str], results: ExecutionResults) -> tuple[int, int]:
+        """
+        Copy (or link) a file to several destinations, reading the source only once when more than one destination is
+        copied. Returns the number of written and skipped destinations
+        """
+        if len(destination_file_paths) == 1:
+            is_copied = self._copy_file(source, destination_file_paths[0], destination_file_paths[0] in collisions, results)
+            return (1, 0) if is_copied else (0, 1)
+
+        writable = [path for path in destination_file_paths if self._prepare_destination(path, path in collisions, source)]
+        remaining = [path for path in writable if not self._link_file(source, path, results)]
+        if remaining:
+            self.logger.debug(f"Copying file \"{source.path}\" to {len(remaining)} destination(s): {remaining}")
+            self._copy_backend.copy_to_many(source, remaining)
+            results.increment_bytes_copied(len(remaining) * source.size)
+            self.logger.debug(f"Successfully copied file \"{source.path}\" to {len(remaining)} destination(s)")
+        return len(writable), len(destination_file_paths) - len(writable)
+
+    def _ensure_directory(self, directory):
+        """
+        Create a destination directory if it doesn't exist. Directories are remembered for the rest of the run (or until a
+        task writing to them fails) so they're only checked once
+        """
+        if directory in self._known_directories:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._known_directories.add(directory)
+
+    def _forget_directories(self, directories: Iterable[str]):
+        for directory in directories:
+            self._known_directories.discard(directory)
+            self._directory_devices.pop(directory, None)
+            if self._destination_index and not os.path.isdir(directory):
+                # The directory was removed (along with the files listed in it), so it's listed again once recreated
+                self._destination_index.invalidate(directory)
+
+    def _get_directory_device(self, directory) -> int:
+        device = self._directory_devices.get(directory)
+        if device is None:
+            self._ensure_directory(directory)
+            device = os.stat(directory).st_dev
+            self._directory_devices[directory] = device
+        return device
+
+    def _get_rename_destination(self, task: MoveTask) -> str | None:
+        """
+        Return a destination the source file can be renamed to instead of copied (i.e., one that will be written and is on
+        the same device as the source), or None if every destination needs a copy
+        """
+        # Renaming a symlink would move the link instead of copying the file it points to
+        if not task.remove_source or task.source.is_symlink:
+            return None
+        for destination_file_path in reversed(task.destinations):
+            if destination_file_path in task.collisions:
+                if self.config.destination_collision_behavior == DestinationCollisionBehavior.IGNORE:
+                    continue
+                # Renaming a file over a hardlink of itself does nothing and would leave the source in place
+                if self._is_same_file(task.source, destination_file_path):
+                    continue
+            if self._get_directory_device(os.path.dirname(destination_file_path)) == task.source.stat.st_dev:
+                return destination_file_path
+        return None
+
+    def _is_same_file(self, source: ScannedFile, destination_file_path: str) -> bool:
+        try:
+            return os.path.samefile(source.path, destination_file_path)
+        except OSError:
+            return False
+
+    def _rename_file(self, source: ScannedFile, destination_file_path) -> bool:
+        """
+        Move the source file to the destination with a single rename. Returns False if the rename isn't possible because the
+        destination is on another filesystem
+        """
+        self.logger.debug(f"Renaming file \"{source.path}\" to \"{destination_file_path}\"")
+        try:
+            os.replace(source.path, destination_file_path)
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                self.logger.debug(f"\"{destination_file_path}\" is on a different filesystem than the source. Falling back to copy")
+                return False
+            raise
+        if self.config.fsync == FsyncMode.PER_FILE:
+            fsync_directory(os.path.dirname(destination_file_path))
+        self.logger.debug(f"Successfully renamed file \"{source.path}\" to \"{destination_file_path}\"")
+        return True
+
+    def _should_remove_source(self, destinations, collisions) -> bool:
         if self.config.keep_source_behavior == KeepSourceBehavior.ALWAYS_KEEP_SOURCE:
             should_remove = False
         elif self.config.keep_source_behavior == KeepSourceBehavior.KEEP_SOURCE_IF_ANY_COLLIDE:
@@ -50,22 +277,35 @@ class Mover:
             should_remove = True
         else:
             should_remove = False
+        return should_remove
 
-        if should_remove:
+    def _handle_source_file_removal(self, source_path, destinations, collisions) -> bool:
+        if self._should_remove_source(destinations, collisions):
             os.remove(source_path)
             self.logger.debug(f"Removed source file \"{source_path}\"")
             return True
         return False
 
-    def _get_destination_files_for_source(self, source_path) -> tuple[list, list]:
+    def _create_destination_index(self) -> DestinationIndex | None:
+        if not self.config.index_destinations:
+            return None
+        return DestinationIndex(self.config.destination_index_max_entries)
+
+    def _destination_exists(self, destination_file_path) -> bool:
+        if self._destination_index:
+            return self._destination_index.exists(destination_file_path)
+        return os.path.exists(destination_file_path)
+
+    def _get_destination_files_for_source(self, source_path: ScannedFile | str) -> tuple[list, list]:
         collisions = []
         destinations = []
         
         # Collision checking
+        destination_file_name = self.get_destination_file_name(source_path)
         for destination_directory in self.config.destination_directories:
-            destination_file_path = self.get_destination_file_path(source_path, destination_directory)
+            destination_file_path = os.path.join(destination_directory, destination_file_name)
             destinations.append(destination_file_path)
-            if os.path.exists(destination_file_path):
+            if self._destination_exists(destination_file_path):
                 collisions.append(destination_file_path)
         
         return destinations, collisions
@@ -79,30 +319,148 @@ class Mover:
                 return True
         return False
 
-    def get_matched_files(self) -> list[str]:
+    def _log_scan_error(self, error: OSError):
+        self.logger.warning(f"Failed to scan directory \"{error.filename}\": {error.strerror}")
+
+    def _scan_source_files(self, index: SourceIndex | None = None) -> Iterator[ScannedFile]:
+        for source_dir in self.config.source_directories:
+            yield from scan_directory(source_dir, self.config.recursive, on_error=self._log_scan_error, index=index)
+
+    def _get_state_file_path(self, suffix: str, feature: str, option: str) -> str:
         """
-        Return a list of paths of all files that match the mover's criteria
+        Return the default path of a file that keeps state for this mover between runs, next to the metadata file
+        """
+        if not self.mover_id:
+            raise ValueError(f'{feature} requires either a mover "id" or an "{option}"')
+        safe_id = re.sub(r'[^\w.-]', '_', self.mover_id)
+        return f"{os.path.splitext(self._metadata_file)[0]}.{safe_id}.{suffix}"
+
+    def _get_source_index_path(self) -> str:
+        incremental_config = self.config.incremental_config
+        if incremental_config and incremental_config.index_file:
+            return incremental_config.index_file
+        return self._get_state_file_path("index.json", "Incremental scanning", "index_file")
+
+    def _get_journal_path(self) -> str:
+        journal_config = self.config.journal_config
+        if journal_config and journal_config.journal_file:
+            return journal_config.journal_file
+        return self._get_state_file_path("journal.jsonl", "The run journal", "journal_file")
+
+    def _get_hash_cache_path(self) -> str:
+        compare_contents_config = self.config.compare_contents_config
+        if compare_contents_config and compare_contents_config.cache_file:
+            return compare_contents_config.cache_file
+        return self._get_state_file_path("hashes.json", "Content comparison", "cache_file")
+
+    def _create_journal(self) -> RunJournal | None:
+        journal_config = self.config.journal_config
+        if not journal_config:
+            return None
+        journal = RunJournal(self._get_journal_path(), journal_config.batch_size, journal_config.fsync)
+        if journal.is_resuming:
+            self.logger.info(f"Resuming unfinished files from journal \"{journal.file_path}\"")
+        return journal
+
+    def _is_copy_complete(self, source: ScannedFile, destination_file_path: str) -> bool:
+        try:
+            destination_stat = os.stat(destination_file_path)
+        except OSError:
+            return False
+        # Copies are given the source's modification time once their contents are written
+        return destination_stat.st_size == source.size and destination_stat.st_mtime_ns == source.mtime_ns
+
+    def _resume_task(self, scanned: ScannedFile, record: dict) -> MoveTask | None:
+        """
+        Work out what's left to do for a file an interrupted run had started. Completed files are skipped, files whose copies
+        all finished only have their source removed, and anything else is redone with the collisions found originally (so
+        partially written destinations are overwritten rather than treated as collisions)
+        """
+        if record.get("done"):
+            self.logger.debug(f"File \"{scanned.path}\" was already processed by the interrupted run. Skipping")
+            return None
+        destinations = record["destinations"]
+        collisions = record["collisions"]
+        remove_source = record["remove_source"]
+        skip_collisions = self.config.destination_collision_behavior == DestinationCollisionBehavior.IGNORE
+        written = [path for path in destinations if not (skip_collisions and path in collisions)]
+        if all(self._is_copy_complete(scanned, path) for path in written):
+            if not remove_source:
+                return None
+            self.logger.debug(f"Finishing removal of source file \"{scanned.path}\" from the interrupted run")
+            return MoveTask(scanned, [], [], True)
+        task = MoveTask(scanned, destinations, collisions, remove_source)
+        self._reserve_destinations(task)
+        return task
+
+    def _journal_tasks(self, tasks: Iterable[MoveTask]) -> Iterator[MoveTask]:
+        """
+        Write a begin record for each batch of tasks before any of them are started
+        """
+        batch = []
+        for task in tasks:
+            batch.append(task)
+            if len(batch) >= self._journal.batch_size:
+                self._journal.begin(batch)
+                yield from batch
+                batch = []
+        if batch:
+            self._journal.begin(batch)
+            yield from batch
+
+    def _get_config_fingerprint(self) -> str:
+        properties = {key: self._kwargs.get(key) for key in FINGERPRINT_PROPERTIES}
+        return hashlib.sha256(json.dumps(properties, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _create_source_index(self) -> SourceIndex | None:
+        incremental_config = self.config.incremental_config
+        if not incremental_config:
+            return None
+        # A file can start matching an age rule without its directory changing, so every directory has to be listed
+        skip_unchanged_directories = incremental_config.skip_unchanged_directories and not self.config.match_files_config.has_relative_time_rules
+        return SourceIndex(self._get_source_index_path(), self._get_config_fingerprint(), skip_unchanged_directories)
+
+    def _filter_matched_files(self, scanned_files: Iterable[ScannedFile], results: ExecutionResults | None = None) -> Iterator[ScannedFile]:
+        if results is None:
+            for scanned in scanned_files:
+                if self.matches_file(scanned):
+                    yield scanned
+            return
+        # Time pulling each file from the scan separately from matching it
+        iterator = iter(scanned_files)
+        while True:
+            start = time.perf_counter()
+            scanned = next(iterator, None)
+            matching = time.perf_counter()
+            results.add_phase_time("scan", matching - start)
+            if scanned is None:
+                return
+            is_match = self.matches_file(scanned)
+            results.add_phase_time("match", time.perf_counter() - matching)
+            if is_match:
+                yield scanned
+
+    def iter_matched_files(self) -> Iterator[str]:
+        """
+        Yield the path of each file that matches the mover's criteria as the source directories are scanned, without
+        holding every path in memory
         """
-        matched_files = []
         if not self.config.source_directories:
             raise ValueError("Source directories must be specified.")
-        for source_dir in self.config.source_directories:
-            if self.config.recursive:
-                walker = os.walk(source_dir)
-            else:
-                walker = [(source_dir, [], os.listdir(source_dir))]
-            for root, _, files in walker:
-                for file_name in files:
-                    if self.matches_filename(file_name):
-                        matched_files.append(os.path.join(root, file_name))
-        return matched_files
+        return (scanned.path for scanned in self._filter_matched_files(self._scan_source_files()))
+
+    def get_matched_files(self) -> list[str]:
+        """
+        Return a list of paths of all files that match the mover's criteria
+        """
+        return list(self.iter_matched_files())
 
     def list_matched_files(self) -> None:
         """
         Log the path for each file that matches the mover's criteria
         """
         self.logger.info(f"Matched files for \"{self.config}\":")
-        for matched_file in self.get_matched_files():
+        for matched_file in self.iter_matched_files():
             self.logger.info(f"\t\"{matched_file}\"")
     
     def matches_filename(self, file_name) -> bool:
@@ -116,6 +474,25 @@ class Mover:
             return False
         return self.config.match_files_config.matches_filename(file_name)
 
+    def matches_file(self, scanned: ScannedFile) -> bool:
+        """
+        Return True if a scanned file matches the mover's criteria, including any file size or time rules. The file is
+        only statted if the name rules pass (and the scan didn't already stat it)\n
+        ---\n
+        Keyword arguments:\n
+        scanned -- the file to check
+        """
+        if not scanned.name:
+            return False
+        try:
+            return self.config.match_files_config.matches_file(scanned)
+        except FileNotFoundError:
+            # Removed since it was scanned
+            return False
+        except OSError as e:
+            self.logger.warning(f"Failed to check file \"{scanned.path}\" against the match rules: {e}. Skipping")
+            return False
+
     def get_mover_config(self) -> MoverConfig:
         """
         Get the mover's configuration
@@ -132,82 +509,554 @@ class Mover:
         config._validate()
         self.config = config
 
-    def get_destination_file_path(self, source_path, destination_directory):
+    def get_destination_file_name(self, source_path: ScannedFile | str) -> str:
+        """
+        Get the file name a source file is given in every destination directory, with any configuration rules applied
+        (e.g., renaming)\n
+        ---\n
+        Keyword arguments:\n
+        source_path -- a full path (or scanned file) to consider as the source
+        """
+        source = source_path if isinstance(source_path, ScannedFile) else ScannedFile.from_path(source_path)
+        if not self.config.rename_config:
+            return source.name
+        # The source's stat is only read if the timestamp comes from the file's times (and is cached from scanning)
+        destination_file_name = self.config.rename_config.apply_rename(source.name, source)
+        self.logger.debug(f"Renaming file \"{source.name}\" to \"{destination_file_name}\"")
+        return destination_file_name
+
+    def get_destination_file_path(self, source_path: ScannedFile | str, destination_directory):
         """
         Get the destination path for a source file, with any configuration rules applied (e.g., renaming)\n
         ---\n
         Keyword arguments:\n
-        source_path -- a full path to a file to consider as the source\n
+        source_path -- a full path (or scanned file) to consider as the source\n
         destination_directory -- the directory that the returned destination file path should have
         """
+        return os.path.join(destination_directory, self.get_destination_file_name(source_path))
+
+    def _plan_task(self, scanned: ScannedFile, results: ExecutionResults) -> MoveTask | None:
+        """
+        Work out the destinations, collisions and source removal for a matched file. Returns None if the file should be skipped
+        """
+        start = time.perf_counter()
+        destinations, collisions = self._get_destination_files_for_source(scanned)
+        results.add_phase_time("collision_check", time.perf_counter() - start)
+        self.logger.debug(f"File \"{scanned.name}\" matched on mover \"{self.config}\" with {len(destinations)} destination(s) and {len(collisions)} collision(s)")
+
+        if self._should_skip_move(destinations, collisions):
+            self.logger.debug(f"{len(collisions)} collision(s) would result from the current move operation - this file will be skipped: \"{scanned.path}\"")
+            if self._source_index:
+                self._source_index.invalidate_directory(os.path.dirname(scanned.path))
+            return None
+        return MoveTask(scanned, destinations, collisions, self._should_remove_source(destinations, collisions))
+
+    def _reserve_destinations(self, task: MoveTask):
+        if self._destination_index:
+            # Record the files this task will write now (rather than when the copy finishes) so later files in the run
+            # see them as collisions, the same as when files are processed one at a time
+            for destination_file_path in task.destinations:
+                self._destination_index.add(destination_file_path)
+
+    def _create_task(self, scanned: ScannedFile, results: ExecutionResults) -> MoveTask | None:
+        """
+        Plan a task for a matched file and reserve its destinations. Returns None if the file should be skipped
+        """
+        task = self._plan_task(scanned, results)
+        if task:
+            self._reserve_destinations(task)
+        return task
+
+    def _is_in_source_directory(self, file_path: str) -> bool:
+        directory = os.path.dirname(os.path.abspath(file_path))
+        for source_dir in self.config.source_directories:
+            source_dir = os.path.abspath(source_dir)
+            if directory == source_dir:
+                return True
+            if self.config.recursive and directory.startswith(os.path.join(source_dir, '')):
+                return True
+        return False
+
+    def _iter_scanned_paths(self, file_paths: Iterable[str]) -> Iterator[ScannedFile]:
+        for file_path in file_paths:
+            if not self._is_in_source_directory(file_path):
+                self.logger.debug(f"File \"{file_path}\" is not in a source directory. Skipping")
+                continue
+            try:
+                scanned = ScannedFile.from_path(file_path)
+                if scanned.is_file:
+                    yield scanned
+            except FileNotFoundError:
+                # Already moved or deleted
+                continue
+            except OSError as e:
+                self.logger.warning(f"Failed to read file \"{file_path}\": {e.strerror}")
+
+    def _check_settled(self, scanned: ScannedFile, settling: DeferralQueue, results: ExecutionResults, first_seen: float | None = None, observation: Observation | None = None) -> bool:
+        """
+        Return True if a file has finished being written. Otherwise defer it to be checked again later in the run, or skip
+        it until the next run if it's been waited on for the settle max_wait
+        """
+        delay = self._settle_checker.check(scanned, observation)
+        if not delay:
+            return True
+        max_wait = self._settle_checker.config.max_wait
+        now = time.monotonic()
+        if first_seen is None:
+            first_seen = now
+            results.increment_deferred()
+        remaining = first_seen + max_wait - now
+        if remaining <= 0:
+            self.logger.info(f"File \"{scanned.path}\" is still being written after waiting {max_wait}s. Skipping it until the next run")
+            results.increment_skipped()
+            if self._source_index:
+                self._source_index.invalidate_directory(os.path.dirname(scanned.path))
+            return False
+        # Check once more when max_wait is up, even if the file won't have settled by then
+        delay = min(delay, remaining)
+        self.logger.debug(f"File \"{scanned.path}\" is still being written. Checking it again in {delay:.1f}s")
+        settling.push((scanned.path, first_seen, self._settle_checker.observe(scanned, observation)), delay)
+        return False
+
+    def _iter_settled_tasks(self, ready: list[tuple[str, float, Observation]], settling: DeferralQueue, results: ExecutionResults) -> Iterator[MoveTask]:
+        for path, first_seen, observation in ready:
+            try:
+                # Re-stat the file since it was still changing when it was scanned
+                scanned = ScannedFile.from_path(path, os.stat(path))
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.logger.warning(f"Failed to read file \"{path}\": {e.strerror}")
+                continue
+            # Size and time rules may no longer match now the file has changed
+            if not self.matches_file(scanned):
+                continue
+            if self._check_settled(scanned, settling, results, first_seen, observation):
+                task = self._create_task(scanned, results)
+                if task:
+                    yield task
+
+    def _iter_tasks(self, scanned_files: Iterable[ScannedFile], results: ExecutionResults) -> Iterator[MoveTask]:
+        # Files that are still being written wait here, while files after them carry on
+        settling = DeferralQueue() if self._settle_checker else None
+        for scanned in self._filter_matched_files(scanned_files, results):
+            if settling is not None:
+                yield from self._iter_settled_tasks(settling.pop_ready(), settling, results)
+            if self._source_index and self._source_index.is_file_unchanged(scanned):
+                self.logger.debug(f"File \"{scanned.path}\" is unchanged since it was last processed. Skipping")
+                continue
+            record = self._journal.get(scanned) if self._journal else None
+            if record:
+                task = self._resume_task(scanned, record)
+                if task:
+                    yield task
+                continue
+            if settling is not None and not self._check_settled(scanned, settling, results):
+                continue
+            task = self._create_task(scanned, results)
+            if task:
+                yield task
+        while settling:
+            yield from self._iter_settled_tasks(settling.wait_for_ready(), settling, results)
+
+    def _on_task_finished(self, task: MoveTask):
+        """
+        Called on the main thread once a task has finished successfully
+        """
+        if self._source_index and not task.remove_source:
+            self._source_index.record_file(task.source)
+        if self._journal:
+            self._journal.done(task)
+        if self.config.fsync == FsyncMode.PER_RUN:
+            self._written_directories.update(os.path.dirname(path) for path in task.destinations)
+
+    def _release_destinations(self, task: MoveTask):
+        """
+        Undo _reserve_destinations for the destinations a task didn't write, so they aren't seen as collisions when the
+        file is tried again (e.g., in the next watch batch)
+        """
+        if self._destination_index:
+            for destination_file_path in task.destinations:
+                if not os.path.exists(destination_file_path):
+                    self._destination_index.discard(destination_file_path)
+
+    def _record_failed_task(self, task: MoveTask, error: BaseException, results: ExecutionResults):
+        self.logger.error(f"Failed to process file \"{task.source.path}\": {error}")
+        results.add_failed_file(task.source.path, str(error))
+        self._release_destinations(task)
+        if self._source_index:
+            # The file wasn't processed, so its directory has to be listed again next run
+            self._source_index.invalidate_directory(os.path.dirname(task.source.path))
+
+    def _on_task_failed(self, task: MoveTask, error: Exception, results: ExecutionResults, retries: RetryQueue):
+        """
+        Called on the main thread when a task raises an error. The task is retried later in the run if the error is
+        retryable and it has attempts left, otherwise it's recorded as failed. Either way the run carries on
+        """
+        delay = self._get_retry_delay(task, error, results, retries)
+        if delay is not None:
+            retries.push(task, delay)
+
+    def _get_retry_delay(self, task: MoveTask, error: Exception, results: ExecutionResults, retries: RetryQueue) -> float | None:
+        """
+        Count a failed attempt at a task and return the seconds to wait before retrying it, or record it as failed and
+        return None if it won't be retried. The caller queues the retry
+        """
+        delay = retries.record_failure(task, error)
+        if delay is None:
+            self._record_failed_task(task, error, results)
+            return None
+        attempts = retries.get_attempts(task)
+        self.logger.warning(f"Failed to process file \"{task.source.path}\" (attempt {attempts} of {self.config.retry_config.attempts}): {error}. Retrying in {delay:.1f}s")
+        return delay
+
+    def _iter_task_rounds(self, tasks: Iterable[MoveTask], retries: RetryQueue) -> Iterator[Iterable[MoveTask]]:
+        """
+        Yield the tasks to run in rounds. The first round is every task, with failed tasks fitted in as soon as they're
+        ready to be retried. Each later round waits for the next failed tasks to be ready. A round must be finished
+        (including collecting every result) before the next one is requested
+        """
+        return retries.iter_rounds(tasks)
+
+    def _execute_task(self, task: MoveTask) -> ExecutionResults:
+        """
+        Copy a file to each of its destinations, then remove the source once every copy has finished (if the task says to).
+        Returns the results for this file only so workers never share counters
+        """
+        results = ExecutionResults(executions=0)
+        start = time.perf_counter()
+
+        # When the source is removed anyway, one destination on the same device can be a rename instead of a copy
+        rename_destination = self._get_rename_destination(task)
+
+        copied_count = 0
+        skipped_count = 0
+        is_deleted = False
+        try:
+            # File Copying
+            copy_destinations = [path for path in task.destinations if path != rename_destination]
+            if copy_destinations:
+                copied_count, skipped_count = self._copy_to_destinations(task.source, copy_destinations, task.collisions, results)
+
+            # Source File Removal
+            if rename_destination:
+                if self._rename_file(task.source, rename_destination):
+                    copied_count += 1
+                    is_deleted = True
+                elif self._copy_file(task.source, rename_destination, rename_destination in task.collisions, results):
+                    copied_count += 1
+                else:
+                    skipped_count += 1
+        except OSError:
+            # A destination directory may have been removed since it was created, so check it again if the task is retried
+            self._forget_directories(os.path.dirname(path) for path in task.destinations)
+            raise
+        copied = time.perf_counter()
+        results.add_worker_time("copy", copied - start)
+        if task.remove_source and not is_deleted:
+            os.remove(task.source.path)
+            self.logger.debug(f"Removed source file \"{task.source.path}\"")
+            is_deleted = True
+            results.add_worker_time("delete", time.perf_counter() - copied)
+
+        if copied_count > 0 and is_deleted:
+            results.increment_moved(copied_count)
+        elif copied_count > 0:
+            results.increment_copied(copied_count)
+        elif is_deleted:
+            results.increment_deleted()
+
+        results.increment_skipped(skipped_count)
+        return results
+
+    def _create_executor(self) -> Executor:
+        if self.config.executor == ExecutorType.PROCESS:
+            return ProcessPoolExecutor(max_workers=self.config.max_workers, initializer=_init_worker_mover, initargs=(self._kwargs,))
+        return ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix=self.config.mover_name)
+
+    def _collect_finished(self, futures: Iterable[Future], tasks: dict[Future, MoveTask], results: ExecutionResults, retries: RetryQueue):
+        # Merge every finished result before re-raising an interrupt so completed work is still counted
+        interrupt = None
+        for future in futures:
+            task = tasks.pop(future)
+            try:
+                task_results = future.result()
+            except Exception as e:
+                self._on_task_failed(task, e, results, retries)
+                continue
+            except BaseException as e:
+                interrupt = interrupt or e
+                continue
+            if self.config.executor == ExecutorType.PROCESS:
+                task_results, hash_entries = task_results
+                if hash_entries:
+                    self._get_hash_cache().merge(hash_entries)
+            results.merge(task_results)
+            self._on_task_finished(task)
+        if interrupt:
+            raise interrupt
+
+    def _run_tasks_in_pool(self, tasks: Iterable[MoveTask], results: ExecutionResults, retries: RetryQueue):
+        execute = _execute_task_in_worker if self.config.executor == ExecutorType.PROCESS else self._execute_task
+        # Only keep a few tasks per worker queued so the scan doesn't run ahead of the copies
+        max_pending = self.config.max_workers * 4
+        pending: dict[Future, MoveTask] = {}
+        with self._create_executor() as executor:
+            try:
+                for task_round in self._iter_task_rounds(tasks, retries):
+                    for task in task_round:
+                        pending[executor.submit(execute, task)] = task
+                        if len(pending) >= max_pending:
+                            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                            self._collect_finished(done, pending, results, retries)
+                    done, _ = wait(pending)
+                    self._collect_finished(done, pending, results, retries)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+    def _run_tasks(self, tasks: Iterable[MoveTask], results: ExecutionResults):
+        """
+        Run every task, isolating errors to the file that caused them. Files that fail with a retryable error are retried
+        (see RetryConfig) while the rest of the run continues
+        """
+        retries = RetryQueue(self.config.retry_config)
+        start = time.perf_counter()
+        planning_time = results.planning_time
+        try:
+            if self.config.max_workers > 1:
+                self._run_tasks_in_pool(tasks, results, retries)
+                return
+            for task_round in self._iter_task_rounds(tasks, retries):
+                for task in task_round:
+                    try:
+                        task_results = self._execute_task(task)
+                    except Exception as e:
+                        self._on_task_failed(task, e, results, retries)
+                        continue
+                    results.merge(task_results)
+                    self._on_task_finished(task)
+        finally:
+            # Tasks are planned as they're needed, so the time spent planning them isn't time spent running them
+            results.add_task_time(time.perf_counter() - start - (results.planning_time - planning_time))
+
+    def _refresh_run_timestamp(self):
         if self.config.rename_config:
-            self.logger.debug(f"Applying rename configuration: {self.config.rename_config}")
-            destination_file_name = self.config.rename_config.apply_rename(os.path.basename(source_path)) if self.config.rename_config else os.path.basename(source_path)
-            self.logger.debug(f"Renaming file to \"{destination_file_name}\"")
+            self.config.rename_config.add_timestamp.refresh_timestamp()
+
+    def _start_run(self) -> ExecutionResults:
+        results = ExecutionResults()
+        results.start()
+        # The destination index only lives for one run so changes made outside the mover are picked up next time
+        self._destination_index = self._create_destination_index()
+        self._known_directories.clear()
+        self._refresh_run_timestamp()
+        if not self._removed_stale_temp_files:
+            self._remove_stale_temp_files()
+            self._removed_stale_temp_files = True
+        return results
+
+    def _remove_stale_temp_files(self):
+        for directory in self.config.destination_directories:
+            try:
+                removed = remove_stale_temp_files(directory, STALE_TEMP_FILE_SECONDS)
+            except OSError as e:
+                self.logger.warning(f"Failed to remove temporary files from destination directory \"{directory}\": {e}")
+                continue
+            for path in removed:
+                self.logger.info(f"Removed temporary file \"{path}\" left by a copy that never finished")
+
+    def _sync_written_directories(self, results: ExecutionResults):
+        """
+        Flush every destination directory written to during the run to disk (the per_run fsync mode)
+        """
+        for directory in sorted(self._written_directories):
+            try:
+                fsync_directory(directory)
+            except OSError as e:
+                self.logger.warning(f"Failed to flush directory \"{directory}\" to disk: {e}")
+                results.increment_errors()
+        self._written_directories.clear()
+
+    def _save_hash_cache(self, results: ExecutionResults):
+        if self._hash_cache is None:
+            return
+        try:
+            self._hash_cache.save()
+        except OSError as e:
+            self.logger.warning(f"Failed to save hash cache \"{self._hash_cache.file_path}\": {e}")
+            results.increment_errors()
+
+    def _finish_run(self, results: ExecutionResults, interrupted: bool = False):
+        # Before the journal is closed, so a run isn't treated as complete until its renames are durable
+        self._sync_written_directories(results)
+        self._save_hash_cache(results)
+        if self._journal:
+            try:
+                self._journal.close(interrupted=interrupted)
+            except OSError as e:
+                self.logger.warning(f"Failed to close journal \"{self._journal.file_path}\": {e}")
+                results.increment_errors()
+            self._journal = None
+        if self._source_index:
+            try:
+                self._source_index.save(complete=results.errors == 0)
+            except OSError as e:
+                self.logger.warning(f"Failed to save source index \"{self._source_index.file_path}\": {e}")
+                results.increment_errors()
+            self._source_index = None
+        results.finish()
+
+    def _log_run_error(self, error: BaseException):
+        if isinstance(error, KeyboardInterrupt):
+            self.logger.error(f"Mover \"{self.config.mover_name}\" was interrupted")
         else:
-            destination_file_name = os.path.basename(source_path)
-        return os.path.join(destination_directory, destination_file_name)
+            self.logger.error(f"Mover \"{self.config.mover_name}\" stopped because of an error: {error}", exc_info=error)
 
     def _run_move_files(self) -> ExecutionResults:
-        results = ExecutionResults()
+        results = self._start_run()
+        interrupted = False
         try:
             if not self.config.source_directories or not self.config.destination_directories:
                 raise ValueError("Source and destination directories must be specified.")
-            for source_dir in self.config.source_directories:
-                if self.config.recursive:
-                    walker = os.walk(source_dir)
-                else:
-                    walker = [(source_dir, [], os.listdir(source_dir))]
-
-                for root, _, files in walker:
-                    for file_name in files:
-                        is_copied = False
-                        is_deleted = False
-
-                        if not self.matches_filename(file_name):
-                            continue
-
-                        source_path = os.path.join(root, file_name)
-                        destinations, collisions = self._get_destination_files_for_source(source_path)
-                        self.logger.debug(f"File \"{file_name}\" matched on mover \"{self.config}\" with {len(destinations)} destination(s) and {len(collisions)} collision(s)")
-
-                        if self._should_skip_move(destinations, collisions):
-                            self.logger.debug(f"{len(collisions)} collision(s) would result from the current move operation - this file will be skipped: \"{source_path}\"")
-                            continue
-
-                        # File Copying
-                        copied_count = 0
-                        skipped_count = 0
-                        for destination_file_path in destinations:
-                            is_copied = self._copy_file(source_path, destination_file_path)
-                            if is_copied:
-                                copied_count += 1
-                            else:
-                                skipped_count += 1
-
-                        # Source File Removal
-                        is_deleted = self._handle_source_file_removal(source_path, destinations, collisions)
-                        
-                        if copied_count > 0 and is_deleted:
-                            results.increment_moved(copied_count)
-                        elif copied_count > 0:
-                            results.increment_copied(copied_count)
-                        elif is_deleted:
-                            results.increment_deleted()
-                        
-                        results.increment_skipped(skipped_count)
+            self._source_index = self._create_source_index()
+            self._journal = self._create_journal()
+            tasks = self._iter_tasks(self._scan_source_files(self._source_index), results)
+            if self._journal:
+                tasks = self._journal_tasks(tasks)
+            self._run_tasks(tasks, results)
 
         except BaseException as e:
+            self._log_run_error(e)
             results.increment_errors()
-        
+            interrupted = True
+
+        self._finish_run(results, interrupted)
         return results
 
-    def move_files(self):
+    def process_files(self, file_paths: Iterable[str]) -> ExecutionResults:
         """
-        Run the mover based on its configuration to move (or copy) all files in the source directories to the configured destination directories
+        Process specific source files (e.g., files reported by a watcher) instead of scanning the source directories.
+        Files that don't match the mover's criteria or no longer exist are ignored\n
+        ---\n
+        Keyword arguments:\n
+        file_paths -- full paths to files in the mover's source directories
         """
-        self.logger.debug(f"Starting mover \"{self.config}\"")
-        results = self._run_move_files()
+        results = ExecutionResults()
+        results.start()
+        if not self._destination_index:
+            self._destination_index = self._create_destination_index()
+            self._known_directories.clear()
+        self._refresh_run_timestamp()
+        try:
+            self._run_tasks(self._iter_tasks(self._iter_scanned_paths(file_paths), results), results)
+        except BaseException as e:
+            self._log_run_error(e)
+            results.increment_errors()
+            # Tasks that never ran still have their destinations reserved, so start the next batch with a new index
+            self._destination_index = None
+        self._sync_written_directories(results)
+        self._save_hash_cache(results)
+        results.finish()
+        return results
+
+    def iter_plan(self) -> Iterator[PlanEntry]:
+        """
+        Yield what the mover would do with each matched file (including renames, collisions and collision avoidance)
+        without changing anything. Only directory listings and file stats are read, never file contents
+        """
+        if not self.config.source_directories or not self.config.destination_directories:
+            raise ValueError("Source and destination directories must be specified.")
+        results = self._start_run()
+        source_index = self._create_source_index()
+        for scanned in self._filter_matched_files(self._scan_source_files(source_index)):
+            if source_index and source_index.is_file_unchanged(scanned):
+                yield PlanEntry.skipped(scanned, "unchanged")
+                continue
+            task = self._plan_task(scanned, results)
+            if not task:
+                yield PlanEntry.skipped(scanned, self.config.collision_avoidance_behavior.value)
+                continue
+            self._reserve_destinations(task)
+            yield PlanEntry.from_task(task, self.config.destination_collision_behavior == DestinationCollisionBehavior.OVERWRITE, self.config.keep_source_behavior.value)
+
+    def write_plan(self, file_path: str) -> int:
+        """
+        Write the mover's plan (see iter_plan) to a JSON-lines file, or to standard output if file_path is "-".
+        Returns the number of files in the plan
+        """
+        return write_plan(self.iter_plan(), file_path, self.config.mover_name)
+
+    def _iter_plan_tasks(self, entries: Iterable[PlanEntry], results: ExecutionResults) -> Iterator[MoveTask]:
+        for entry in entries:
+            if entry.action == PlanAction.SKIP:
+                continue
+            try:
+                scanned = ScannedFile.from_path(entry.source)
+                is_stale = (scanned.size, scanned.mtime_ns) != (entry.size, entry.mtime_ns)
+            except FileNotFoundError:
+                is_stale = True
+            # A new file at a destination the plan expected to be free would change what should happen to the source
+            is_stale = is_stale or any(action == DestinationAction.WRITE and os.path.exists(path) for path, action in entry.destinations)
+            if is_stale:
+                self.logger.warning(f"File \"{entry.source}\" or its destinations changed since the plan was made. Skipping")
+                results.increment_skipped()
+                continue
+            yield entry.to_task(scanned)
+
+    def execute_plan(self, file_path: str) -> ExecutionResults:
+        """
+        Apply a plan written by write_plan, using the mover's worker pool when max_workers is more than 1. Entries whose
+        source file or destinations changed since planning are skipped. Returns the results of the run
+        """
+        results = self._start_run()
+        try:
+            self._source_index = self._create_source_index()
+            self._run_tasks(self._iter_plan_tasks(read_plan(file_path), results), results)
+        except BaseException as e:
+            self.logger.error(f"Failed to execute plan \"{file_path}\": {e}")
+            results.increment_errors()
+        self._finish_run(results)
+        self._report_results(results)
+        return results
+
+    def watch(self, debounce: float = 0.5, poll_interval: float = 2.0, max_batch_size: int = 1000, force_polling: bool = False, stop_event: threading.Event | None = None):
+        """
+        Run the mover once, then keep running and process files as soon as they're written to (or moved into) the source
+        directories, until stop_event is set. Uses inotify on Linux and polling everywhere else\n
+        ---\n
+        Keyword arguments:\n
+        debounce -- seconds to wait for more changes before processing a batch of changed files\n
+        poll_interval -- seconds between scans when polling for changes\n
+        max_batch_size -- the most files to collect before processing a batch, even if files are still changing\n
+        force_polling -- poll for changes even if inotify is available\n
+        stop_event -- set this event to stop watching
+        """
+        stop_event = stop_event or threading.Event()
+        self.move_files()
+        with create_watcher(self.config.source_directories, self.config.recursive, poll_interval, force_polling) as watcher:
+            self.logger.info(f"Mover \"{self.config.mover_name}\" watching for changes with {type(watcher).__name__}")
+            index_created = time.monotonic()
+            while not stop_event.is_set():
+                changed = watcher.wait_for_changes(timeout=1.0)
+                if not changed:
+                    continue
+                # Keep collecting until the source directories are quiet for the debounce period or the batch is full
+                while len(changed) < max_batch_size and not stop_event.is_set():
+                    more = watcher.wait_for_changes(timeout=debounce)
+                    if not more:
+                        break
+                    changed |= more
+
+                if time.monotonic() - index_created > WATCH_INDEX_REFRESH_SECONDS:
+                    self._destination_index = None
+                    index_created = time.monotonic()
+                self.logger.debug(f"Processing {len(changed)} changed file(s)")
+                results = self.process_files(sorted(changed))
+                self._report_results(results)
+
+    def _log_results(self, results: ExecutionResults):
         messages = []
         if results.moved > 0:
             messages.append(f"Moved {results.moved} file{'' if results.moved == 1 else 's'}")
@@ -215,11 +1064,37 @@ class Mover:
             messages.append(f"Copied {results.copied} file{'' if results.copied == 1 else 's'}")
         if results.deleted > 0:
             messages.append(f"Deleted {results.deleted} file{'' if results.deleted == 1 else 's'}")
+        if results.hardlinked > 0:
+            messages.append(f"Hardlinked {results.hardlinked} file{'' if results.hardlinked == 1 else 's'} instead of copying")
+        if results.reflinked > 0:
+            messages.append(f"Reflinked {results.reflinked} file{'' if results.reflinked == 1 else 's'} instead of copying")
+        if results.deferred > 0:
+            messages.append(f"Deferred {results.deferred} file{'' if results.deferred == 1 else 's'} that {'was' if results.deferred == 1 else 'were'} still being written")
+        if results.failed_files:
+            messages.append(f"Failed to process {len(results.failed_files)} file{'' if len(results.failed_files) == 1 else 's'}")
         message = f"Mover \"{self.config.mover_name}\" completed"
+        if results.duration is not None:
+            message = message + f" in {results.duration:.2f}s"
         if len(messages) > 0:
             message = message + "\n\t" + '\n\t'.join(messages)
         else:
             message = message + " - no files to move"
         self.logger.info(message)
+        if results.files_per_second:
+            phase_times = ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in results.phase_times.items())
+            self.logger.debug(f"{results.files_per_second:.1f} files/s, {results.bytes_copied} bytes copied ({phase_times})")
+
+    def _report_results(self, results: ExecutionResults):
+        self._log_results(results)
         if self.mover_id:
             self.metadata.update(self.mover_id, results)
+
+    def move_files(self) -> ExecutionResults:
+        """
+        Run the mover based on its configuration to move (or copy) all files in the source directories to the configured
+        destination directories. Returns the results of the run
+        """
+        self.logger.debug(f"Starting mover \"{self.config}\"")
+        results = self._run_move_files()
+        self._report_results(results)
+        return results
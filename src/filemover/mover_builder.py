@@ -1,6 +1,6 @@
-from filemover.rename_config import TimestampPosition
+from filemover.rename_config import TimestampPosition, TimestampSource
 from filemover.mover_config import KeepSourceBehavior, CollisionAvoidanceBehavior, DestinationCollisionBehavior
-from filemover.match_files_config import FileNameMatchMode, FileTypeMatchMode, FileMatchRuleOperator, FileMatchType
+from filemover.match_files_config import FileNameMatchMode, FileTypeMatchMode, FileSizeMatchMode, FileTimeMatchMode, FileTimeAttribute, FileMatchRuleOperator, FileMatchType, parse_size, parse_time
 
 from colorama import Fore, Style
 import os
@@ -160,6 +160,8 @@ class MoverConfigBuilder:
                 self.set_rename_timestamp_timezone(value)
             elif option == 'position':
                 self.set_rename_timestamp_position(value)
+            elif option == 'source':
+                self.set_rename_timestamp_source(value)
             else:
                 raise ValueError(f"{ERROR_COLOR}Unknown rename timestamp config option '{option}'")
         except ValueError as e:
@@ -287,6 +289,17 @@ class MoverConfigBuilder:
         self.config['rename']['timestamp'] = timestamp
         self._print_set_message("Timestamp Position", value, 'rename')
         return self
+    def set_rename_timestamp_source(self, value):
+        timestamp = self._create_or_get_timestamp()
+        if not value or len(value) < 1:
+            timestamp["source"] = None
+            return
+        if value not in [member.value for member in TimestampSource]:
+            raise ValueError(f"{ERROR_COLOR}Invalid source: {value}. Must be one of {', '.join([member.value for member in TimestampSource])}{Style.RESET_ALL}")
+        timestamp["source"] = value
+        self.config['rename']['timestamp'] = timestamp
+        self._print_set_message("Timestamp Source", value, 'rename')
+        return self
 
     def set_source_directory(self, value):
         self._validate_path(value)
@@ -564,14 +577,14 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
         )
         selected_option = option_map.get(menu_option, None)
         
-        if selected_option == FileTypeMatchMode.SINGLE_EXACT:
+        if selected_option == FileTypeMatchMode.SINGLE_EXACT.value:
             # Single File Type
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a {PARAMETER_COLOR}file type{Style.RESET_ALL} (without the preceding '.'): ").strip().lower(),
                 input_condition=lambda x: x.isalnum(),
                 invalid_message="Please enter a valid file type (alphanumeric characters only, no spaces or dots)"
             )
-        elif selected_option == FileTypeMatchMode.MULTIPLE_EXACT:
+        elif selected_option == FileTypeMatchMode.MULTIPLE_EXACT.value:
             # Multiple File Type
             value = []
             while True:
@@ -589,14 +602,14 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
                     print(f"{VALUE_COLOR}{file_type}{Style.RESET_ALL} already included in {PARAMETER_COLOR}file types{Style.RESET_ALL}")
                 else:
                     value.append(file_type)
-        elif selected_option == FileTypeMatchMode.REGEX_INCLUDE:
+        elif selected_option == FileTypeMatchMode.REGEX_INCLUDE.value:
             # Regex (include) File Type
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a regular expression to match {PARAMETER_COLOR}file type{Style.RESET_ALL}: ").strip(),
                 input_condition=lambda x: self._is_valid_regex(x),
                 invalid_message="The specified input is not a valid regular expression"
             )
-        elif selected_option == FileTypeMatchMode.REGEX_EXCLUDE:
+        elif selected_option == FileTypeMatchMode.REGEX_EXCLUDE.value:
             # Regex (exclude) File Type
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a regular expression to exclude {PARAMETER_COLOR}file type{Style.RESET_ALL}: ").strip(),
@@ -624,14 +637,14 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
         )
         selected_option = option_map.get(menu_option, None)
 
-        if selected_option == FileNameMatchMode.SINGLE_EXACT:
+        if selected_option == FileNameMatchMode.SINGLE_EXACT.value:
             # Single Exact Name
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a {PARAMETER_COLOR}file name{Style.RESET_ALL} {Fore.BLACK}(note: do not include a file type extension - it will not be matched by this filter){Style.RESET_ALL}: ").strip(),
                 input_condition=lambda x: len(x) > 0,
                 invalid_message="Please enter a valid file name"
             )
-        elif selected_option == FileNameMatchMode.MULTIPLE_EXACT:
+        elif selected_option == FileNameMatchMode.MULTIPLE_EXACT.value:
             # Multiple Exact Name
             value = []
             while True:
@@ -649,35 +662,35 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
                     print(f"{VALUE_COLOR}{file_name}{Style.RESET_ALL} already included in {PARAMETER_COLOR}file names{Style.RESET_ALL}")
                 else:
                     value.append(file_name)
-        elif selected_option == FileNameMatchMode.CONTAINS:
+        elif selected_option == FileNameMatchMode.CONTAINS.value:
             # Contains
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a substring to match within a {PARAMETER_COLOR}file name{Style.RESET_ALL} (without the file type extension): ").strip(),
                 input_condition=lambda x: len(x) > 0,
                 invalid_message="Please enter a valid file name substring"
             )
-        elif selected_option == FileNameMatchMode.STARTS_WITH:
+        elif selected_option == FileNameMatchMode.STARTS_WITH.value:
             # Starts With
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a substring to match the start of a {PARAMETER_COLOR}file name{Style.RESET_ALL}: ").strip(),
                 input_condition=lambda x: len(x) > 0,
                 invalid_message="Please enter a valid file name substring"
             )
-        elif selected_option == FileNameMatchMode.ENDS_WITH:
+        elif selected_option == FileNameMatchMode.ENDS_WITH.value:
             # Ends With
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a substring to match the end of a {PARAMETER_COLOR}file name{Style.RESET_ALL} (without the file type extension): ").strip(),
                 input_condition=lambda x: len(x) > 0,
                 invalid_message="Please enter a valid file name substring"
             )
-        elif selected_option == FileNameMatchMode.REGEX_INCLUDE:
+        elif selected_option == FileNameMatchMode.REGEX_INCLUDE.value:
             # Regex (include)
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a regex pattern to match files by {PARAMETER_COLOR}file name{Style.RESET_ALL}: ").strip(),
                 input_condition=lambda x: self._is_valid_regex(x),
                 invalid_message="The specified input is not a valid regular expression"
             )
-        elif selected_option == FileNameMatchMode.REGEX_EXCLUDE:
+        elif selected_option == FileNameMatchMode.REGEX_EXCLUDE.value:
             # Regex (exclude)
             value = self._repeat_prompt_until_valid(
                 lambda: input(f"Enter a regex pattern to exclude files by {PARAMETER_COLOR}file name{Style.RESET_ALL}: ").strip(),
@@ -689,6 +702,73 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
         else:
             raise ValueError("Unhandled or unknown file name filter type")
         self.add_match_files_rule({'type': FileMatchType.FILE_NAME.value, 'mode': selected_option, 'value': value})
+    def _is_valid_size(self, value):
+        try:
+            parse_size(value)
+            return True
+        except ValueError:
+            return False
+    def _is_valid_time(self, value):
+        try:
+            parse_time(value)
+            return True
+        except ValueError:
+            return False
+    def _interactive_file_size_filter(self):
+        prompt_map = {}
+        option_map = {}
+        option_map[''] = None
+        for i in range(len(FileSizeMatchMode)):
+            prompt_map[f"{i}"] = list(FileSizeMatchMode)[i].description
+            option_map[f"{i}"] = list(FileSizeMatchMode)[i].value
+
+        menu_option = self._repeat_prompt_until_valid(
+            lambda: input(self._get_menu_text(f"Which kind of {PARAMETER_COLOR}file size filter{Style.RESET_ALL} would you like to configure?", prompt_map)).strip(),
+            input_condition=lambda x: x in [str(v) for v in range(len(FileSizeMatchMode))],
+            invalid_message="Please enter a valid menu option"
+        )
+        selected_option = option_map.get(menu_option, None)
+        if selected_option is None:
+            return
+        value = self._repeat_prompt_until_valid(
+            lambda: input(f"Enter a {PARAMETER_COLOR}file size{Style.RESET_ALL} in bytes or with a unit (e.g., 10MB or 1.5GiB): ").strip(),
+            input_condition=lambda x: self._is_valid_size(x),
+            invalid_message="Please enter a valid file size"
+        )
+        self.add_match_files_rule({'type': FileMatchType.FILE_SIZE.value, 'mode': selected_option, 'value': int(value) if value.isdigit() else value})
+    def _interactive_file_time_filter(self):
+        prompt_map = {}
+        option_map = {}
+        option_map[''] = None
+        for i in range(len(FileTimeMatchMode)):
+            prompt_map[f"{i}"] = list(FileTimeMatchMode)[i].description
+            option_map[f"{i}"] = list(FileTimeMatchMode)[i].value
+
+        menu_option = self._repeat_prompt_until_valid(
+            lambda: input(self._get_menu_text(f"Which kind of {PARAMETER_COLOR}file time filter{Style.RESET_ALL} would you like to configure?", prompt_map)).strip(),
+            input_condition=lambda x: x in [str(v) for v in range(len(FileTimeMatchMode))],
+            invalid_message="Please enter a valid menu option"
+        )
+        selected_option = option_map.get(menu_option, None)
+        if selected_option is None:
+            return
+        value = self._repeat_prompt_until_valid(
+            lambda: input(f"Enter a {PARAMETER_COLOR}file age{Style.RESET_ALL} (e.g., 30m, 12h or 7d) or {PARAMETER_COLOR}date{Style.RESET_ALL} (e.g., 2024-01-31): ").strip(),
+            input_condition=lambda x: self._is_valid_time(x),
+            invalid_message="Please enter a valid age or date"
+        )
+
+        prompt_map = {}
+        option_map = {}
+        for i in range(len(FileTimeAttribute)):
+            prompt_map[f"{i}"] = list(FileTimeAttribute)[i].description
+            option_map[f"{i}"] = list(FileTimeAttribute)[i].value
+        menu_option = self._repeat_prompt_until_valid(
+            lambda: input(self._get_menu_text(f"Which {PARAMETER_COLOR}file time{Style.RESET_ALL} should be matched?", prompt_map)).strip(),
+            input_condition=lambda x: x in option_map,
+            invalid_message="Please enter a valid menu option"
+        )
+        self.add_match_files_rule({'type': FileMatchType.FILE_TIME.value, 'mode': selected_option, 'value': value, 'time_attribute': option_map[menu_option]})
 
     def _interactive_filters(self):
         prompt_map = {}
@@ -701,6 +781,7 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
 
         has_file_type_filter = False
         has_name_filter = False
+        has_stat_filter = False
         while True:
             menu_option = self._repeat_prompt_until_valid(
                 lambda: input(self._get_menu_text(f"Select a {PARAMETER_COLOR}file filter mode{Style.RESET_ALL} to configure (you will have the chance to define multiple):", prompt_map)).strip(),
@@ -708,16 +789,22 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
                 invalid_message="Please enter a valid menu option"
             )
             selected_option = option_map.get(menu_option, None)
-            if selected_option == FileMatchType.FILE_TYPE:
+            if selected_option == FileMatchType.FILE_TYPE.value:
                 self._interactive_file_type_filter()
                 has_file_type_filter = True
-            elif selected_option == FileMatchType.FILE_NAME:
+            elif selected_option == FileMatchType.FILE_NAME.value:
                 self._interactive_file_name_filter()
                 has_name_filter = True
+            elif selected_option == FileMatchType.FILE_SIZE.value:
+                self._interactive_file_size_filter()
+                has_stat_filter = True
+            elif selected_option == FileMatchType.FILE_TIME.value:
+                self._interactive_file_time_filter()
+                has_stat_filter = True
             elif selected_option is None:
-                if not has_file_type_filter and not has_name_filter:
+                if not has_file_type_filter and not has_name_filter and not has_stat_filter:
                     menu_option = self._repeat_prompt_until_valid(
-                        lambda: input(self._get_menu_text(f"{ERROR_COLOR}Neither a file type nor file name filter has been defined. This will match ALL files in the source directory. Is this correct?{Style.RESET_ALL}", {'0': 'No', '1': 'Yes'})).strip(),
+                        lambda: input(self._get_menu_text(f"{ERROR_COLOR}No file filter has been defined. This will match ALL files in the source directory. Is this correct?{Style.RESET_ALL}", {'0': 'No', '1': 'Yes'})).strip(),
                         input_condition=lambda x: x in ['0', '1'],
                         invalid_message="Please enter a valid menu option"
                     )
@@ -840,6 +927,14 @@ class InteractiveMoverConfigBuilder(MoverConfigBuilder):
             invalid_message=None
         )
 
+        source_map = {'0': TimestampSource.RUN_START.value, '1': TimestampSource.NOW.value, '2': TimestampSource.FILE_MTIME.value, '3': TimestampSource.FILE_CTIME.value}
+
+        menu_option = self._repeat_prompt_until_valid(
+            lambda: input(self._get_menu_text(f"Select the {PARAMETER_COLOR}time{Style.RESET_ALL} the timestamp should show:", {'0': 'Run Start', '1': 'Now (when each file is renamed)', '2': 'File Modified Time', '3': 'File Changed Time (Created on Windows)'})).strip(),
+            input_condition=lambda x: self._try_set_timestamp_option('source', source_map.get(x)),
+            invalid_message=None
+        )
+
     def _interactive_rename_config(self):
         menu_option = self._repeat_prompt_until_valid(
             lambda: input(self._get_menu_text(f"Would you like to configure {PARAMETER_COLOR}renaming files{Style.RESET_ALL} when they're moved?", {'0': 'No', '1': 'Yes'})).strip(),
@@ -1,6 +1,13 @@
 from __future__ import annotations
 from filemover.rename_config import RenameConfig
 from filemover.match_files_config import FileMatchConfig
+from filemover.file_copy import CopyBackendType, LinkMode, FsyncMode, DEFAULT_CHUNK_SIZE
+from filemover.destination_index import DEFAULT_MAX_ENTRIES
+from filemover.source_index import IncrementalConfig
+from filemover.journal import JournalConfig
+from filemover.retry import RetryConfig
+from filemover.settle import SettleConfig
+from filemover.content_hash import ContentCompareConfig
 from enum import Enum
 import os
 
@@ -73,6 +80,25 @@ class DestinationCollisionBehavior(Enum):
         else:
             return "UNKNOWN"
 
+class ExecutorType(Enum):
+    THREAD = 'thread'
+    PROCESS = 'process'
+
+    @classmethod
+    def from_string(cls, position: str) -> 'ExecutorType':
+        if position not in cls._value2member_map_:
+            raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}")
+        return ExecutorType(cls._value2member_map_[position])
+
+    @property
+    def description(self) -> str:
+        if self == ExecutorType.THREAD:
+            return "Process files with a pool of worker threads"
+        elif self == ExecutorType.PROCESS:
+            return "Process files with a pool of worker processes"
+        else:
+            return "UNKNOWN"
+
 class MoverConfig:
     def __init__(self, **kwargs):
         self._mover_name = kwargs.get('mover_name', 'default_mover')
@@ -98,6 +124,29 @@ class MoverConfig:
         self._recursive = kwargs.get('recursive', False)
         self._destination_collision_behavior = DestinationCollisionBehavior.from_string(kwargs.get('destination_collision_behavior', 'ignore'))
         self._collision_avoidance_behavior = CollisionAvoidanceBehavior.from_string(kwargs.get('collision_avoidance_behavior', 'none'))
+        self._max_workers = kwargs.get('max_workers', 1)
+        self._executor = ExecutorType.from_string(kwargs.get('executor', 'thread'))
+        self._copy_backend = CopyBackendType.from_string(kwargs.get('copy_backend', 'auto'))
+        self._copy_chunk_size = kwargs.get('copy_chunk_size', DEFAULT_CHUNK_SIZE)
+        self._link_mode = LinkMode.from_string(kwargs.get('link_mode', 'copy'))
+        self._atomic_writes = kwargs.get('atomic_writes', True)
+        self._fsync = FsyncMode.from_string(kwargs.get('fsync', 'none'))
+        self._index_destinations = kwargs.get('index_destinations', True)
+        self._destination_index_max_entries = kwargs.get('destination_index_max_entries', DEFAULT_MAX_ENTRIES)
+
+        self._incremental_config = IncrementalConfig(**kwargs.get('incremental', {}))
+        if not self._incremental_config.enabled:
+            self._incremental_config = None
+        self._journal_config = JournalConfig(**kwargs.get('journal', {}))
+        if not self._journal_config.enabled:
+            self._journal_config = None
+        self._retry_config = RetryConfig(**kwargs.get('retry', {}))
+        self._settle_config = SettleConfig(**kwargs.get('settle', {}))
+        if not self._settle_config.enabled:
+            self._settle_config = None
+        self._compare_contents_config = ContentCompareConfig(**kwargs.get('compare_contents', {}))
+        if not self._compare_contents_config.enabled:
+            self._compare_contents_config = None
         self._validate()
 
     def __str__(self):
@@ -135,12 +184,64 @@ class MoverConfig:
     @property
     def collision_avoidance_behavior(self) -> 'CollisionAvoidanceBehavior':
         return self._collision_avoidance_behavior
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+    @property
+    def executor(self) -> ExecutorType:
+        return self._executor
+    @property
+    def copy_backend(self) -> CopyBackendType:
+        return self._copy_backend
+    @property
+    def copy_chunk_size(self) -> int:
+        return self._copy_chunk_size
+    @property
+    def link_mode(self) -> LinkMode:
+        return self._link_mode
+    @property
+    def atomic_writes(self) -> bool:
+        return self._atomic_writes
+    @property
+    def fsync(self) -> FsyncMode:
+        return self._fsync
+    @property
+    def index_destinations(self) -> bool:
+        return self._index_destinations
+    @property
+    def destination_index_max_entries(self) -> int | None:
+        return self._destination_index_max_entries
+    @property
+    def incremental_config(self) -> IncrementalConfig | None:
+        return self._incremental_config
+    @property
+    def journal_config(self) -> JournalConfig | None:
+        return self._journal_config
+    @property
+    def retry_config(self) -> RetryConfig:
+        return self._retry_config
+    @property
+    def settle_config(self) -> SettleConfig | None:
+        return self._settle_config
+    @property
+    def compare_contents_config(self) -> ContentCompareConfig | None:
+        return self._compare_contents_config
 
     def _validate(self):
         if not self._source_directories or len(self._source_directories) < 1:
             raise ValueError("At least one source directory must be specified")
         if not self._destination_directories or len(self._destination_directories) < 1:
             raise ValueError("At least one destination directory must be specified")
+        if not isinstance(self._max_workers, int) or isinstance(self._max_workers, bool) or self._max_workers < 1:
+            raise ValueError('Property "max_workers" must be a positive integer')
+        if not isinstance(self._copy_chunk_size, int) or isinstance(self._copy_chunk_size, bool) or self._copy_chunk_size < 1:
+            raise ValueError('Property "copy_chunk_size" must be a positive integer')
+        if not isinstance(self._atomic_writes, bool):
+            raise ValueError('Property "atomic_writes" must be a boolean')
+        if not isinstance(self._index_destinations, bool):
+            raise ValueError('Property "index_destinations" must be a boolean')
+        if self._destination_index_max_entries is not None and (not isinstance(self._destination_index_max_entries, int) or isinstance(self._destination_index_max_entries, bool) or self._destination_index_max_entries < 0):
+            raise ValueError('Property "destination_index_max_entries" must be a non-negative integer or null')
         
         # TODO: Add validation functions to sub-configs and check them here
         if self._match_files_config and not isinstance(self._match_files_config, FileMatchConfig):
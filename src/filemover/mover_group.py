@@ -0,0 +1,152 @@
+from __future__ import annotations
+from filemover.mover import Mover
+from filemover.shared_scan import SharedScanCoordinator, group_movers_by_source
+from filemover.logger import create_logger
+from filemover.metadata import ExecutionResults
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+import threading
+import time
+import os
+
+DEFAULT_MAX_MOVERS_PER_DEVICE = 1
+
+class MoverGroup:
+    """
+    Runs several movers from one configuration concurrently. At most max_workers movers run at once, and at most
+    max_movers_per_device movers use the same device (as a source or destination) at once, so movers sharing a disk
+    take turns instead of competing for it. With shared_scan, movers that share source directories run together with a
+    single scan of each directory (see SharedScanCoordinator)
+    """
+    def __init__(self, **kwargs) -> None:
+        self._group_name = kwargs.get('group_name', 'MoverGroup')
+        mover_configs = kwargs.get('movers', None)
+        self._max_workers = kwargs.get('max_workers', None)
+        self._max_movers_per_device = kwargs.get('max_movers_per_device', DEFAULT_MAX_MOVERS_PER_DEVICE)
+        self._shared_scan = kwargs.get('shared_scan', False)
+        verbose = kwargs.get('verbose', True)
+        log_file = kwargs.get('log_file', None)
+
+        if not isinstance(self._group_name, str):
+            raise TypeError("Group name must be a string")
+        if not isinstance(mover_configs, list) or not mover_configs:
+            raise ValueError("Movers must be a non-empty list of mover configurations")
+        if not all(isinstance(mover_config, dict) for mover_config in mover_configs):
+            raise TypeError("Each mover configuration must be a dictionary")
+        if self._max_workers is None:
+            self._max_workers = min(len(mover_configs), os.cpu_count() or 1)
+        if not isinstance(self._max_workers, int) or isinstance(self._max_workers, bool) or self._max_workers < 1:
+            raise ValueError("Max workers must be a positive integer")
+        if not isinstance(self._shared_scan, bool):
+            raise TypeError("Shared scan must be a boolean value")
+        if self._max_movers_per_device is not None and (not isinstance(self._max_movers_per_device, int) or isinstance(self._max_movers_per_device, bool) or self._max_movers_per_device < 1):
+            raise ValueError("Max movers per device must be a positive integer")
+
+        self.logger = create_logger(self._group_name, verbose, log_file)
+        # Movers inherit the group's logging options unless they set their own
+        self._movers = [Mover(**{'verbose': verbose, 'log_file': log_file, **mover_config}) for mover_config in mover_configs]
+        if self._shared_scan:
+            # The shared scan doesn't defer unsettled files or journal its tasks, so movers relying on either can't use it
+            for mover in self._movers:
+                if mover.config.settle_config or mover.config.journal_config:
+                    raise ValueError(f"Mover \"{mover.config.mover_name}\" uses \"settle\" or \"journal\", which aren't supported with \"shared_scan\"")
+        self._device_semaphores: dict[int, threading.Semaphore] = {}
+        self._semaphores_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"MoverGroup(group_name={self._group_name}, movers={len(self._movers)}, max_workers={self._max_workers}, max_movers_per_device={self._max_movers_per_device}, shared_scan={self._shared_scan})"
+
+    @property
+    def group_name(self) -> str:
+        return self._group_name
+    @property
+    def movers(self) -> list[Mover]:
+        return self._movers
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+    @property
+    def max_movers_per_device(self) -> int | None:
+        return self._max_movers_per_device
+    @property
+    def shared_scan(self) -> bool:
+        return self._shared_scan
+
+    def _get_device(self, path: str) -> int | None:
+        # Destinations may not exist until the first copy, so use the closest existing parent
+        path = os.path.abspath(path)
+        while True:
+            try:
+                return os.stat(path).st_dev
+            except OSError:
+                parent = os.path.dirname(path)
+                if parent == path:
+                    return None
+                path = parent
+
+    def _get_devices(self, movers: list[Mover]) -> list[int]:
+        directories = [directory for mover in movers for directory in [*mover.config.source_directories, *mover.config.destination_directories]]
+        # Sorted so every job acquires device slots in the same order and two jobs can't deadlock
+        return sorted({device for device in map(self._get_device, directories) if device is not None})
+
+    def _get_device_semaphore(self, device: int) -> threading.Semaphore:
+        with self._semaphores_lock:
+            if device not in self._device_semaphores:
+                self._device_semaphores[device] = threading.Semaphore(self._max_movers_per_device)
+            return self._device_semaphores[device]
+
+    def _run_job(self, movers: list[Mover]) -> list[ExecutionResults]:
+        """
+        Run a single mover, or movers that share source directories with one shared scan. Returns each mover's results
+        """
+        with ExitStack() as stack:
+            if self._max_movers_per_device:
+                for device in self._get_devices(movers):
+                    semaphore = self._get_device_semaphore(device)
+                    semaphore.acquire()
+                    stack.callback(semaphore.release)
+            if len(movers) == 1:
+                return [movers[0].move_files()]
+            results = SharedScanCoordinator(movers, logger=self.logger).run()
+            return [results[mover] for mover in movers]
+
+    def _get_jobs(self) -> list[list[Mover]]:
+        if self._shared_scan:
+            return group_movers_by_source(self._movers)
+        return [[mover] for mover in self._movers]
+
+    def run(self) -> ExecutionResults:
+        """
+        Run every mover in the group and return the combined results
+        """
+        self.logger.debug(f"Starting {len(self._movers)} movers with up to {self._max_workers} at a time")
+        start = time.monotonic()
+        results = ExecutionResults(executions=0)
+        failed = []
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=self._group_name) as executor:
+            futures = [(movers, executor.submit(self._run_job, movers)) for movers in self._get_jobs()]
+            try:
+                for movers, future in futures:
+                    try:
+                        job_results = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Mover(s) {', '.join(mover.config.mover_name for mover in movers)} failed: {e}")
+                        job_results = [ExecutionResults(errors=1) for _ in movers]
+                    for mover, mover_results in zip(movers, job_results):
+                        if mover_results.errors > 0:
+                            failed.append(mover.config.mover_name)
+                        results.merge(mover_results)
+            except BaseException:
+                # Movers that haven't started yet aren't run once the group is interrupted
+                for _, future in futures:
+                    future.cancel()
+                raise
+        self._log_results(results, failed, time.monotonic() - start)
+        return results
+
+    def _log_results(self, results: ExecutionResults, failed: list[str], duration: float):
+        message = f"Mover group \"{self._group_name}\" ran {len(self._movers)} movers in {duration:.2f}s"
+        message = message + f"\n\tMoved {results.moved}, copied {results.copied}, deleted {results.deleted} and skipped {results.skipped} files"
+        if failed:
+            message = message + f"\n\t{results.errors} error(s) in {len(failed)} mover(s): {', '.join(failed)}"
+        self.logger.info(message)
@@ -1,6 +1,15 @@
+from __future__ import annotations
 import pytz
+from filemover.scanner import ScannedFile
 from datetime import datetime
 from enum import Enum
+from typing import Callable
+import functools
+import time
+import re
+
+# How many formatted timestamps (one per second) to keep, so files from the same second are only formatted once
+TIMESTAMP_CACHE_SIZE = 1024
 
 class RenameRule:
     def __init__(self, search: str, replace: str):
@@ -22,12 +31,38 @@ class TimestampPosition(Enum):
             raise ValueError(f"Invalid position: {position}. Must be one of {list(cls._value2member_map_.keys())}.")
         return TimestampPosition(cls._value2member_map_[position])
 
+class TimestampSource(Enum):
+    RUN_START = 'run_start'
+    NOW = 'now'
+    FILE_MTIME = 'file_mtime'
+    FILE_CTIME = 'file_ctime'
+
+    @classmethod
+    def from_string(cls, source: str) -> 'TimestampSource':
+        if source not in cls._value2member_map_:
+            raise ValueError(f"Invalid source: {source}. Must be one of {list(cls._value2member_map_.keys())}.")
+        return TimestampSource(cls._value2member_map_[source])
+
+    @property
+    def description(self) -> str:
+        if self == TimestampSource.RUN_START:
+            return "The time the run started (the same for every file in a run)"
+        elif self == TimestampSource.NOW:
+            return "The time each file is renamed"
+        elif self == TimestampSource.FILE_MTIME:
+            return "The source file's last modification time"
+        elif self == TimestampSource.FILE_CTIME:
+            return "The source file's ctime (metadata change time on Unix, creation time on Windows)"
+        else:
+            return "UNKNOWN"
+
 class AddTimestampConfig:
     def __init__(self, **kwargs):
         self._enabled = kwargs.get('enabled', False)
         self._format = kwargs.get('format', '%Y-%m-%d_%H-%M-%S')
         self._timezone = kwargs.get('timezone')
         self._position = TimestampPosition.from_string(kwargs.get('position', 'after_prefix'))
+        self._source = TimestampSource.from_string(kwargs.get('source', 'run_start'))
 
         if not isinstance(self._enabled, bool):
             raise TypeError("Enabled must be a boolean value")
@@ -45,10 +80,12 @@ class AddTimestampConfig:
             raise ValueError(f"Invalid position: {self._position}. Must be one of {TimestampPosition.START}, {TimestampPosition.AFTER_PREFIX}, {TimestampPosition.BEFORE_SUFFIX}, {TimestampPosition.END}.")
         if not isinstance(self._format, str):
             raise TypeError("Format must be a string")
+        # Formats with microseconds (%f) differ within a second, so they can't be cached by the second
+        self._format_second = None if '%f' in self._format else functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)(self._format_time)
         self.refresh_timestamp()
     
     def __repr__(self):
-        return f"AddTimestampConfig(enabled={self._enabled}, format='{self._format}', timezone='{self._timezone}', position={self._position})"
+        return f"AddTimestampConfig(enabled={self._enabled}, format='{self._format}', timezone='{self._timezone}', position={self._position}, source={self._source})"
 
     @property
     def enabled(self) -> bool:
@@ -58,12 +95,49 @@ class AddTimestampConfig:
     def position(self) -> 'TimestampPosition':
         return self._position
 
+    @property
+    def source(self) -> 'TimestampSource':
+        return self._source
+
     @property
     def timestamp(self) -> str:
+        """
+        The timestamp from the last refresh (the start of the run)
+        """
         return self._timestamp
-    
+
+    def _format_time(self, seconds: float) -> str:
+        return datetime.fromtimestamp(seconds, self._timezone).strftime(self._format)
+
+    def format_time(self, seconds: float) -> str:
+        """
+        Format a POSIX timestamp, reusing the result for other times in the same second when the format allows
+        """
+        if self._format_second is None:
+            return self._format_time(seconds)
+        return self._format_second(int(seconds // 1))
+
     def refresh_timestamp(self):
-        self._timestamp = datetime.now(self._timezone).strftime(self._format)
+        """
+        Set the run start timestamp to the current time. The mover calls this at the start of every run
+        """
+        self._timestamp = self.format_time(time.time())
+
+    def get_timestamp(self, source: ScannedFile | None = None) -> str:
+        """
+        Return the timestamp for a file based on the timestamp source\n
+        ---\n
+        source -- the source file, required for the file_mtime and file_ctime sources. Its stat from scanning is reused
+        """
+        if self._source == TimestampSource.RUN_START:
+            return self._timestamp
+        elif self._source == TimestampSource.NOW:
+            return self.format_time(time.time())
+        if source is None:
+            raise ValueError(f"The {self._source.value} timestamp source requires the source file")
+        if self._source == TimestampSource.FILE_MTIME:
+            return self.format_time(source.stat.st_mtime)
+        return self.format_time(source.stat.st_ctime)
 
 class RenameConfig:
     def __init__(self, **kwargs):
@@ -73,6 +147,7 @@ class RenameConfig:
         self._prefix = kwargs.get('prefix', '')
         self._suffix = kwargs.get('suffix', '')
         self._add_timestamp = AddTimestampConfig(**kwargs.get('add_timestamp', {}))
+        self._compiled: Callable[[str], str] | None = None
 
     def __repr__(self):
         return f"RenameConfig(enabled={self._enabled}, replace_rules={self._replace_rules}, case_sensitive={self._case_sensitive}, prefix='{self._prefix}', suffix='{self._suffix}', add_timestamp={self._add_timestamp})"
@@ -101,45 +176,69 @@ class RenameConfig:
     def add_timestamp(self) -> AddTimestampConfig:
         return self._add_timestamp
 
-    def apply_rename(self, file_name: str) -> str:
+    def _compile_replacements(self) -> list[Callable[[str], str]]:
+        replacements = []
+        for rule in self.replace_rules:
+            if self.case_sensitive:
+                replacements.append(functools.partial(_replace_all, rule.search, rule.replace))
+            else:
+                # Only the matched text is replaced, so the rest of the name keeps its case
+                pattern = re.compile(re.escape(rule.search), re.IGNORECASE)
+                replacements.append(functools.partial(pattern.sub, rule.replace.replace('\\', '\\\\')))
+        return replacements
+
+    def _compile_affixes(self) -> Callable[[str, ScannedFile | None], str]:
+        prefix = self.prefix
+        suffix = self.suffix
+        add_timestamp = self.add_timestamp
+        # The timestamp is read on every call since it's refreshed every run (or differs per file)
+        get_timestamp = add_timestamp.get_timestamp
+        if not add_timestamp.enabled:
+            return lambda file_name, source: f"{prefix}{file_name}{suffix}"
+        elif add_timestamp.position == TimestampPosition.START:
+            return lambda file_name, source: f"{get_timestamp(source)}_{prefix}{file_name}{suffix}"
+        elif add_timestamp.position == TimestampPosition.AFTER_PREFIX:
+            return lambda file_name, source: f"{prefix}{get_timestamp(source)}_{file_name}{suffix}"
+        elif add_timestamp.position == TimestampPosition.BEFORE_SUFFIX:
+            return lambda file_name, source: f"{prefix}{file_name}_{get_timestamp(source)}{suffix}"
+        else:
+            return lambda file_name, source: f"{prefix}{file_name}{suffix}_{get_timestamp(source)}"
+
+    def compile(self) -> Callable[[str, ScannedFile | None], str]:
         """
-        Return the modified file name based on the configuration\n
-        ---\n
-        file_name -- the name of the file to be renamed
+        Return a function that renames a file name based on the configuration. The replace rules and where the prefix,
+        suffix and timestamp go are worked out once (and cached), rather than for every file
         """
+        if self._compiled is not None:
+            return self._compiled
         if not self.enabled:
+            self._compiled = lambda file_name, source=None: file_name
+            return self._compiled
+        replacements = self._compile_replacements()
+        add_affixes = self._compile_affixes()
+
+        def rename(file_name: str, source: ScannedFile | None = None) -> str:
+            if not file_name:
+                raise ValueError("File name cannot be empty")
+            for replacement in replacements:
+                file_name = replacement(file_name)
+            file_name = add_affixes(file_name, source)
+            # Ensure the file name is not empty after renaming
+            if not file_name:
+                raise ValueError("The resulting file name cannot be empty after applying rename rules.")
             return file_name
-        if not file_name:
-            raise ValueError("File name cannot be empty")
 
-        # Apply replace rules
-        for rule in self.replace_rules:
-            if self.case_sensitive:
-                file_name = file_name.replace(rule.search, rule.replace)
-            else:
-                file_name = file_name.lower().replace(rule.search.lower(), rule.replace)
-
-        # Add the timestamp if relative to prefix or suffix
-        if self.add_timestamp.enabled and self.add_timestamp.position == TimestampPosition.AFTER_PREFIX:
-            file_name = f"{self.add_timestamp.timestamp}_{file_name}"
-        elif self.add_timestamp.enabled and self.add_timestamp.position == TimestampPosition.BEFORE_SUFFIX:
-            file_name = f"{file_name}_{self.add_timestamp.timestamp}"
-
-        # Add prefix and suffix
-        if self.prefix:
-            file_name = f"{self.prefix}{file_name}"
-        if self.suffix:
-            file_name = f"{file_name}{self.suffix}"
-
-        # Add timestamp at the start or end
-        if self.add_timestamp.enabled:
-            if self.add_timestamp.position == TimestampPosition.START:
-                file_name = f"{self.add_timestamp.timestamp}_{file_name}"
-            elif self.add_timestamp.position == TimestampPosition.END:
-                file_name = f"{file_name}_{self.add_timestamp.timestamp}"
-
-        # Ensure the file name is not empty after renaming
-        if not file_name:
-            raise ValueError("The resulting file name cannot be empty after applying rename rules.")
-
-        return file_name
+        self._compiled = rename
+        return rename
+
+    def apply_rename(self, file_name: str, source: ScannedFile | None = None) -> str:
+        """
+        Return the modified file name based on the configuration\n
+        ---\n
+        file_name -- the name of the file to be renamed\n
+        source -- the source file, required for timestamps from the file's times
+        """
+        return self.compile()(file_name, source)
+
+def _replace_all(search: str, replace: str, file_name: str) -> str:
+    return file_name.replace(search, replace)
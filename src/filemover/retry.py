@@ -0,0 +1,150 @@
+from __future__ import annotations
+from filemover.move_task import MoveTask
+from typing import Any, Iterable, Iterator
+import itertools
+import heapq
+import errno
+import time
+
+DEFAULT_ATTEMPTS = 3
+DEFAULT_DELAY = 1.0
+DEFAULT_BACKOFF = 2.0
+DEFAULT_MAX_DELAY = 60.0
+# Errors that usually clear up on their own (e.g., a file locked by another program or a flaky network share)
+DEFAULT_RETRYABLE_ERRORS = ['EACCES', 'EAGAIN', 'EBUSY', 'EINTR', 'EIO', 'ETIMEDOUT', 'ETXTBSY']
+
+class RetryConfig:
+    def __init__(self, **kwargs) -> None:
+        self._attempts = kwargs.get('attempts', DEFAULT_ATTEMPTS)
+        self._delay = kwargs.get('delay', DEFAULT_DELAY)
+        self._backoff = kwargs.get('backoff', DEFAULT_BACKOFF)
+        self._max_delay = kwargs.get('max_delay', DEFAULT_MAX_DELAY)
+        self._retryable_errors = kwargs.get('retryable_errors', DEFAULT_RETRYABLE_ERRORS)
+
+        if not isinstance(self._attempts, int) or isinstance(self._attempts, bool) or self._attempts < 1:
+            raise ValueError("Attempts must be a positive integer")
+        if not isinstance(self._delay, (int, float)) or isinstance(self._delay, bool) or self._delay < 0:
+            raise ValueError("Delay must be a non-negative number")
+        if not isinstance(self._backoff, (int, float)) or isinstance(self._backoff, bool) or self._backoff < 1:
+            raise ValueError("Backoff must be a number of at least 1")
+        if not isinstance(self._max_delay, (int, float)) or isinstance(self._max_delay, bool) or self._max_delay < 0:
+            raise ValueError("Max delay must be a non-negative number")
+        if not isinstance(self._retryable_errors, list) or not all(isinstance(name, str) for name in self._retryable_errors):
+            raise TypeError("Retryable errors must be a list of error names")
+        unknown = [name for name in self._retryable_errors if not hasattr(errno, name)]
+        if unknown:
+            raise ValueError(f"Unknown retryable error(s): {unknown}. Must be errno names (e.g., \"EBUSY\")")
+        self._retryable_errnos = {getattr(errno, name) for name in self._retryable_errors}
+
+    def __repr__(self):
+        return f"RetryConfig(attempts={self._attempts}, delay={self._delay}, backoff={self._backoff}, max_delay={self._max_delay}, retryable_errors={self._retryable_errors})"
+
+    @property
+    def attempts(self) -> int:
+        return self._attempts
+    @property
+    def delay(self) -> float:
+        return self._delay
+    @property
+    def backoff(self) -> float:
+        return self._backoff
+    @property
+    def max_delay(self) -> float:
+        return self._max_delay
+    @property
+    def retryable_errors(self) -> list[str]:
+        return self._retryable_errors
+
+    def is_retryable(self, error: BaseException) -> bool:
+        return isinstance(error, OSError) and error.errno in self._retryable_errnos
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Return the seconds to wait before retrying a file that has failed attempt times
+        """
+        return min(self._delay * self._backoff ** (attempt - 1), self._max_delay)
+
+class DeferralQueue:
+    """
+    Items waiting to be handled later in a run, ordered by when they're ready. Deferred items wait here while the rest of
+    the run carries on
+    """
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, Any]] = []
+        # Breaks ties between items that are ready at the same time (items may not be comparable)
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(pending={len(self._heap)})"
+
+    def push(self, item: Any, delay: float):
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+
+    def pop_ready(self) -> list[Any]:
+        """
+        Remove and return every item that is ready
+        """
+        ready = []
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            ready.append(heapq.heappop(self._heap)[2])
+        return ready
+
+    def wait_for_ready(self) -> list[Any]:
+        """
+        Wait until the next item is ready, then remove and return every ready item
+        """
+        if self._heap:
+            time.sleep(max(0.0, self._heap[0][0] - time.monotonic()))
+        return self.pop_ready()
+
+    def iter_rounds(self, items: Iterable[Any]) -> Iterator[Iterable[Any]]:
+        """
+        Yield the items to handle in rounds. The first round is every item, with deferred items fitted in as soon as
+        they're ready. Each later round waits for the next deferred items to be ready. A round must be finished (including
+        deferring anything that has to be tried again) before the next one is requested
+        """
+        def with_ready_items():
+            for item in items:
+                yield from self.pop_ready()
+                yield item
+        yield with_ready_items()
+        while self._heap:
+            yield self.wait_for_ready()
+
+class RetryQueue(DeferralQueue):
+    """
+    Tasks that failed with a retryable error, ordered by when they can next be tried, so a locked file doesn't hold up
+    the files after it
+    """
+    def __init__(self, config: RetryConfig) -> None:
+        super().__init__()
+        self._config = config
+        self._attempts: dict[str, int] = {}
+
+    def defer(self, task: MoveTask, error: BaseException) -> float | None:
+        """
+        Queue a failed task to be tried again. Returns the seconds until it will be retried, or None if the error isn't
+        retryable or the task has no attempts left
+        """
+        delay = self.record_failure(task, error)
+        if delay is not None:
+            self.push(task, delay)
+        return delay
+
+    def record_failure(self, task: MoveTask, error: BaseException) -> float | None:
+        """
+        Count a failed attempt at a task without queueing it (for callers that queue something else in its place). Returns
+        the seconds to wait before retrying it, or None if it shouldn't be retried
+        """
+        attempt = self._attempts.get(task.source.path, 0) + 1
+        self._attempts[task.source.path] = attempt
+        if attempt >= self._config.attempts or not self._config.is_retryable(error):
+            return None
+        return self._config.get_delay(attempt)
+
+    def get_attempts(self, task: MoveTask) -> int:
+        return self._attempts.get(task.source.path, 0)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import Callable, Iterator, TYPE_CHECKING
+import stat as stat_module
+import os
+
+if TYPE_CHECKING:
+    from filemover.source_index import SourceIndex
+
+class ScannedFile:
+    """
+    A file found while scanning a source directory. Stat data comes from the directory listing (os.DirEntry) and is cached,
+    so later steps (matching, collision checks, copying) can reuse it instead of re-statting the file
+    """
+    __slots__ = ('_name', '_path', '_entry', '_stat')
+
+    def __init__(self, name: str, path: str, entry: os.DirEntry | None = None, stat: os.stat_result | None = None) -> None:
+        self._name = name
+        self._path = path
+        self._entry = entry
+        self._stat = stat
+
+    @classmethod
+    def from_entry(cls, entry: os.DirEntry) -> 'ScannedFile':
+        return cls(entry.name, entry.path, entry=entry)
+
+    @classmethod
+    def from_path(cls, path: str, stat: os.stat_result | None = None) -> 'ScannedFile':
+        return cls(os.path.basename(path), path, stat=stat)
+
+    def __repr__(self):
+        return f"ScannedFile(path='{self._path}')"
+
+    def __fspath__(self) -> str:
+        return self._path
+
+    def __getstate__(self):
+        # DirEntry objects can't be pickled, so resolve the stat before sending the file to another process
+        return (self._name, self._path, self.stat)
+
+    def __setstate__(self, state):
+        self._name, self._path, self._stat = state
+        self._entry = None
+
+    @property
+    def name(self) -> str:
+        return self._name
+    @property
+    def path(self) -> str:
+        return self._path
+    @property
+    def entry(self) -> os.DirEntry | None:
+        return self._entry
+    @property
+    def stat(self) -> os.stat_result:
+        if self._stat is None:
+            if self._entry is not None:
+                self._stat = self._entry.stat()
+            else:
+                self._stat = os.stat(self._path)
+        return self._stat
+    @property
+    def is_file(self) -> bool:
+        if self._entry is not None:
+            return self._entry.is_file()
+        return stat_module.S_ISREG(self.stat.st_mode)
+    @property
+    def is_symlink(self) -> bool:
+        if self._entry is not None:
+            return self._entry.is_symlink()
+        return os.path.islink(self._path)
+    @property
+    def size(self) -> int:
+        return self.stat.st_size
+    @property
+    def mtime_ns(self) -> int:
+        return self.stat.st_mtime_ns
+
+def scan_directory(directory: str, recursive: bool = False, on_error: Callable[[OSError], None] | None = None, index: SourceIndex | None = None) -> Iterator[ScannedFile]:
+    """
+    Yield a ScannedFile for each file in a directory using os.scandir, so each directory listing is a single batch of syscalls\n
+    ---\n
+    Keyword arguments:\n
+    directory -- the directory to scan. Errors listing this directory are raised\n
+    recursive -- whether to also scan subdirectories (symlinked directories are not followed)\n
+    on_error -- called with the OSError when a subdirectory can't be listed. If omitted, the subdirectory is skipped silently\n
+    index -- a source index to record directory listings in. Directories it reports as unchanged aren't listed again
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            mtime_ns = None
+            if index is not None:
+                mtime_ns = os.stat(current).st_mtime_ns
+                unchanged_subdirectories = index.get_unchanged_subdirectories(current, mtime_ns)
+                if unchanged_subdirectories is not None:
+                    if recursive:
+                        pending.extend(reversed([os.path.join(current, name) for name in unchanged_subdirectories]))
+                    continue
+            iterator = os.scandir(current)
+        except OSError as e:
+            if current == directory:
+                raise
+            if on_error:
+                on_error(e)
+            continue
+        files = []
+        subdirectories = []
+        # The whole listing is read before yielding anything so files written into the directory while the
+        # caller processes it (e.g., a destination inside the source) aren't picked up mid-scan
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_file():
+                        files.append(ScannedFile.from_entry(entry))
+                    elif recursive and entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                except OSError as e:
+                    if on_error:
+                        on_error(e)
+        if index is not None:
+            index.record_directory(current, mtime_ns, [scanned.name for scanned in files], [os.path.basename(path) for path in subdirectories])
+        yield from files
+        # Reverse so subdirectories are visited in listing order (the pending list is a stack)
+        pending.extend(reversed(subdirectories))
@@ -1,7 +1,11 @@
 from filemover.mover import Mover
+from filemover.mover_group import MoverGroup
 from filemover.mover_builder import InteractiveMoverConfigBuilder
 from colorama import Fore, Style
+import threading
 import argparse
+import sys
+import signal
 import json
 import yaml
 import os
@@ -12,9 +16,17 @@ def run_mover():
     parser.add_argument("-y", "--yaml_config", help="Specify a path to a YAML configuration file")
     parser.add_argument("-o", "--output", help="An optional file to save (append) logs to", required=False, default=None)
     parser.add_argument("-v", "--verbose", help="Outputs additional details to logs if True or only movement operations if False", required=False, default=True)
+    parser.add_argument("-w", "--watch", help="Keep running and move files as soon as they're written to the source directories", action="store_true")
+    parser.add_argument("--debounce", help="Seconds to wait for more changes before moving a batch of files in watch mode", type=float, default=0.5)
+    parser.add_argument("--poll_interval", help="Seconds between scans when watch mode has to poll for changes", type=float, default=2.0)
+    parser.add_argument("--polling", help="Poll for changes in watch mode even if filesystem events are available", action="store_true")
+    parser.add_argument("-p", "--plan", help="Write what the mover would do to a JSON-lines plan file (\"-\" for the console) without moving anything", required=False, default=None)
+    parser.add_argument("-e", "--execute_plan", help="Apply a plan file written with --plan instead of scanning the source directories", required=False, default=None)
 
     args = parser.parse_args()
     config = None
+    # Keep the console free for the plan when it's written there
+    status_output = sys.stderr if args.plan == "-" else sys.stdout
     
     if args.json_config and args.yaml_config:
         print(f"{Fore.RED}Only one of {Fore.LIGHTBLACK_EX}--json_config{Fore.RED} and {Fore.LIGHTBLACK_EX}--yaml_config{Fore.RED} may be specified{Style.RESET_ALL}")
@@ -26,7 +38,7 @@ def run_mover():
                 config = json.load(f)
                 if not config:
                     raise FileNotFoundError("Failed to load config from the provided json file")
-                print(f"{Fore.GREEN}Loaded config from JSON file{Style.RESET_ALL}")
+                print(f"{Fore.GREEN}Loaded config from JSON file{Style.RESET_ALL}", file=status_output)
         except BaseException as e:
             print(f"{Fore.RED}{e}{Style.RESET_ALL}")
             return
@@ -37,7 +49,7 @@ def run_mover():
                 config = yaml.safe_load(f)
                 if not config:
                     raise FileNotFoundError("Failed to load config from the provided yaml file")
-                print(f"{Fore.GREEN}Loaded config from YAML file{Style.RESET_ALL}")
+                print(f"{Fore.GREEN}Loaded config from YAML file{Style.RESET_ALL}", file=status_output)
         except BaseException as e:
             print(f"{Fore.RED}{e}{Style.RESET_ALL}")
             return
@@ -54,11 +66,31 @@ def run_mover():
                 print(f"Failed to open provided output file: {Fore.RED}{e}{Style.RESET_ALL}")
                 return
 
-    if not config is None and isinstance(config, dict):
+    if not config is None and isinstance(config, dict) and "movers" in config:
+        if args.watch or args.plan or args.execute_plan:
+            print(f"{Fore.LIGHTBLACK_EX}--watch{Fore.RED}, {Fore.LIGHTBLACK_EX}--plan{Fore.RED} and {Fore.LIGHTBLACK_EX}--execute_plan{Fore.RED} can't be used with a multi-mover config{Style.RESET_ALL}")
+            return
+        config["verbose"] = verbose
+        config["log_file"] = log_file
+        MoverGroup(**config).run()
+    elif not config is None and isinstance(config, dict):
         config["verbose"] = verbose
         config["log_file"] = log_file
         mover = Mover(**config)
-        mover.move_files()
+        if args.plan:
+            count = mover.write_plan(args.plan)
+            print(f"{Fore.GREEN}Wrote plan for {count} file(s) to {args.plan}{Style.RESET_ALL}", file=status_output)
+        elif args.execute_plan:
+            mover.execute_plan(args.execute_plan)
+        elif args.watch:
+            stop_event = threading.Event()
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+            try:
+                mover.watch(debounce=args.debounce, poll_interval=args.poll_interval, force_polling=args.polling, stop_event=stop_event)
+            except KeyboardInterrupt:
+                stop_event.set()
+        else:
+            mover.move_files()
     else:
         print(f"{Fore.RED}Config must be provided with either the {Fore.LIGHTBLACK_EX}--json_config{Fore.RED} or {Fore.LIGHTBLACK_EX}--yaml_config{Fore.RED} options{Style.RESET_ALL}")
 
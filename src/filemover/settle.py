@@ -0,0 +1,127 @@
+from __future__ import annotations
+from filemover.scanner import ScannedFile
+import time
+import os
+
+DEFAULT_WINDOW = 5.0
+DEFAULT_MAX_WAIT = 60.0
+# The shortest time to wait before checking an unsettled file again
+MIN_CHECK_INTERVAL = 0.1
+# How long a listing of the files open for writing is reused, since building one reads every process's open files
+OPEN_FILES_CACHE_SECONDS = 1.0
+
+# A file's size and mtime, and when (time.monotonic) they were first seen
+Observation = tuple[int, int, float]
+
+class SettleConfig:
+    def __init__(self, **kwargs) -> None:
+        self._enabled = kwargs.get('enabled', False)
+        self._window = kwargs.get('window', DEFAULT_WINDOW)
+        self._max_wait = kwargs.get('max_wait', DEFAULT_MAX_WAIT)
+        self._check_open_files = kwargs.get('check_open_files', True)
+
+        if not isinstance(self._enabled, bool):
+            raise TypeError("Enabled must be a boolean value")
+        if not isinstance(self._window, (int, float)) or isinstance(self._window, bool) or self._window < 0:
+            raise ValueError("Window must be a non-negative number")
+        if not isinstance(self._max_wait, (int, float)) or isinstance(self._max_wait, bool) or self._max_wait < 0:
+            raise ValueError("Max wait must be a non-negative number")
+        if not isinstance(self._check_open_files, bool):
+            raise TypeError("Check open files must be a boolean value")
+
+    def __repr__(self):
+        return f"SettleConfig(enabled={self._enabled}, window={self._window}, max_wait={self._max_wait}, check_open_files={self._check_open_files})"
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+    @property
+    def window(self) -> float:
+        return self._window
+    @property
+    def max_wait(self) -> float:
+        return self._max_wait
+    @property
+    def check_open_files(self) -> bool:
+        return self._check_open_files
+
+def get_files_open_for_writing() -> set[tuple[int, int]]:
+    """
+    Return the (st_dev, st_ino) of every file another process has open for writing. Only supported on Linux (through
+    /proc), and only sees processes the current user can inspect. Returns an empty set elsewhere
+    """
+    open_files = set()
+    try:
+        pids = [pid for pid in os.listdir('/proc') if pid.isdigit() and int(pid) != os.getpid()]
+    except OSError:
+        return open_files
+    for pid in pids:
+        try:
+            fds = os.listdir(f'/proc/{pid}/fd')
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                with open(f'/proc/{pid}/fdinfo/{fd}', 'r') as f:
+                    flags = next((line.split()[1] for line in f if line.startswith('flags:')), None)
+                if flags is None or not int(flags, 8) & (os.O_WRONLY | os.O_RDWR):
+                    continue
+                fd_stat = os.stat(f'/proc/{pid}/fd/{fd}')
+                open_files.add((fd_stat.st_dev, fd_stat.st_ino))
+            except (OSError, ValueError):
+                # The process or file closed while it was being read
+                continue
+    return open_files
+
+class SettleChecker:
+    """
+    Decides whether source files have finished being written. A file is settled once it hasn't been modified for the
+    settle window (by its mtime, or by its size and mtime staying the same for the window, in case the writer's clock
+    differs from ours) and, if enabled, no other process has it open for writing
+    """
+    def __init__(self, config: SettleConfig) -> None:
+        self._config = config
+        self._open_files: set[tuple[int, int]] = set()
+        self._open_files_checked: float | None = None
+
+    def __repr__(self):
+        return f"SettleChecker(config={self._config})"
+
+    @property
+    def config(self) -> SettleConfig:
+        return self._config
+
+    def _is_open_for_writing(self, file_stat: os.stat_result) -> bool:
+        now = time.monotonic()
+        if self._open_files_checked is None or now - self._open_files_checked > OPEN_FILES_CACHE_SECONDS:
+            self._open_files = get_files_open_for_writing()
+            self._open_files_checked = now
+        return (file_stat.st_dev, file_stat.st_ino) in self._open_files
+
+    def observe(self, scanned: ScannedFile, previous: Observation | None = None) -> Observation:
+        """
+        Record the file's size and mtime, keeping the previous observation if they haven't changed since
+        """
+        if previous is not None and previous[:2] == (scanned.size, scanned.mtime_ns):
+            return previous
+        return (scanned.size, scanned.mtime_ns, time.monotonic())
+
+    def check(self, scanned: ScannedFile, observation: Observation | None = None) -> float:
+        """
+        Return 0 if the file has settled, or else the seconds to wait before checking it again\n
+        ---\n
+        Keyword arguments:\n
+        scanned -- the file to check, with an up to date stat\n
+        observation -- what observe returned the last time the file was checked, if it has been checked before
+        """
+        window = self._config.window
+        file_stat = scanned.stat
+        age = time.time() - file_stat.st_mtime
+        if age < window:
+            unchanged = observation is not None and observation[:2] == (file_stat.st_size, file_stat.st_mtime_ns)
+            if not unchanged or time.monotonic() - observation[2] < window:
+                # An mtime in the future (e.g., from another machine's clock) waits a whole window
+                return max(window - age if age >= 0 else window, MIN_CHECK_INTERVAL)
+        if self._config.check_open_files and self._is_open_for_writing(file_stat):
+            return max(window, OPEN_FILES_CACHE_SECONDS)
+        return 0.0
@@ -0,0 +1,228 @@
+from __future__ import annotations
+from filemover.mover import Mover
+from filemover.metadata import ExecutionResults
+from filemover.move_task import MoveTask
+from filemover.retry import DeferralQueue, RetryQueue
+from filemover.scanner import ScannedFile, scan_directory
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Iterable
+import logging
+import time
+import os
+
+def _normalize_directory(directory: str) -> str:
+    return os.path.normcase(os.path.normpath(os.path.abspath(directory)))
+
+def group_movers_by_source(movers: list[Mover]) -> list[list[Mover]]:
+    """
+    Split movers into groups that share source directories (directly or through other movers), keeping config order
+    within each group. Movers that don't share a source directory with any other mover are in a group of their own
+    """
+    groups: list[list[Mover]] = []
+    group_sources: list[set[str]] = []
+    for mover in movers:
+        sources = {_normalize_directory(directory) for directory in mover.config.source_directories}
+        merged_movers = [mover]
+        merged_sources = set(sources)
+        for index in reversed(range(len(groups))):
+            if group_sources[index] & sources:
+                merged_movers = groups.pop(index) + merged_movers
+                merged_sources |= group_sources.pop(index)
+        groups.append(merged_movers)
+        group_sources.append(merged_sources)
+    # Merging can reorder movers, so restore config order
+    order = {id(mover): index for index, mover in enumerate(movers)}
+    groups = [sorted(group, key=lambda mover: order[id(mover)]) for group in groups]
+    return sorted(groups, key=lambda group: order[id(group[0])])
+
+class SharedScanCoordinator:
+    """
+    Runs several movers that share source directories with a single scan of each directory. Every file found is
+    dispatched to each mover whose source directory and file match rules it matches.\n
+    When more than one mover would remove the source (i.e., move the file), the first of them in config order claims the
+    file and the others skip it. Movers that keep the source still get a copy, and their copies are made before the
+    claiming mover removes the source. If a copy fails, the source is only removed once it has been retried successfully
+    """
+    def __init__(self, movers: list[Mover], max_workers: int | None = None, logger: logging.Logger | None = None) -> None:
+        self._movers = movers
+        self._max_workers = max_workers or max(mover.config.max_workers for mover in movers)
+        self._logger = logger or logging.getLogger(__name__)
+
+    def __repr__(self):
+        return f"SharedScanCoordinator(movers={len(self._movers)}, max_workers={self._max_workers})"
+
+    @property
+    def movers(self) -> list[Mover]:
+        return self._movers
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def _get_sources(self, movers: list[Mover]) -> dict[str, tuple[str, bool, list[Mover]]]:
+        """
+        Map each (normalized) source directory to the path to scan it with, whether any of its movers are recursive, and
+        its movers in config order
+        """
+        sources: dict[str, tuple[str, bool, list[Mover]]] = {}
+        for mover in movers:
+            for directory in mover.config.source_directories:
+                key = _normalize_directory(directory)
+                path, recursive, source_movers = sources.get(key, (directory, False, []))
+                sources[key] = (path, recursive or mover.config.recursive, source_movers + [mover])
+        return sources
+
+    def _plan(self, scanned: ScannedFile, is_top_level: bool, movers: list[Mover], results: dict[Mover, ExecutionResults]) -> list[tuple[Mover, MoveTask]]:
+        claimed_by = None
+        bundle = []
+        for mover in movers:
+            if not is_top_level and not mover.config.recursive:
+                continue
+            if not mover.matches_file(scanned):
+                continue
+            if mover._source_index and mover._source_index.is_file_unchanged(scanned):
+                continue
+            task = mover._plan_task(scanned, results[mover])
+            if not task:
+                continue
+            if task.remove_source:
+                if claimed_by:
+                    self._logger.debug(f"File \"{scanned.path}\" is moved by mover \"{claimed_by.config.mover_name}\". Skipping it for mover \"{mover.config.mover_name}\"")
+                    continue
+                claimed_by = mover
+            mover._reserve_destinations(task)
+            bundle.append((mover, task))
+        # Copies are made before the source is removed
+        bundle.sort(key=lambda item: item[1].remove_source)
+        return bundle
+
+    def _execute_bundle(self, bundle: list[tuple[Mover, MoveTask]]) -> list[tuple[Mover, MoveTask, ExecutionResults | Exception | None]]:
+        """
+        Run a file's tasks in order. Once a copy has failed, the task that removes the source isn't run (its outcome is
+        None), so the copying mover can still get the file when it's retried
+        """
+        finished = []
+        failed = False
+        for mover, task in bundle:
+            if failed and task.remove_source:
+                finished.append((mover, task, None))
+                continue
+            try:
+                finished.append((mover, task, mover._execute_task(task)))
+            except Exception as e:
+                finished.append((mover, task, e))
+                failed = True
+        return finished
+
+    def _collect(self, finished: list[tuple[Mover, MoveTask, ExecutionResults | Exception | None]], results: dict[Mover, ExecutionResults], retries: dict[Mover, RetryQueue], bundle_retries: DeferralQueue):
+        """
+        Record the outcome of a file's tasks. Failed tasks go through each mover's retry config, and the ones that will be
+        retried are queued together with the source removal they held back (in a new bundle). If a copy won't be retried,
+        the source removal is dropped so the source is left for the copying mover's next run
+        """
+        retry_bundle = []
+        delays = []
+        held_back = []
+        abandoned = False
+        for mover, task, outcome in finished:
+            if outcome is None:
+                held_back.append((mover, task))
+            elif isinstance(outcome, Exception):
+                delay = mover._get_retry_delay(task, outcome, results[mover], retries[mover])
+                if delay is None:
+                    abandoned = True
+                    continue
+                retry_bundle.append((mover, task))
+                delays.append(delay)
+            else:
+                results[mover].merge(outcome)
+                mover._on_task_finished(task)
+        for mover, task in held_back:
+            if not abandoned:
+                retry_bundle.append((mover, task))
+                continue
+            mover.logger.warning(f"Skipping file \"{task.source.path}\" because it couldn't be copied by another mover. It will be moved on a later run")
+            mover._release_destinations(task)
+            if mover._source_index:
+                mover._source_index.invalidate_directory(os.path.dirname(task.source.path))
+            results[mover].increment_skipped()
+        if delays:
+            bundle_retries.push(retry_bundle, max(delays))
+
+    def _iter_bundles(self, movers: list[Mover], results: dict[Mover, ExecutionResults]) -> Iterable[list[tuple[Mover, MoveTask]]]:
+        for key, (path, recursive, source_movers) in self._get_sources(movers).items():
+            def on_error(error: OSError):
+                self._logger.warning(f"Failed to scan directory \"{error.filename}\": {error.strerror}")
+            try:
+                for scanned in scan_directory(path, recursive, on_error=on_error):
+                    is_top_level = _normalize_directory(os.path.dirname(scanned.path)) == key
+                    bundle = self._plan(scanned, is_top_level, source_movers, results)
+                    if bundle:
+                        yield bundle
+            except OSError as e:
+                self._logger.error(f"Failed to scan source directory \"{path}\": {e}")
+                for mover in source_movers:
+                    results[mover].increment_errors()
+
+    def _run_bundles(self, bundles: Iterable[list[tuple[Mover, MoveTask]]], results: dict[Mover, ExecutionResults]):
+        retries = {mover: RetryQueue(mover.config.retry_config) for mover in results}
+        bundle_retries = DeferralQueue()
+        if self._max_workers <= 1:
+            for bundle_round in bundle_retries.iter_rounds(bundles):
+                for bundle in bundle_round:
+                    self._collect(self._execute_bundle(bundle), results, retries, bundle_retries)
+            return
+        # Only keep a few files per worker queued so the scan doesn't run ahead of the copies
+        max_pending = self._max_workers * 4
+        pending: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="SharedScan") as executor:
+            try:
+                for bundle_round in bundle_retries.iter_rounds(bundles):
+                    for bundle in bundle_round:
+                        pending.add(executor.submit(self._execute_bundle, bundle))
+                        if len(pending) >= max_pending:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                self._collect(future.result(), results, retries, bundle_retries)
+                    done, pending = wait(pending)
+                    for future in done:
+                        self._collect(future.result(), results, retries, bundle_retries)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+    def run(self) -> dict[Mover, ExecutionResults]:
+        """
+        Run every mover and return each mover's results. Each mover's results are logged and saved to its metadata the same
+        as when it runs on its own
+        """
+        results = {mover: mover._start_run() for mover in self._movers}
+        active = []
+        for mover in self._movers:
+            try:
+                if not mover.config.destination_directories:
+                    raise ValueError("Source and destination directories must be specified.")
+                mover._source_index = mover._create_source_index()
+                active.append(mover)
+            except Exception as e:
+                mover.logger.error(f"Failed to start mover \"{mover.config.mover_name}\": {e}")
+                results[mover].increment_errors()
+
+        start = time.perf_counter()
+        planning_times = {mover: results[mover].planning_time for mover in active}
+        try:
+            self._run_bundles(self._iter_bundles(active, results), results)
+        except Exception as e:
+            self._logger.error(f"Shared scan failed: {e}")
+            for mover in active:
+                results[mover].increment_errors()
+        finally:
+            # Every mover's tasks ran during the shared run, less the time that mover spent planning its own
+            elapsed = time.perf_counter() - start
+            for mover in active:
+                results[mover].add_task_time(elapsed - (results[mover].planning_time - planning_times[mover]))
+            # Still save what was done when the run is interrupted
+            for mover in self._movers:
+                mover._finish_run(results[mover])
+                mover._report_results(results[mover])
+        return results
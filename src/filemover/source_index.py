@@ -0,0 +1,151 @@
+from __future__ import annotations
+from filemover.scanner import ScannedFile
+from json.decoder import JSONDecodeError
+import time
+import json
+import os
+
+INDEX_SCHEMA_VERSION = 1
+# Directory mtimes this close to the time of the scan aren't trusted, since a file could still be added within the same
+# mtime tick without changing it (coarse timestamp filesystems only update mtime every second or two)
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+class IncrementalConfig:
+    def __init__(self, **kwargs) -> None:
+        self._enabled = kwargs.get('enabled', False)
+        self._skip_unchanged_directories = kwargs.get('skip_unchanged_directories', True)
+        self._index_file = kwargs.get('index_file', None)
+
+        if not isinstance(self._enabled, bool):
+            raise TypeError("Enabled must be a boolean value")
+        if not isinstance(self._skip_unchanged_directories, bool):
+            raise TypeError("Skip unchanged directories must be a boolean value")
+        if self._index_file is not None and not isinstance(self._index_file, str):
+            raise TypeError("Index file must be a string")
+        if self._index_file:
+            self._index_file = os.path.expandvars(self._index_file)
+
+    def __repr__(self):
+        return f"IncrementalConfig(enabled={self._enabled}, skip_unchanged_directories={self._skip_unchanged_directories}, index_file='{self._index_file}')"
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+    @property
+    def skip_unchanged_directories(self) -> bool:
+        return self._skip_unchanged_directories
+    @property
+    def index_file(self) -> str | None:
+        return self._index_file
+
+class SourceIndex:
+    """
+    A persistent record of the source files a mover has already processed (size, mtime and inode) and of the directories
+    it has scanned (mtime and subdirectories), so later runs can skip files and directories that haven't changed.\n
+    Directory records from a run are only kept if the run finishes, and any directory containing a matched file that
+    wasn't processed is invalidated so it's listed again next time
+    """
+    def __init__(self, file_path: str, fingerprint: str, skip_unchanged_directories: bool = True) -> None:
+        self._file_path = file_path
+        self._fingerprint = fingerprint
+        self._skip_unchanged_directories = skip_unchanged_directories
+        self._directories: dict[str, dict] = {}
+        # Directory mtimes seen during this run. They replace the saved mtimes when the run completes
+        self._scanned_mtimes: dict[str, int | None] = {}
+        self._invalid_directories: set[str] = set()
+        self._load()
+
+    def __repr__(self):
+        return f"SourceIndex(file_path='{self._file_path}', directories={len(self._directories)})"
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    def _load(self):
+        data = None
+        try:
+            with open(self._file_path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, JSONDecodeError):
+            pass
+        # An index from a different schema or mover configuration (e.g., different match rules) can't be trusted
+        if not data or data.get("_version") != INDEX_SCHEMA_VERSION or data.get("fingerprint") != self._fingerprint:
+            return
+        self._directories = data.get("directories", {})
+
+    def save(self, complete: bool = True):
+        """
+        Write the index to disk. Pass complete=False if the run was interrupted, so directories that were scanned but not
+        fully processed aren't recorded as unchanged
+        """
+        for directory, mtime_ns in self._scanned_mtimes.items():
+            record = self._directories.get(directory)
+            if record is not None:
+                record["mtime_ns"] = mtime_ns if complete and directory not in self._invalid_directories else None
+        for directory in self._invalid_directories:
+            if directory in self._directories:
+                self._directories[directory]["mtime_ns"] = None
+
+        data = {
+            "_version": INDEX_SCHEMA_VERSION,
+            "fingerprint": self._fingerprint,
+            "directories": self._directories,
+        }
+        temp_path = f"{self._file_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, self._file_path)
+
+    def get_unchanged_subdirectories(self, directory: str, mtime_ns: int) -> list[str] | None:
+        """
+        Return the names of a directory's subdirectories if the directory is unchanged since it was last fully processed
+        (so listing it can be skipped), or None if it needs to be listed
+        """
+        if not self._skip_unchanged_directories:
+            return None
+        record = self._directories.get(directory)
+        if record is None or record.get("mtime_ns") is None or record["mtime_ns"] != mtime_ns:
+            return None
+        return record.get("subdirectories", [])
+
+    def record_directory(self, directory: str, mtime_ns: int | None, file_names: list[str], subdirectories: list[str]):
+        """
+        Record a directory listing. File records for files that no longer exist are dropped
+        """
+        previous_files = self._directories.get(directory, {}).get("files", {})
+        present = set(file_names)
+        self._directories[directory] = {
+            "mtime_ns": None,
+            "subdirectories": subdirectories,
+            "files": {name: record for name, record in previous_files.items() if name in present},
+        }
+        if mtime_ns is not None and time.time_ns() - mtime_ns < RACY_MTIME_WINDOW_NS:
+            mtime_ns = None
+        self._scanned_mtimes[directory] = mtime_ns
+
+    def is_file_unchanged(self, scanned: ScannedFile) -> bool:
+        """
+        Return True if the file has already been processed and its size, mtime and inode haven't changed since
+        """
+        directory = os.path.dirname(scanned.path)
+        record = self._directories.get(directory, {}).get("files", {}).get(scanned.name)
+        if record is None:
+            return False
+        scanned_stat = scanned.stat
+        return record == [scanned_stat.st_size, scanned_stat.st_mtime_ns, scanned_stat.st_ino]
+
+    def record_file(self, scanned: ScannedFile):
+        """
+        Record that a file was processed (and still exists in the source)
+        """
+        directory = os.path.dirname(scanned.path)
+        record = self._directories.setdefault(directory, {"mtime_ns": None, "subdirectories": [], "files": {}})
+        scanned_stat = scanned.stat
+        record["files"][scanned.name] = [scanned_stat.st_size, scanned_stat.st_mtime_ns, scanned_stat.st_ino]
+
+    def invalidate_directory(self, directory: str):
+        """
+        Make sure a directory is listed again next run (e.g., because a matched file in it wasn't processed)
+        """
+        self._invalid_directories.add(directory)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+from filemover.scanner import scan_directory
+from abc import ABC, abstractmethod
+import ctypes.util
+import ctypes
+import select
+import struct
+import time
+import sys
+import os
+
+# From sys/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT_HEADER = struct.Struct('iIII')
+
+class Watcher(ABC):
+    """
+    Reports files in a set of source directories that have been written or moved in since the last check
+    """
+    def __init__(self, directories: list[str], recursive: bool = False) -> None:
+        self._directories = directories
+        self._recursive = recursive
+
+    @property
+    def directories(self) -> list[str]:
+        return self._directories
+    @property
+    def recursive(self) -> bool:
+        return self._recursive
+
+    @abstractmethod
+    def wait_for_changes(self, timeout: float) -> set[str]:
+        """
+        Wait up to timeout seconds for files to change and return their paths (an empty set if nothing changed)
+        """
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class PollingWatcher(Watcher):
+    """
+    Finds changed files by rescanning the source directories every poll_interval seconds and comparing each file's size
+    and modification time with the previous scan. Works on every platform and filesystem (including network shares)
+    """
+    def __init__(self, directories: list[str], recursive: bool = False, poll_interval: float = 2.0) -> None:
+        super().__init__(directories, recursive)
+        self._poll_interval = poll_interval
+        self._last_poll = 0.0
+        self._files = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        files = {}
+        for directory in self._directories:
+            try:
+                for scanned in scan_directory(directory, self._recursive):
+                    try:
+                        files[scanned.path] = (scanned.size, scanned.mtime_ns)
+                    except OSError:
+                        pass
+            except OSError:
+                pass
+        self._last_poll = time.monotonic()
+        return files
+
+    def wait_for_changes(self, timeout: float) -> set[str]:
+        wait = self._last_poll + self._poll_interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        files = self._scan()
+        changed = {path for path, state in files.items() if self._files.get(path) != state}
+        self._files = files
+        return changed
+
+class InotifyWatcher(Watcher):
+    """
+    Finds changed files with Linux inotify. Files are reported once they're closed after writing or moved into a watched
+    directory. New subdirectories are watched as they're created when recursive is set
+    """
+    def __init__(self, directories: list[str], recursive: bool = False) -> None:
+        super().__init__(directories, recursive)
+        library_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(library_name or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._watches: dict[int, str] = {}
+        try:
+            for directory in directories:
+                self._add_watch(directory, required=True)
+        except BaseException:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str, required: bool = False) -> set[str]:
+        """
+        Watch a directory (and its subdirectories when recursive). Returns the files already in any newly watched
+        subdirectories, since they were created before the watch existed
+        """
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if required:
+                raise OSError(error, os.strerror(error), directory)
+            return set()
+        self._watches[wd] = directory
+
+        existing_files = set()
+        if self._recursive:
+            try:
+                with os.scandir(directory) as iterator:
+                    for entry in iterator:
+                        if entry.is_dir(follow_symlinks=False):
+                            existing_files |= self._add_watch(entry.path)
+                        elif not required and entry.is_file():
+                            existing_files.add(entry.path)
+            except OSError:
+                pass
+        return existing_files
+
+    def _rescan(self) -> set[str]:
+        files = set()
+        for directory in self._directories:
+            try:
+                files.update(scanned.path for scanned in scan_directory(directory, self._recursive))
+            except OSError:
+                pass
+        return files
+
+    def wait_for_changes(self, timeout: float) -> set[str]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+                offset += name_length
+
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped, so fall back to reporting every file
+                    changed |= self._rescan()
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & IN_ISDIR:
+                    if self._recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        changed |= self._add_watch(path)
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+def create_watcher(directories: list[str], recursive: bool = False, poll_interval: float = 2.0, force_polling: bool = False) -> Watcher:
+    """
+    Create an inotify watcher where it's available (Linux), falling back to a polling watcher
+    """
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directories, recursive)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories, recursive, poll_interval)
@@ -0,0 +1,37 @@
+import tempfile
+import os
+
+class MoverTestMixin:
+    """
+    Sets up a temporary source directory holding source_files (and a path for the destination directory), and builds
+    mover configs from _base_config with each test's overrides
+    """
+    mover_name = "TestMover"
+    source_files = ["a.txt", "b.txt", "c.txt"]
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_dir = os.path.join(self.temp_dir.name, "src")
+        self.dest_dir = os.path.join(self.temp_dir.name, "dst")
+        os.makedirs(self.source_dir)
+        for fname in self.source_files:
+            path = os.path.join(self.source_dir, fname)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"content of {fname}")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _base_config(self) -> dict:
+        return {
+            "mover_name": self.mover_name,
+            "source_directories": [self.source_dir],
+            "destination_directories": [self.dest_dir],
+            "verbose": False,
+        }
+
+    def _config(self, **overrides) -> dict:
+        config = self._base_config()
+        config.update(overrides)
+        return config
@@ -0,0 +1,125 @@
+import unittest
+from unittest import mock
+from filemover import Mover
+from filemover.content_hash import ContentCompareConfig, HashCache, hash_file
+from tests.mover_test_mixin import MoverTestMixin
+import tempfile
+import os
+
+class TestHashCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temp_dir.name, "hashes.json")
+        self.path = os.path.join(self.temp_dir.name, "file.txt")
+        with open(self.path, "w") as f:
+            f.write("contents")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unchanged_file_is_not_rehashed_after_reload(self):
+        cache = HashCache(self.cache_file)
+        digest = cache.get_hash(self.path, os.stat(self.path))
+        self.assertEqual(digest, hash_file(self.path))
+        cache.save()
+        with mock.patch("filemover.content_hash.hash_file") as hash_file_mock:
+            self.assertEqual(HashCache(self.cache_file).get_hash(self.path, os.stat(self.path)), digest)
+        hash_file_mock.assert_not_called()
+
+    def test_changed_file_is_rehashed(self):
+        cache = HashCache(self.cache_file)
+        digest = cache.get_hash(self.path, os.stat(self.path))
+        with open(self.path, "w") as f:
+            f.write("new contents")
+        self.assertNotEqual(cache.get_hash(self.path, os.stat(self.path)), digest)
+
+    def test_save_drops_least_recently_used_entries(self):
+        cache = HashCache(self.cache_file, max_entries=2)
+        paths = [os.path.join(self.temp_dir.name, f"file{i}.txt") for i in range(3)]
+        for path in paths:
+            with open(path, "w") as f:
+                f.write(path)
+            cache.get_hash(path, os.stat(path))
+        # Use the first file again so the second is the least recently used
+        cache.get_hash(paths[0], os.stat(paths[0]))
+        cache.save()
+        with mock.patch("filemover.content_hash.hash_file", return_value="rehashed") as hash_file_mock:
+            reloaded = HashCache(self.cache_file, max_entries=2)
+            self.assertEqual(len(reloaded), 2)
+            self.assertEqual(reloaded.get_hash(paths[1], os.stat(paths[1])), "rehashed")
+        hash_file_mock.assert_called_once_with(paths[1])
+
+    def test_merged_entries_are_saved(self):
+        worker_cache = HashCache(self.cache_file)
+        digest = worker_cache.get_hash(self.path, os.stat(self.path))
+        cache = HashCache(self.cache_file)
+        cache.merge(worker_cache.pop_new_entries())
+        self.assertEqual(worker_cache.pop_new_entries(), {})
+        cache.save()
+        with mock.patch("filemover.content_hash.hash_file") as hash_file_mock:
+            self.assertEqual(HashCache(self.cache_file).get_hash(self.path, os.stat(self.path)), digest)
+        hash_file_mock.assert_not_called()
+
+    def test_config_validation(self):
+        with self.assertRaises(TypeError):
+            ContentCompareConfig(enabled="yes")
+        with self.assertRaises(ValueError):
+            ContentCompareConfig(max_entries=0)
+
+
+class TestMoverCompareContents(MoverTestMixin, unittest.TestCase):
+    mover_name = "TestCompareMover"
+    source_files = ["same.txt", "different.txt", "new.txt"]
+
+    def setUp(self):
+        super().setUp()
+        self.cache_file = os.path.join(self.temp_dir.name, "hashes.json")
+        os.makedirs(self.dest_dir)
+        with open(os.path.join(self.dest_dir, "same.txt"), "w") as f:
+            f.write("content of same.txt")
+        # Same size as the source but different contents, so it has to be hashed
+        with open(os.path.join(self.dest_dir, "different.txt"), "w") as f:
+            f.write("CONTENT OF DIFFERENT.TXT")
+
+    def _base_config(self):
+        config = super()._base_config()
+        config["keep_source_behavior"] = "keep_source"
+        config["destination_collision_behavior"] = "overwrite"
+        config["compare_contents"] = {"enabled": True, "cache_file": self.cache_file}
+        return config
+
+    def test_identical_destination_is_skipped_and_different_one_overwritten(self):
+        same_inode = os.stat(os.path.join(self.dest_dir, "same.txt")).st_ino
+        results = Mover(**self._config())._run_move_files()
+        self.assertEqual(results.copied, 2)
+        self.assertEqual(results.skipped, 1)
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(os.stat(os.path.join(self.dest_dir, "same.txt")).st_ino, same_inode)
+        with open(os.path.join(self.dest_dir, "different.txt")) as f:
+            self.assertEqual(f.read(), "content of different.txt")
+        self.assertTrue(os.path.exists(self.cache_file))
+
+    def test_moving_onto_identical_destination_removes_source(self):
+        results = Mover(**self._config(keep_source_behavior="never_keep_source"))._run_move_files()
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(os.listdir(self.source_dir), [])
+        self.assertCountEqual(os.listdir(self.dest_dir), ["same.txt", "different.txt", "new.txt"])
+
+    def test_later_runs_reuse_cached_hashes(self):
+        os.remove(os.path.join(self.source_dir, "new.txt"))
+        Mover(**self._config(destination_collision_behavior="ignore"))._run_move_files()
+        with mock.patch("filemover.content_hash.hash_file") as hash_file_mock:
+            results = Mover(**self._config(destination_collision_behavior="ignore"))._run_move_files()
+        self.assertEqual(results.skipped, 2)
+        hash_file_mock.assert_not_called()
+
+    def test_process_executor_saves_hashes_from_workers(self):
+        os.remove(os.path.join(self.source_dir, "new.txt"))
+        Mover(**self._config(destination_collision_behavior="ignore", executor="process", max_workers=2))._run_move_files()
+        with mock.patch("filemover.content_hash.hash_file") as hash_file_mock:
+            results = Mover(**self._config(destination_collision_behavior="ignore"))._run_move_files()
+        self.assertEqual(results.skipped, 2)
+        hash_file_mock.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from filemover.destination_index import DestinationIndex
+import tempfile
+import os
+
+class TestDestinationIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        for fname in ["a.txt", "b.txt", "c.txt"]:
+            with open(os.path.join(self.directory, fname), "w") as f:
+                f.write("test")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_exists_uses_directory_listing(self):
+        index = DestinationIndex()
+        self.assertTrue(index.exists(os.path.join(self.directory, "a.txt")))
+        self.assertFalse(index.exists(os.path.join(self.directory, "d.txt")))
+        # Files created outside the mover after the directory was listed aren't seen until it's invalidated
+        with open(os.path.join(self.directory, "d.txt"), "w") as f:
+            f.write("test")
+        self.assertFalse(index.exists(os.path.join(self.directory, "d.txt")))
+        index.invalidate(self.directory)
+        self.assertTrue(index.exists(os.path.join(self.directory, "d.txt")))
+
+    def test_add_and_discard(self):
+        index = DestinationIndex()
+        path = os.path.join(self.directory, "new.txt")
+        index.add(path)
+        self.assertTrue(index.exists(path))
+        index.discard(path)
+        self.assertFalse(index.exists(path))
+
+    def test_missing_directory_is_empty(self):
+        index = DestinationIndex()
+        self.assertFalse(index.exists(os.path.join(self.directory, "missing", "a.txt")))
+
+    def test_large_directory_falls_back_to_stat(self):
+        index = DestinationIndex(max_entries=2)
+        path = os.path.join(self.directory, "d.txt")
+        self.assertFalse(index.exists(path))
+        with open(path, "w") as f:
+            f.write("test")
+        self.assertTrue(index.exists(path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+from unittest import mock
+from filemover.file_copy import CopyBackend, CopyBackendType, FsyncMode, copy_file, fan_out_copy, remove_stale_temp_files
+from filemover.scanner import ScannedFile
+import tempfile
+import errno
+import uuid
+import os
+
+class TestFileCopy(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.temp_dir.name, "source.bin")
+        self.content = os.urandom(300_000)
+        with open(self.source_path, "wb") as f:
+            f.write(self.content)
+        os.utime(self.source_path, (1_000_000_000, 1_000_000_000))
+        os.chmod(self.source_path, 0o640)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _assert_copied(self, destination_path):
+        with open(destination_path, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        destination_stat = os.stat(destination_path)
+        self.assertEqual(destination_stat.st_mtime, 1_000_000_000)
+        self.assertEqual(destination_stat.st_mode & 0o777, 0o640)
+
+    def test_copy_file(self):
+        destination_path = os.path.join(self.temp_dir.name, "copy.bin")
+        copy_file(ScannedFile.from_path(self.source_path), destination_path)
+        self._assert_copied(destination_path)
+
+    def test_fan_out_copy_writes_every_destination(self):
+        destination_paths = [os.path.join(self.temp_dir.name, f"copy{i}.bin") for i in range(3)]
+        fan_out_copy(ScannedFile.from_path(self.source_path), destination_paths, chunk_size=64 * 1024)
+        for destination_path in destination_paths:
+            self._assert_copied(destination_path)
+
+    def test_fan_out_copy_cleans_up_on_failure(self):
+        first_path = os.path.join(self.temp_dir.name, "copy.bin")
+        missing_path = os.path.join(self.temp_dir.name, "missing", "copy.bin")
+        with self.assertRaises(OSError):
+            fan_out_copy(ScannedFile.from_path(self.source_path), [first_path, missing_path])
+        self.assertFalse(os.path.exists(first_path))
+
+    def test_every_backend_copies_contents_and_metadata(self):
+        source = ScannedFile.from_path(self.source_path)
+        for backend_type in CopyBackendType:
+            with self.subTest(backend_type=backend_type):
+                backend = CopyBackend(backend_type, chunk_size=64 * 1024)
+                destination_path = os.path.join(self.temp_dir.name, f"{backend_type.value}.bin")
+                backend.copy(source, destination_path)
+                self._assert_copied(destination_path)
+
+    def test_every_backend_copies_to_many(self):
+        source = ScannedFile.from_path(self.source_path)
+        for backend_type in CopyBackendType:
+            with self.subTest(backend_type=backend_type):
+                backend = CopyBackend(backend_type, chunk_size=64 * 1024)
+                destination_paths = [os.path.join(self.temp_dir.name, f"{backend_type.value}{i}.bin") for i in range(3)]
+                backend.copy_to_many(source, destination_paths)
+                for destination_path in destination_paths:
+                    self._assert_copied(destination_path)
+
+    def test_unsupported_reflink_is_only_tried_once_per_device(self):
+        backend = CopyBackend(CopyBackendType.AUTO, chunk_size=64 * 1024)
+        source = ScannedFile.from_path(self.source_path)
+        with mock.patch("filemover.file_copy.fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported")) as ioctl, \
+                mock.patch("filemover.file_copy.uuid.uuid4", wraps=uuid.uuid4) as uuid4:
+            for copy in range(2):
+                destination_paths = [os.path.join(self.temp_dir.name, f"copy{copy}_{i}.bin") for i in range(3)]
+                backend.copy_to_many(source, destination_paths)
+                for destination_path in destination_paths:
+                    self._assert_copied(destination_path)
+        self.assertEqual(ioctl.call_count, 1)
+        # One temporary file for the failed reflink and one for each copy
+        self.assertEqual(uuid4.call_count, 1 + 6)
+
+    def test_unsupported_kernel_copy_falls_back_to_chunked(self):
+        backend = CopyBackend(CopyBackendType.COPY_FILE_RANGE, chunk_size=64 * 1024)
+        destination_path = os.path.join(self.temp_dir.name, "fallback.bin")
+        with mock.patch("filemover.file_copy.os.copy_file_range", side_effect=OSError(errno.EXDEV, "Invalid cross-device link"), create=True):
+            backend.copy(ScannedFile.from_path(self.source_path), destination_path)
+        self._assert_copied(destination_path)
+
+    def test_failed_atomic_copy_keeps_existing_destination(self):
+        destination_path = os.path.join(self.temp_dir.name, "copy.bin")
+        with open(destination_path, "wb") as f:
+            f.write(b"existing")
+        backend = CopyBackend(CopyBackendType.CHUNKED, chunk_size=64 * 1024)
+        with mock.patch("filemover.file_copy.copy_metadata", side_effect=OSError(errno.EIO, "Input/output error")):
+            with self.assertRaises(OSError):
+                backend.copy(ScannedFile.from_path(self.source_path), destination_path)
+        with open(destination_path, "rb") as f:
+            self.assertEqual(f.read(), b"existing")
+        # The temporary file was removed
+        self.assertCountEqual(os.listdir(self.temp_dir.name), ["source.bin", "copy.bin"])
+
+    def test_atomic_copy_to_many_leaves_no_temporary_files(self):
+        backend = CopyBackend(CopyBackendType.CHUNKED, chunk_size=64 * 1024)
+        destination_paths = [os.path.join(self.temp_dir.name, f"copy{i}.bin") for i in range(3)]
+        backend.copy_to_many(ScannedFile.from_path(self.source_path), destination_paths)
+        self.assertCountEqual(os.listdir(self.temp_dir.name), ["source.bin", "copy0.bin", "copy1.bin", "copy2.bin"])
+
+    def test_per_file_fsync_flushes_file_and_directory(self):
+        backend = CopyBackend(CopyBackendType.CHUNKED, chunk_size=64 * 1024, fsync=FsyncMode.PER_FILE)
+        destination_path = os.path.join(self.temp_dir.name, "copy.bin")
+        with mock.patch("filemover.file_copy.os.fsync") as fsync, mock.patch("filemover.file_copy.fsync_directory") as fsync_directory:
+            backend.copy(ScannedFile.from_path(self.source_path), destination_path)
+        fsync.assert_called_once()
+        fsync_directory.assert_called_once_with(self.temp_dir.name)
+        self._assert_copied(destination_path)
+
+    def test_hardlink_replaces_existing_destination(self):
+        destination_path = os.path.join(self.temp_dir.name, "link.bin")
+        with open(destination_path, "wb") as f:
+            f.write(b"existing")
+        backend = CopyBackend(CopyBackendType.CHUNKED, atomic=False)
+        self.assertTrue(backend.hardlink(ScannedFile.from_path(self.source_path), destination_path))
+        self.assertEqual(os.stat(destination_path).st_ino, os.stat(self.source_path).st_ino)
+        self.assertCountEqual(os.listdir(self.temp_dir.name), ["source.bin", "link.bin"])
+
+    def test_hardlink_over_existing_hardlink_leaves_no_temporary_files(self):
+        destination_path = os.path.join(self.temp_dir.name, "link.bin")
+        os.link(self.source_path, destination_path)
+        backend = CopyBackend(CopyBackendType.CHUNKED)
+        self.assertTrue(backend.hardlink(ScannedFile.from_path(self.source_path), destination_path))
+        self.assertCountEqual(os.listdir(self.temp_dir.name), ["source.bin", "link.bin"])
+
+    def test_unsupported_hardlink_returns_false(self):
+        destination_path = os.path.join(self.temp_dir.name, "link.bin")
+        backend = CopyBackend(CopyBackendType.CHUNKED)
+        with mock.patch("filemover.file_copy.os.link", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            self.assertFalse(backend.hardlink(ScannedFile.from_path(self.source_path), destination_path))
+        self.assertFalse(os.path.exists(destination_path))
+
+    def test_remove_stale_temp_files(self):
+        temp_path = os.path.join(self.temp_dir.name, ".copy.bin.0123456789ab.filemover.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(b"partial")
+        self.assertEqual(remove_stale_temp_files(self.temp_dir.name), [])
+        self.assertEqual(remove_stale_temp_files(self.temp_dir.name, max_age=-1), [temp_path])
+        self.assertEqual(os.listdir(self.temp_dir.name), ["source.bin"])
+
+    def test_backend_type_from_string_invalid(self):
+        with self.assertRaises(ValueError):
+            CopyBackendType.from_string("teleport")
+
+if __name__ == "__main__":
+    unittest.main()
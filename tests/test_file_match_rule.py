@@ -1,6 +1,9 @@
 import unittest
-from filemover.match_files_config import FileMatchRule, FileMatchType, FileNameMatchMode, FileMatchType
+from filemover.match_files_config import FileMatchRule, FileMatchType, FileNameMatchMode, FileMatchType, FileMatchConfig, parse_size, parse_time
+from filemover.scanner import ScannedFile
+from unittest import mock
 import tempfile
+import time
 import os
 
 class TestFileMatchRuleMatchesFile(unittest.TestCase):
@@ -409,4 +412,116 @@ class TestFileMatchRuleMatchesFile(unittest.TestCase):
         self.assertTrue(rule.matches_filename(self.filename_with_caps_and_space_txt))
         self.assertFalse(rule.matches_filename(self.filename_with_multiple_dots_and_space_txt))
         self.assertTrue(rule.matches_filename(self.filename_with_caps_multiple_dots_and_space_txt))
-        self.assertTrue(rule.matches_filename(self.filename_parts_reversed_txt))
\ No newline at end of file
+        self.assertTrue(rule.matches_filename(self.filename_parts_reversed_txt))
+
+class TestFileMatchConfigCompile(unittest.TestCase):
+    def test_and_requires_every_rule(self):
+        config = FileMatchConfig(operator="and", rules=[
+            {"type": "file_name", "mode": "regex_include", "value": r"^report_\d+$"},
+            {"type": "file_type", "mode": "multiple_exact", "value": ["csv", "txt"]},
+        ])
+        matcher = config.compile()
+        self.assertTrue(matcher("report_1.csv"))
+        self.assertFalse(matcher("report_1.pdf"))
+        self.assertFalse(matcher("summary.csv"))
+
+    def test_or_requires_any_rule(self):
+        config = FileMatchConfig(operator="or", rules=[
+            {"type": "file_name", "mode": "starts_with", "value": "KEEP", "case_sensitive": False},
+            {"type": "file_type", "mode": "single_exact", "value": "log"},
+        ])
+        self.assertTrue(config.matches_filename("keep_me.txt"))
+        self.assertTrue(config.matches_filename("server.log"))
+        self.assertFalse(config.matches_filename("other.txt"))
+
+    def test_disabled_matches_everything(self):
+        config = FileMatchConfig(enabled=False, rules=[{"type": "file_type", "mode": "single_exact", "value": "log"}])
+        self.assertTrue(config.matches_filename("anything.txt"))
+
+    def test_no_rules_matches_everything(self):
+        config = FileMatchConfig()
+        self.assertTrue(config.matches_filename("anything.txt"))
+
+    def test_invalid_regex_raises_value_error(self):
+        config = FileMatchConfig(rules=[{"type": "file_name", "mode": "regex_include", "value": "("}])
+        with self.assertRaises(ValueError):
+            config.compile()
+
+    def test_compile_picks_up_changed_rules(self):
+        config = FileMatchConfig(rules=[{"type": "file_type", "mode": "single_exact", "value": "log"}])
+        self.assertFalse(config.matches_filename("file.txt"))
+        config.rules = [FileMatchRule(type="file_type", mode="single_exact", value="txt")]
+        config.compile()
+        self.assertTrue(config.matches_filename("file.txt"))
+
+class TestFileMatchStatRules(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = time.time()
+        self.small = self._create("small.txt", 10, self.now - 60)
+        self.large = self._create("large.txt", 5000, self.now - 3 * 24 * 60 * 60)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _create(self, name, size, mtime):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        os.utime(path, (mtime, mtime))
+        return ScannedFile.from_path(path)
+
+    def test_parse_size_and_time(self):
+        self.assertEqual(parse_size(100), 100)
+        self.assertEqual(parse_size("10MB"), 10_000_000)
+        self.assertEqual(parse_size("1.5 KiB"), 1536)
+        self.assertEqual(parse_time("12h"), (12 * 60 * 60, True))
+        self.assertEqual(parse_time(30), (30.0, True))
+        self.assertFalse(parse_time("2024-01-31")[1])
+        for invalid in ["10 parsecs", -1, True]:
+            with self.assertRaises(ValueError):
+                parse_size(invalid)
+        with self.assertRaises(ValueError):
+            parse_time("yesterday")
+
+    def test_invalid_values_raise_on_creation(self):
+        with self.assertRaises(ValueError):
+            FileMatchRule(type="file_size", mode="min", value="big")
+        with self.assertRaises(ValueError):
+            FileMatchRule(type="file_time", mode="older_than")
+        with self.assertRaises(ValueError):
+            FileMatchRule(type="file_time", mode="older_than", value="1d", time_attribute="atime")
+
+    def test_file_size_rules(self):
+        config = FileMatchConfig(rules=[
+            {"type": "file_size", "mode": "min", "value": 0},
+            {"type": "file_size", "mode": "max", "value": "1KB"},
+        ])
+        self.assertTrue(config.matches_file(self.small))
+        self.assertFalse(config.matches_file(self.large))
+
+    def test_relative_and_absolute_file_time_rules(self):
+        older = FileMatchConfig(rules=[{"type": "file_time", "mode": "older_than", "value": "1d"}])
+        self.assertFalse(older.matches_file(self.small))
+        self.assertTrue(older.matches_file(self.large))
+        self.assertTrue(older.has_relative_time_rules)
+
+        cutoff = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.now - 24 * 60 * 60))
+        newer = FileMatchConfig(rules=[{"type": "file_time", "mode": "newer_than", "value": cutoff, "time_attribute": "mtime"}])
+        self.assertTrue(newer.matches_file(self.small))
+        self.assertFalse(newer.matches_file(self.large))
+        self.assertFalse(newer.has_relative_time_rules)
+
+    def test_stat_is_only_read_when_name_rules_pass(self):
+        config = FileMatchConfig(rules=[
+            {"type": "file_size", "mode": "max", "value": 100},
+            {"type": "file_type", "mode": "single_exact", "value": "csv"},
+        ])
+        with mock.patch("filemover.scanner.os.stat") as stat:
+            self.assertFalse(config.matches_file(ScannedFile.from_path(os.path.join(self.temp_dir.name, "small.txt"))))
+        stat.assert_not_called()
+
+    def test_stat_rules_need_a_file(self):
+        config = FileMatchConfig(rules=[{"type": "file_size", "mode": "min", "value": 1}])
+        with self.assertRaises(ValueError):
+            config.matches_filename("small.txt")
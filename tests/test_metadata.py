@@ -0,0 +1,155 @@
+import unittest
+from filemover.metadata import HISTORY_FIELDS, Metadata, MetadataBackendType, ExecutionResults, JsonMetadataBackend, SqliteMetadataBackend
+import threading
+import sqlite3
+import tempfile
+import json
+import os
+
+class MetadataTestMixin:
+    backend_type = MetadataBackendType.JSON
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "filemover.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unknown_mover_has_zero_counts(self):
+        metadata = Metadata(self.file_path, self.backend_type)
+        self.assertEqual(metadata.get_execution_count("missing"), 0)
+        self.assertEqual(metadata.get_data("missing").get_dict(), ExecutionResults(executions=0).get_dict())
+
+    def test_update_accumulates_counts(self):
+        metadata = Metadata(self.file_path, self.backend_type)
+        metadata.update("mover", ExecutionResults(copied=2, moved=1))
+        metadata.update("mover", ExecutionResults(copied=3, errors=1))
+        metadata.update("other", ExecutionResults(deleted=4))
+        self.assertEqual(metadata.get_execution_count("mover"), 2)
+        self.assertEqual(metadata.get_copied_count("mover"), 5)
+        self.assertEqual(metadata.get_moved_count("mover"), 1)
+        self.assertEqual(metadata.get_error_count("mover"), 1)
+        self.assertEqual(metadata.get_deleted_count("mover"), 0)
+        self.assertEqual(metadata.get_data("other").deleted, 4)
+
+    def _run(self, copied):
+        return ExecutionResults(copied=copied, bytes_copied=copied * 10, started_at=1000.0, finished_at=1002.0, phase_times={"copy": 1.5})
+
+    def test_update_records_run_history(self):
+        metadata = Metadata(self.file_path, self.backend_type)
+        metadata.update("mover", self._run(4))
+        history = metadata.get_history("mover")
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0].copied, 4)
+        self.assertEqual(history[0].bytes_copied, 40)
+        self.assertEqual(history[0].duration, 2.0)
+        self.assertEqual(history[0].files_per_second, 2.0)
+        self.assertEqual(history[0].phase_times["copy"], 1.5)
+
+    def test_history_keeps_latest_runs(self):
+        metadata = Metadata(self.file_path, self.backend_type, history_limit=3)
+        for copied in range(5):
+            metadata.update("mover", self._run(copied))
+        metadata.update("other", self._run(9))
+        self.assertEqual([run.copied for run in metadata.get_history("mover")], [2, 3, 4])
+        self.assertEqual(metadata.get_copied_count("mover"), 10)
+        self.assertEqual(len(metadata.get_history("other")), 1)
+
+    def test_untimed_results_are_not_added_to_history(self):
+        metadata = Metadata(self.file_path, self.backend_type)
+        metadata.update("mover", ExecutionResults(copied=1))
+        self.assertEqual(metadata.get_history("mover"), [])
+
+class TestJsonMetadata(MetadataTestMixin, unittest.TestCase):
+    backend_type = MetadataBackendType.JSON
+
+    def test_migrates_version_1_file(self):
+        with open(self.file_path, "w") as f:
+            json.dump({"_version": 1, "mover": ExecutionResults(copied=2).get_dict()}, f)
+        metadata = Metadata(self.file_path)
+        metadata.update("mover", self._run(1))
+        self.assertEqual(metadata.get_copied_count("mover"), 3)
+        with open(self.file_path) as f:
+            data = json.load(f)
+        self.assertEqual(data["_version"], 2)
+        self.assertEqual(len(data["mover"]["history"]), 1)
+
+    def test_history_rows_are_written_on_one_line(self):
+        metadata = Metadata(self.file_path)
+        metadata.update("mover", self._run(1))
+        with open(self.file_path) as f:
+            lines = [line.strip() for line in f]
+        self.assertIn("[1000.0,1002.0,1,0,0,0,0,10,0.0,0.0,0.0,1.5,0.0,0.0,0.0]", lines)
+
+    def test_concurrent_updates_from_separate_instances_are_not_lost(self):
+        # Each mover in a group has its own Metadata for the same file
+        def update(mover_id):
+            metadata = Metadata(self.file_path)
+            for _ in range(10):
+                metadata.update(mover_id, ExecutionResults(moved=1))
+        threads = [threading.Thread(target=update, args=(f"mover{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metadata = Metadata(self.file_path)
+        for i in range(8):
+            self.assertEqual(metadata.get_moved_count(f"mover{i}"), 10)
+        self.assertCountEqual(os.listdir(self.temp_dir.name), ["filemover.json"])
+
+    def test_uses_json_backend(self):
+        self.assertIsInstance(Metadata(self.file_path).backend, JsonMetadataBackend)
+
+class TestSqliteMetadata(MetadataTestMixin, unittest.TestCase):
+    backend_type = MetadataBackendType.SQLITE
+
+    def test_json_path_uses_database_next_to_it(self):
+        metadata = Metadata(self.file_path, self.backend_type)
+        self.assertIsInstance(metadata.backend, SqliteMetadataBackend)
+        self.assertEqual(metadata.backend.file_path, os.path.join(self.temp_dir.name, "filemover.db"))
+
+    def test_migrates_existing_json_metadata_once(self):
+        json_metadata = Metadata(self.file_path)
+        json_metadata.update("mover", ExecutionResults(copied=2))
+        json_metadata.update("mover", self._run(0))
+        metadata = Metadata(self.file_path, self.backend_type)
+        self.assertEqual(metadata.get_copied_count("mover"), 2)
+        self.assertEqual(metadata.get_execution_count("mover"), 2)
+        self.assertEqual(len(metadata.get_history("mover")), 1)
+
+        metadata.update("mover", ExecutionResults(copied=1))
+        reopened = Metadata(self.file_path, self.backend_type)
+        self.assertEqual(reopened.get_copied_count("mover"), 3)
+
+    def test_adds_run_fields_missing_from_existing_database(self):
+        database_path = os.path.join(self.temp_dir.name, "filemover.db")
+        connection = sqlite3.connect(database_path)
+        with connection:
+            connection.execute(f"CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, mover_id TEXT NOT NULL, {', '.join(HISTORY_FIELDS[:-2])})")
+            connection.execute(f"INSERT INTO runs (mover_id, {', '.join(HISTORY_FIELDS[:-2])}) VALUES (?, {', '.join('?' for _ in HISTORY_FIELDS[:-2])})", ("mover", *self._run(1).get_history_record()[:-2]))
+        connection.close()
+        metadata = Metadata(self.file_path, self.backend_type)
+        metadata.update("mover", self._run(2))
+        history = metadata.get_history("mover")
+        self.assertEqual([run.copied for run in history], [1, 2])
+        self.assertEqual(history[0].worker_times["copy"], 0.0)
+
+    def test_concurrent_updates_are_not_lost(self):
+        metadata = Metadata(self.file_path, self.backend_type)
+        def update():
+            for _ in range(20):
+                metadata.update("mover", ExecutionResults(moved=1))
+        threads = [threading.Thread(target=update) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(metadata.get_moved_count("mover"), 80)
+        self.assertEqual(metadata.get_execution_count("mover"), 80)
+
+class TestMetadataBackendType(unittest.TestCase):
+    def test_from_string(self):
+        self.assertEqual(MetadataBackendType.from_string("sqlite"), MetadataBackendType.SQLITE)
+        with self.assertRaises(ValueError):
+            MetadataBackendType.from_string("csv")
@@ -0,0 +1,80 @@
+import unittest
+from filemover import Mover
+from filemover.move_plan import PlanAction, DestinationAction, PlanEntry, read_plan
+from tests.mover_test_mixin import MoverTestMixin
+import os
+
+class TestMoverPlan(MoverTestMixin, unittest.TestCase):
+    mover_name = "TestPlanMover"
+    source_files = ["a.txt", "b.txt", "c.csv"]
+
+    def setUp(self):
+        super().setUp()
+        self.plan_file = os.path.join(self.temp_dir.name, "plan.jsonl")
+        os.makedirs(self.dest_dir)
+        with open(os.path.join(self.dest_dir, "b.txt"), "w") as f:
+            f.write("existing")
+
+    def _base_config(self):
+        config = super()._base_config()
+        config["match_files"] = {
+            "enabled": True,
+            "operator": "and",
+            "rules": [{"type": "file_type", "mode": "single_exact", "value": "txt"}]
+        }
+        config["keep_source_behavior"] = "keep_source_if_any_collide"
+        config["destination_collision_behavior"] = "ignore"
+        return config
+
+    def _plan(self, **overrides) -> dict[str, PlanEntry]:
+        return {os.path.basename(entry.source): entry for entry in Mover(**self._config(**overrides)).iter_plan()}
+
+    def test_plan_does_not_change_anything(self):
+        Mover(**self._config()).write_plan(self.plan_file)
+        self.assertCountEqual(os.listdir(self.source_dir), ["a.txt", "b.txt", "c.csv"])
+        self.assertCountEqual(os.listdir(self.dest_dir), ["b.txt"])
+
+    def test_plan_actions_and_reasons(self):
+        plan = self._plan()
+        self.assertCountEqual(plan.keys(), ["a.txt", "b.txt"])
+        self.assertEqual(plan["a.txt"].action, PlanAction.MOVE)
+        self.assertEqual(plan["a.txt"].destinations, [(os.path.join(self.dest_dir, "a.txt"), DestinationAction.WRITE)])
+        self.assertEqual(plan["b.txt"].action, PlanAction.SKIP)
+        self.assertEqual(plan["b.txt"].reason, "destinations_exist")
+        self.assertEqual(plan["b.txt"].destinations, [(os.path.join(self.dest_dir, "b.txt"), DestinationAction.SKIP)])
+
+    def test_plan_includes_collision_avoidance_and_renames(self):
+        plan = self._plan(collision_avoidance_behavior="cancel_move_if_any_collide", rename={"enabled": True, "prefix": "new_"})
+        self.assertEqual(plan["a.txt"].destinations, [(os.path.join(self.dest_dir, "new_a.txt"), DestinationAction.WRITE)])
+        self.assertEqual(plan["b.txt"].action, PlanAction.MOVE)
+
+        plan = self._plan(collision_avoidance_behavior="cancel_move_if_any_collide")
+        self.assertEqual(plan["b.txt"].action, PlanAction.SKIP)
+        self.assertEqual(plan["b.txt"].reason, "cancel_move_if_any_collide")
+
+    def test_plan_round_trips_through_json(self):
+        entry = self._plan(destination_collision_behavior="overwrite")["b.txt"]
+        loaded = PlanEntry.from_json(entry.to_json())
+        self.assertEqual(loaded.action, PlanAction.COPY)
+        self.assertEqual(loaded.destinations, [(os.path.join(self.dest_dir, "b.txt"), DestinationAction.OVERWRITE)])
+        self.assertEqual((loaded.size, loaded.mtime_ns), (entry.size, entry.mtime_ns))
+
+    def test_execute_plan_applies_saved_plan(self):
+        count = Mover(**self._config()).write_plan(self.plan_file)
+        self.assertEqual(count, 2)
+        self.assertEqual(len(list(read_plan(self.plan_file))), 2)
+        results = Mover(**self._config(max_workers=2)).execute_plan(self.plan_file)
+        self.assertEqual(results.moved, 1)
+        self.assertEqual(results.errors, 0)
+        self.assertCountEqual(os.listdir(self.source_dir), ["b.txt", "c.csv"])
+        with open(os.path.join(self.dest_dir, "b.txt")) as f:
+            self.assertEqual(f.read(), "existing")
+
+    def test_execute_plan_skips_stale_entries(self):
+        Mover(**self._config()).write_plan(self.plan_file)
+        with open(os.path.join(self.dest_dir, "a.txt"), "w") as f:
+            f.write("appeared after planning")
+        results = Mover(**self._config()).execute_plan(self.plan_file)
+        self.assertEqual(results.moved, 0)
+        self.assertEqual(results.skipped, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "a.txt")))
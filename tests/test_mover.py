@@ -1,10 +1,19 @@
 import unittest
+from unittest import mock
 from filemover import Mover
+from filemover.retry import RetryConfig
+from filemover.scanner import ScannedFile
+from tests.mover_test_mixin import MoverTestMixin
+import threading
 import tempfile
+import time
+import errno
+import shutil
+import json
 import os
 
 class DummyRenameConfig():
-    def apply_rename(self, file_name):
+    def apply_rename(self, file_name, source=None):
         return f"RENAMED_{file_name}"
 
 class TestMoverShouldMoveFile(unittest.TestCase):
@@ -369,6 +378,32 @@ class TestMoverListMatchedFiles(unittest.TestCase):
         expected.append(os.path.join(sub_dir, "subfile.txt"))
         self.assertCountEqual(matched, expected)
 
+    def test_iter_matched_files_yields_lazily(self):
+        config = {
+            "mover_name": "TestMover",
+            "match_files": {
+                "enabled": True,
+                "operator": "and",
+                "rules": [
+                    {
+                        "type": "file_type",
+                        "mode": "single_exact",
+                        "value": "txt"
+                    }
+                ]
+            },
+            "source_directories": [self.source_dir],
+            "destination_directories": [self.dest_dir],
+            "verbose": False
+        }
+        mover = Mover(**config)
+        matched = mover.iter_matched_files()
+        self.assertNotIsInstance(matched, list)
+        first = next(matched)
+        self.assertTrue(first.endswith(".txt"))
+        expected = [os.path.join(self.source_dir, f) for f in self.files if f.endswith(".txt")]
+        self.assertCountEqual([first, *matched], expected)
+
 class TestMoverGetDestinationFilesForSource(unittest.TestCase):
     def setUp(self):
         self.temp_dir = tempfile.TemporaryDirectory()
@@ -448,3 +483,574 @@ class TestMoverGetDestinationFilesForSource(unittest.TestCase):
         expected_collisions = [existing_path_1, existing_path_2]
         self.assertEqual(destinations, expected_destinations)
         self.assertEqual(collisions, expected_collisions)
+
+class TestMoverMoveFiles(MoverTestMixin, unittest.TestCase):
+    source_files = ["a.txt", "b.txt", "c.csv"]
+
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.dest_dir)
+
+    def _base_config(self):
+        config = super()._base_config()
+        config["match_files"] = {
+            "enabled": True,
+            "operator": "and",
+            "rules": [
+                {
+                    "type": "file_type",
+                    "mode": "single_exact",
+                    "value": "txt"
+                }
+            ]
+        }
+        return config
+
+    def test_move_removes_source_and_keeps_contents(self):
+        mover = Mover(**self._config())
+        results = mover._run_move_files()
+        self.assertEqual(results.moved, 2)
+        self.assertEqual(results.errors, 0)
+        self.assertCountEqual(os.listdir(self.dest_dir), ["a.txt", "b.txt"])
+        self.assertCountEqual(os.listdir(self.source_dir), ["c.csv"])
+        with open(os.path.join(self.dest_dir, "a.txt")) as f:
+            self.assertEqual(f.read(), "content of a.txt")
+
+    def test_move_on_same_device_renames_source(self):
+        source_inode = os.stat(os.path.join(self.source_dir, "a.txt")).st_ino
+        mover = Mover(**self._config())
+        results = mover._run_move_files()
+        self.assertEqual(results.moved, 2)
+        self.assertEqual(os.stat(os.path.join(self.dest_dir, "a.txt")).st_ino, source_inode)
+
+    def test_move_symlink_copies_target_instead_of_renaming_link(self):
+        target = os.path.join(self.temp_dir.name, "target.txt")
+        with open(target, "w") as f:
+            f.write("content of target")
+        os.symlink(target, os.path.join(self.source_dir, "link.txt"))
+        results = Mover(**self._config())._run_move_files()
+        self.assertEqual(results.moved, 3)
+        self.assertEqual(results.errors, 0)
+        destination = os.path.join(self.dest_dir, "link.txt")
+        self.assertFalse(os.path.islink(destination))
+        with open(destination) as f:
+            self.assertEqual(f.read(), "content of target")
+        self.assertFalse(os.path.lexists(os.path.join(self.source_dir, "link.txt")))
+        self.assertTrue(os.path.exists(target))
+
+    def test_move_onto_hardlink_of_source_removes_source(self):
+        os.link(os.path.join(self.source_dir, "a.txt"), os.path.join(self.dest_dir, "a.txt"))
+        results = Mover(**self._config(destination_collision_behavior="overwrite"))._run_move_files()
+        self.assertEqual(results.moved, 2)
+        self.assertEqual(results.errors, 0)
+        self.assertCountEqual(os.listdir(self.source_dir), ["c.csv"])
+        with open(os.path.join(self.dest_dir, "a.txt")) as f:
+            self.assertEqual(f.read(), "content of a.txt")
+
+    def test_move_across_devices_falls_back_to_copy(self):
+        mover = Mover(**self._config())
+        replace = os.replace
+        def cross_device_replace(source, destination):
+            # Only renames out of the source directory cross devices; atomic copies still rename within the destination
+            if source.startswith(self.source_dir):
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            replace(source, destination)
+        with mock.patch("filemover.mover.os.replace", side_effect=cross_device_replace):
+            results = mover._run_move_files()
+        self.assertEqual(results.moved, 2)
+        self.assertEqual(results.errors, 0)
+        self.assertCountEqual(os.listdir(self.dest_dir), ["a.txt", "b.txt"])
+        self.assertCountEqual(os.listdir(self.source_dir), ["c.csv"])
+
+    def test_file_that_cant_be_statted_is_skipped(self):
+        config = self._config()
+        config["match_files"] = {"enabled": True, "operator": "and", "rules": [{"type": "file_size", "mode": "min", "value": 1}]}
+        mover = Mover(**config)
+        stat = ScannedFile.stat.fget
+        def failing_stat(scanned):
+            if scanned.name == "a.txt":
+                raise PermissionError(errno.EACCES, "Permission denied", scanned.path)
+            return stat(scanned)
+        with mock.patch.object(ScannedFile, "stat", property(failing_stat)):
+            results = mover._run_move_files()
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(results.moved, 2)
+        self.assertCountEqual(os.listdir(self.source_dir), ["a.txt"])
+
+    def test_first_run_removes_stale_temporary_files(self):
+        temp_path = os.path.join(self.dest_dir, ".a.txt.0123456789ab.filemover.tmp")
+        with open(temp_path, "w") as f:
+            f.write("partial")
+        with mock.patch("filemover.mover.STALE_TEMP_FILE_SECONDS", -1):
+            results = Mover(**self._config())._run_move_files()
+        self.assertEqual(results.moved, 2)
+        self.assertCountEqual(os.listdir(self.dest_dir), ["a.txt", "b.txt"])
+
+    def test_per_run_fsync_flushes_each_directory_once(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source", fsync="per_run"))
+        with mock.patch("filemover.mover.fsync_directory") as fsync_directory:
+            results = mover._run_move_files()
+        self.assertEqual(results.copied, 2)
+        fsync_directory.assert_called_once_with(self.dest_dir)
+
+    def test_hardlink_mode_links_kept_sources(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source", link_mode="hardlink"))
+        results = mover._run_move_files()
+        self.assertEqual(results.copied, 2)
+        self.assertEqual(results.hardlinked, 2)
+        self.assertEqual(results.bytes_copied, 0)
+        for fname in ["a.txt", "b.txt"]:
+            self.assertEqual(os.stat(os.path.join(self.dest_dir, fname)).st_ino, os.stat(os.path.join(self.source_dir, fname)).st_ino)
+
+    def test_link_modes_fall_back_to_copy(self):
+        for link_mode in ["hardlink", "reflink", "auto"]:
+            with self.subTest(link_mode=link_mode):
+                mover = Mover(**self._config(keep_source_behavior="keep_source", destination_collision_behavior="overwrite", link_mode=link_mode))
+                with mock.patch("filemover.file_copy.os.link", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")), \
+                        mock.patch.object(mover._copy_backend, "reflink", return_value=False):
+                    results = mover._run_move_files()
+                self.assertEqual(results.copied, 2)
+                self.assertEqual(results.hardlinked + results.reflinked, 0)
+                self.assertGreater(results.bytes_copied, 0)
+                self.assertNotEqual(os.stat(os.path.join(self.dest_dir, "a.txt")).st_ino, os.stat(os.path.join(self.source_dir, "a.txt")).st_ino)
+
+    def test_rename_timestamp_from_file_mtime(self):
+        os.utime(os.path.join(self.source_dir, "a.txt"), (1_000_000_000, 1_000_000_000))
+        rename = {"enabled": True, "add_timestamp": {"enabled": True, "source": "file_mtime", "timezone": "UTC", "format": "%Y%m%d", "position": "start"}}
+        mover = Mover(**self._config(keep_source_behavior="keep_source", rename=rename))
+        results = mover._run_move_files()
+        self.assertEqual(results.copied, 2)
+        self.assertIn("20010909_a.txt", os.listdir(self.dest_dir))
+
+    def test_copy_preserves_modification_time(self):
+        source_path = os.path.join(self.source_dir, "a.txt")
+        os.utime(source_path, (1_000_000_000, 1_000_000_000))
+        mover = Mover(**self._config(keep_source_behavior="keep_source"))
+        results = mover._run_move_files()
+        self.assertEqual(results.copied, 2)
+        self.assertTrue(os.path.exists(source_path))
+        self.assertEqual(os.stat(os.path.join(self.dest_dir, "a.txt")).st_mtime, 1_000_000_000)
+
+    def test_ignore_collision_does_not_overwrite(self):
+        existing_path = os.path.join(self.dest_dir, "a.txt")
+        with open(existing_path, "w") as f:
+            f.write("existing")
+        mover = Mover(**self._config(keep_source_behavior="keep_source", destination_collision_behavior="ignore"))
+        results = mover._run_move_files()
+        self.assertEqual(results.copied, 1)
+        self.assertEqual(results.skipped, 1)
+        with open(existing_path) as f:
+            self.assertEqual(f.read(), "existing")
+
+    def test_same_name_from_two_sources_collides_within_run(self):
+        second_source_dir = os.path.join(self.temp_dir.name, "src2")
+        os.makedirs(second_source_dir)
+        with open(os.path.join(second_source_dir, "a.txt"), "w") as f:
+            f.write("second")
+        mover = Mover(**self._config(source_directories=[self.source_dir, second_source_dir], keep_source_behavior="keep_source"))
+        results = mover._run_move_files()
+        self.assertEqual(results.copied, 2)
+        self.assertEqual(results.skipped, 1)
+        with open(os.path.join(self.dest_dir, "a.txt")) as f:
+            self.assertEqual(f.read(), "content of a.txt")
+
+    def test_overwrite_collision_replaces_existing_file(self):
+        existing_path = os.path.join(self.dest_dir, "a.txt")
+        with open(existing_path, "w") as f:
+            f.write("existing")
+        mover = Mover(**self._config(keep_source_behavior="keep_source", destination_collision_behavior="overwrite"))
+        results = mover._run_move_files()
+        self.assertEqual(results.copied, 2)
+        with open(existing_path) as f:
+            self.assertEqual(f.read(), "content of a.txt")
+
+    def test_results_record_timing_and_bytes(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source"))
+        results = mover._run_move_files()
+        self.assertEqual(results.copied, 2)
+        self.assertEqual(results.bytes_copied, len("content of a.txt") + len("content of b.txt"))
+        self.assertIsNotNone(results.duration)
+        self.assertGreater(results.phase_times["scan"], 0)
+        self.assertGreater(results.phase_times["copy"], 0)
+
+    def test_move_files_records_history(self):
+        metadata_file = os.path.join(self.temp_dir.name, "metadata.json")
+        mover = Mover(**self._config(id="history_mover", metadata_file=metadata_file, metadata_history_limit=1))
+        mover.move_files()
+        mover.move_files()
+        history = mover.metadata.get_history("history_mover")
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0].moved, 0)
+        self.assertEqual(mover.metadata.get_moved_count("history_mover"), 2)
+
+    def test_process_files_only_moves_given_matching_files(self):
+        mover = Mover(**self._config())
+        outside_path = os.path.join(self.temp_dir.name, "outside.txt")
+        with open(outside_path, "w") as f:
+            f.write("outside")
+        results = mover.process_files([
+            os.path.join(self.source_dir, "a.txt"),
+            os.path.join(self.source_dir, "c.csv"),
+            os.path.join(self.source_dir, "missing.txt"),
+            outside_path,
+        ])
+        self.assertEqual(results.moved, 1)
+        self.assertEqual(results.errors, 0)
+        self.assertCountEqual(os.listdir(self.dest_dir), ["a.txt"])
+        self.assertTrue(os.path.exists(outside_path))
+
+    def test_watch_moves_existing_files_and_stops(self):
+        mover = Mover(**self._config())
+        stop_event = threading.Event()
+        stop_event.set()
+        mover.watch(poll_interval=0, force_polling=True, stop_event=stop_event)
+        self.assertCountEqual(os.listdir(self.dest_dir), ["a.txt", "b.txt"])
+
+class TestMoverParallelMoveFiles(MoverTestMixin, unittest.TestCase):
+    mover_name = "TestParallelMover"
+    source_files = [f"file{i}.txt" for i in range(40)]
+
+    def setUp(self):
+        super().setUp()
+        self.dest1 = os.path.join(self.temp_dir.name, "dst1")
+        self.dest2 = os.path.join(self.temp_dir.name, "dst2")
+
+    def _base_config(self):
+        config = super()._base_config()
+        config["destination_directories"] = [self.dest1, self.dest2]
+        config["max_workers"] = 4
+        return config
+
+    def test_invalid_max_workers_raises(self):
+        with self.assertRaises(ValueError):
+            Mover(**self._config(max_workers=0))
+
+    def test_thread_pool_moves_all_files(self):
+        mover = Mover(**self._config())
+        results = mover._run_move_files()
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(results.moved, len(self.source_files) * 2)
+        self.assertEqual(os.listdir(self.source_dir), [])
+        self.assertCountEqual(os.listdir(self.dest1), self.source_files)
+        self.assertCountEqual(os.listdir(self.dest2), self.source_files)
+
+    def test_thread_pool_keeps_source_when_any_collide(self):
+        os.makedirs(self.dest2)
+        with open(os.path.join(self.dest2, "file0.txt"), "w") as f:
+            f.write("existing")
+        mover = Mover(**self._config(keep_source_behavior="keep_source_if_any_collide"))
+        results = mover._run_move_files()
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(os.listdir(self.source_dir), ["file0.txt"])
+        self.assertEqual(results.copied, 1)
+        self.assertEqual(results.skipped, 1)
+        self.assertEqual(results.moved, (len(self.source_files) - 1) * 2)
+
+    def test_phase_times_are_not_summed_across_workers(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source"))
+        copy_to_destinations = mover._copy_to_destinations
+        def slow_copy_to_destinations(*args):
+            time.sleep(0.01)
+            return copy_to_destinations(*args)
+        with mock.patch.object(mover, "_copy_to_destinations", side_effect=slow_copy_to_destinations):
+            results = mover._run_move_files()
+        self.assertEqual(results.errors, 0)
+        self.assertGreaterEqual(results.worker_times["copy"], len(self.source_files) * 0.01)
+        self.assertGreater(results.phase_times["copy"], 0)
+        self.assertLessEqual(sum(results.phase_times.values()), results.duration)
+
+    def test_process_pool_copies_all_files(self):
+        mover = Mover(**self._config(executor="process", max_workers=2, keep_source_behavior="keep_source"))
+        results = mover._run_move_files()
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(results.copied, len(self.source_files) * 2)
+        self.assertCountEqual(os.listdir(self.source_dir), self.source_files)
+        self.assertCountEqual(os.listdir(self.dest1), self.source_files)
+
+class TestMoverIncremental(MoverTestMixin, unittest.TestCase):
+    mover_name = "TestIncrementalMover"
+
+    def setUp(self):
+        super().setUp()
+        self.index_file = os.path.join(self.temp_dir.name, "index.json")
+        # Directory mtimes from the last couple of seconds aren't trusted, so make the source look old
+        os.utime(self.source_dir, (1_000_000_000, 1_000_000_000))
+
+    def _base_config(self):
+        config = super()._base_config()
+        config["keep_source_behavior"] = "keep_source"
+        config["destination_collision_behavior"] = "overwrite"
+        return config
+
+    def _config(self, **incremental):
+        return super()._config(incremental={"enabled": True, "index_file": self.index_file, **incremental})
+
+    def test_requires_id_or_index_file(self):
+        config = self._config()
+        config["incremental"] = {"enabled": True}
+        with self.assertRaises(ValueError):
+            Mover(**config)
+
+    def test_unchanged_files_are_skipped(self):
+        first = Mover(**self._config(skip_unchanged_directories=False))._run_move_files()
+        self.assertEqual(first.copied, 3)
+        second = Mover(**self._config(skip_unchanged_directories=False))._run_move_files()
+        self.assertEqual(second.copied, 0)
+
+        with open(os.path.join(self.source_dir, "b.txt"), "w") as f:
+            f.write("changed")
+        os.utime(os.path.join(self.source_dir, "b.txt"), (2_000_000_000, 2_000_000_000))
+        third = Mover(**self._config(skip_unchanged_directories=False))._run_move_files()
+        self.assertEqual(third.copied, 1)
+        with open(os.path.join(self.dest_dir, "b.txt")) as f:
+            self.assertEqual(f.read(), "changed")
+
+    def test_unchanged_directories_are_not_listed(self):
+        Mover(**self._config())._run_move_files()
+        # A file added without changing the directory mtime is only found if the directory is listed again
+        with open(os.path.join(self.source_dir, "d.txt"), "w") as f:
+            f.write("d.txt")
+        os.utime(self.source_dir, (1_000_000_000, 1_000_000_000))
+        second = Mover(**self._config())._run_move_files()
+        self.assertEqual(second.copied, 0)
+
+        os.utime(self.source_dir, (1_500_000_000, 1_500_000_000))
+        third = Mover(**self._config())._run_move_files()
+        self.assertEqual(third.copied, 1)
+
+    def test_age_rules_list_unchanged_directories(self):
+        config = self._config()
+        config["match_files"] = {"enabled": True, "operator": "and", "rules": [{"type": "file_time", "mode": "older_than", "value": "1h"}]}
+        first = Mover(**config)._run_move_files()
+        self.assertEqual(first.copied, 0)
+        # The files age into the rule without their directory changing
+        for fname in ["a.txt", "b.txt", "c.txt"]:
+            os.utime(os.path.join(self.source_dir, fname), (1_000_000_000, 1_000_000_000))
+        os.utime(self.source_dir, (1_000_000_000, 1_000_000_000))
+        second = Mover(**config)._run_move_files()
+        self.assertEqual(second.copied, 3)
+
+    def test_config_change_resets_index(self):
+        Mover(**self._config())._run_move_files()
+        config = self._config()
+        config["destination_directories"] = [os.path.join(self.temp_dir.name, "other")]
+        results = Mover(**config)._run_move_files()
+        self.assertEqual(results.copied, 3)
+
+class TestMoverJournal(MoverTestMixin, unittest.TestCase):
+    mover_name = "TestJournalMover"
+
+    def setUp(self):
+        super().setUp()
+        self.journal_file = os.path.join(self.temp_dir.name, "journal.jsonl")
+
+    def _base_config(self):
+        config = super()._base_config()
+        config["journal"] = {"enabled": True, "journal_file": self.journal_file, "batch_size": 2}
+        return config
+
+    def _write_begin(self, fname, remove_source=True):
+        source_path = os.path.join(self.source_dir, fname)
+        source_stat = os.stat(source_path)
+        with open(self.journal_file, "a") as f:
+            f.write(json.dumps({
+                "op": "begin",
+                "source": source_path,
+                "size": source_stat.st_size,
+                "mtime_ns": source_stat.st_mtime_ns,
+                "destinations": [os.path.join(self.dest_dir, fname)],
+                "collisions": [],
+                "remove_source": remove_source,
+            }) + "\n")
+
+    def test_requires_id_or_journal_file(self):
+        config = self._config()
+        config["journal"] = {"enabled": True}
+        with self.assertRaises(ValueError):
+            Mover(**config)
+
+    def test_completed_run_removes_journal(self):
+        results = Mover(**self._config())._run_move_files()
+        self.assertEqual(results.moved, 3)
+        self.assertFalse(os.path.exists(self.journal_file))
+
+    def test_failed_file_does_not_keep_finished_files_in_journal(self):
+        failing_path = os.path.join(self.source_dir, "a.txt")
+        def run():
+            mover = Mover(**self._config(keep_source_behavior="keep_source"))
+            execute_task = mover._execute_task
+            def failing_execute_task(task):
+                if task.source.path == failing_path:
+                    raise PermissionError(errno.EPERM, "Operation not permitted", failing_path)
+                return execute_task(task)
+            with mock.patch.object(mover, "_execute_task", side_effect=failing_execute_task):
+                return mover._run_move_files()
+        first = run()
+        self.assertEqual((first.copied, first.errors), (2, 1))
+        with open(self.journal_file) as f:
+            self.assertEqual([json.loads(line)["source"] for line in f], [failing_path])
+        # Finished files are processed again once their destinations are removed
+        os.remove(os.path.join(self.dest_dir, "b.txt"))
+        second = run()
+        self.assertEqual((second.copied, second.errors), (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "b.txt")))
+
+    def test_interrupted_run_keeps_journal_and_resumes(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source"))
+        original = mover._execute_task
+        def execute_task(task):
+            if task.source.name == "c.txt":
+                raise KeyboardInterrupt()
+            return original(task)
+        with mock.patch.object(mover, "_execute_task", side_effect=execute_task):
+            results = mover._run_move_files()
+        self.assertEqual(results.errors, 1)
+        self.assertTrue(os.path.exists(self.journal_file))
+
+        remaining = sorted(set(os.listdir(self.source_dir)) - set(os.listdir(self.dest_dir)))
+        self.assertIn("c.txt", remaining)
+
+        resumed_mover = Mover(**self._config(keep_source_behavior="keep_source"))
+        with mock.patch.object(resumed_mover._copy_backend, "copy", wraps=resumed_mover._copy_backend.copy) as copy:
+            resumed = resumed_mover._run_move_files()
+        # Only the files the interrupted run never finished are copied
+        self.assertEqual(sorted(call.args[0].name for call in copy.call_args_list), remaining)
+        self.assertEqual(resumed.copied, len(remaining))
+        self.assertEqual(resumed.errors, 0)
+        self.assertFalse(os.path.exists(self.journal_file))
+
+    def test_resume_finishes_pending_source_removal(self):
+        os.makedirs(self.dest_dir)
+        self._write_begin("a.txt")
+        source = os.path.join(self.source_dir, "a.txt")
+        destination = os.path.join(self.dest_dir, "a.txt")
+        shutil.copy2(source, destination)
+        mover = Mover(**self._config(keep_source_behavior="keep_source_if_any_collide"))
+        with mock.patch.object(mover._copy_backend, "copy") as copy, mock.patch.object(mover, "_rename_file") as rename:
+            results = mover._run_move_files()
+        self.assertNotIn("a.txt", [call.args[0].name for call in copy.call_args_list + rename.call_args_list])
+        self.assertEqual(results.deleted, 1)
+        self.assertFalse(os.path.exists(source))
+
+    def test_resume_overwrites_partially_written_destination(self):
+        os.makedirs(self.dest_dir)
+        self._write_begin("a.txt")
+        with open(os.path.join(self.dest_dir, "a.txt"), "w") as f:
+            f.write("cont")
+        results = Mover(**self._config(destination_collision_behavior="ignore"))._run_move_files()
+        self.assertEqual(results.moved, 3)
+        with open(os.path.join(self.dest_dir, "a.txt")) as f:
+            self.assertEqual(f.read(), "content of a.txt")
+
+
+class TestMoverRetry(MoverTestMixin, unittest.TestCase):
+    mover_name = "TestRetryMover"
+    source_files = ["a.txt", "b.txt", "c.txt", "d.txt"]
+
+    def _base_config(self):
+        config = super()._base_config()
+        config["retry"] = {"attempts": 3, "delay": 0.01}
+        return config
+
+    def _fail_file(self, mover, fname, errors):
+        """
+        Make the mover raise each of errors (in order) for one file before letting it through
+        """
+        original = mover._execute_task
+        errors = list(errors)
+        calls = []
+        def execute_task(task):
+            if task.source.name == fname:
+                calls.append(task)
+                if errors:
+                    raise errors.pop(0)
+            return original(task)
+        mover._execute_task = execute_task
+        return calls
+
+    def test_failed_file_does_not_stop_the_run(self):
+        mover = Mover(**self._config())
+        calls = self._fail_file(mover, "b.txt", [FileNotFoundError(errno.ENOENT, "No such file or directory")] * 3)
+        results = mover._run_move_files()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results.moved, 3)
+        self.assertEqual(results.errors, 1)
+        self.assertEqual([path for path, _ in results.failed_files], [os.path.join(self.source_dir, "b.txt")])
+        self.assertCountEqual(os.listdir(self.source_dir), ["b.txt"])
+
+    def _assert_retried(self, max_workers):
+        mover = Mover(**self._config(max_workers=max_workers))
+        calls = self._fail_file(mover, "a.txt", [OSError(errno.EBUSY, "Device or resource busy")])
+        results = mover._run_move_files()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(results.moved, 4)
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(os.listdir(self.source_dir), [])
+
+    def test_retryable_error_is_retried(self):
+        self._assert_retried(max_workers=1)
+
+    def test_retryable_error_is_retried_in_pool(self):
+        self._assert_retried(max_workers=2)
+
+    def test_gives_up_after_the_last_attempt(self):
+        mover = Mover(**self._config(retry={"attempts": 2, "delay": 0}))
+        calls = self._fail_file(mover, "c.txt", [OSError(errno.EBUSY, "Device or resource busy")] * 2)
+        results = mover._run_move_files()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(results.moved, 3)
+        self.assertEqual(len(results.failed_files), 1)
+
+    def test_destination_directory_is_created_once_per_run(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source"))
+        with mock.patch("filemover.mover.os.makedirs", wraps=os.makedirs) as makedirs:
+            results = mover._run_move_files()
+        self.assertEqual(results.copied, 4)
+        makedirs.assert_called_once_with(self.dest_dir, exist_ok=True)
+
+    def test_removed_destination_directory_is_recreated_on_retry(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source", destination_collision_behavior="overwrite", retry={"attempts": 2, "delay": 0, "retryable_errors": ["ENOENT"]}))
+        mover._run_move_files()
+        shutil.rmtree(self.dest_dir)
+        # Watch mode keeps the directory cache between batches of changed files
+        results = mover.process_files([os.path.join(self.source_dir, "a.txt")])
+        self.assertEqual(results.copied, 1)
+        self.assertEqual(results.errors, 0)
+        self.assertEqual(os.listdir(self.dest_dir), ["a.txt"])
+
+    def test_failed_file_is_not_a_collision_in_the_next_batch(self):
+        mover = Mover(**self._config(destination_collision_behavior="ignore"))
+        self._fail_file(mover, "a.txt", [OSError(errno.ENOSPC, "No space left on device")])
+        source_path = os.path.join(self.source_dir, "a.txt")
+        results = mover.process_files([source_path])
+        self.assertEqual(len(results.failed_files), 1)
+        results = mover.process_files([source_path])
+        self.assertEqual(results.moved, 1)
+        self.assertEqual(results.skipped, 0)
+        self.assertFalse(os.path.exists(source_path))
+        self.assertEqual(os.listdir(self.dest_dir), ["a.txt"])
+
+    def test_removed_destination_directory_is_listed_again(self):
+        mover = Mover(**self._config(keep_source_behavior="keep_source", destination_collision_behavior="ignore", retry={"attempts": 2, "delay": 0, "retryable_errors": ["ENOENT"]}))
+        mover._run_move_files()
+        shutil.rmtree(self.dest_dir)
+        new_path = os.path.join(self.source_dir, "e.txt")
+        with open(new_path, "w") as f:
+            f.write("content of e.txt")
+        # Writing the new file fails and is retried, which finds the directory was removed
+        results = mover.process_files([new_path])
+        self.assertEqual(results.copied, 1)
+        # The files listed in the removed directory are no longer collisions
+        results = mover.process_files([os.path.join(self.source_dir, "a.txt")])
+        self.assertEqual(results.copied, 1)
+        self.assertCountEqual(os.listdir(self.dest_dir), ["a.txt", "e.txt"])
+
+    def test_retry_config_validation(self):
+        with self.assertRaises(ValueError):
+            RetryConfig(retryable_errors=["NOT_AN_ERROR"])
+        with self.assertRaises(ValueError):
+            RetryConfig(attempts=0)
+        config = RetryConfig(delay=1, backoff=2, max_delay=3)
+        self.assertEqual([config.get_delay(attempt) for attempt in [1, 2, 3]], [1, 2, 3])
+        self.assertTrue(config.is_retryable(PermissionError(errno.EACCES, "Permission denied")))
+        self.assertFalse(config.is_retryable(ValueError("bad value")))
@@ -0,0 +1,96 @@
+import unittest
+from unittest import mock
+from filemover import MoverGroup
+from tests.mover_test_mixin import MoverTestMixin
+import threading
+import os
+
+class TestMoverGroup(MoverTestMixin, unittest.TestCase):
+    # Each grouped mover gets its own source directory, so the shared one stays empty
+    source_files = []
+
+    def setUp(self):
+        super().setUp()
+        self.source_dirs = []
+        self.dest_dirs = []
+        for index in range(3):
+            source_dir = os.path.join(self.temp_dir.name, f"src{index}")
+            os.makedirs(source_dir)
+            for fname in ["a.txt", "b.txt"]:
+                with open(os.path.join(source_dir, fname), "w") as f:
+                    f.write(f"{index} {fname}")
+            self.source_dirs.append(source_dir)
+            self.dest_dirs.append(os.path.join(self.temp_dir.name, f"dst{index}"))
+
+    def _base_config(self):
+        return {
+            "group_name": "TestGroup",
+            "movers": [
+                {
+                    "mover_name": f"TestMover{index}",
+                    "source_directories": [self.source_dirs[index]],
+                    "destination_directories": [self.dest_dirs[index]],
+                }
+                for index in range(3)
+            ],
+            "verbose": False,
+        }
+
+    def test_requires_movers(self):
+        with self.assertRaises(ValueError):
+            MoverGroup(movers=[], verbose=False)
+        with self.assertRaises(TypeError):
+            MoverGroup(movers=["mover.json"], verbose=False)
+
+    def test_invalid_limits_raise(self):
+        with self.assertRaises(ValueError):
+            MoverGroup(**self._config(max_workers=0))
+        with self.assertRaises(ValueError):
+            MoverGroup(**self._config(max_movers_per_device=0))
+
+    def test_runs_every_mover_and_aggregates_results(self):
+        group = MoverGroup(**self._config(max_workers=3, max_movers_per_device=None))
+        results = group.run()
+        self.assertEqual(results.executions, 3)
+        self.assertEqual(results.moved, 6)
+        self.assertEqual(results.errors, 0)
+        for dest_dir in self.dest_dirs:
+            self.assertCountEqual(os.listdir(dest_dir), ["a.txt", "b.txt"])
+
+    def test_failed_mover_is_counted_and_others_still_run(self):
+        group = MoverGroup(**self._config(max_movers_per_device=None))
+        with mock.patch.object(group.movers[1], "move_files", side_effect=RuntimeError("boom")):
+            results = group.run()
+        self.assertEqual(results.errors, 1)
+        self.assertEqual(results.moved, 4)
+
+    def test_interrupt_is_not_counted_as_a_failed_mover(self):
+        group = MoverGroup(**self._config(max_movers_per_device=None))
+        with mock.patch.object(group.movers[0], "move_files", side_effect=KeyboardInterrupt), \
+                mock.patch.object(group, "_log_results") as log_results:
+            with self.assertRaises(KeyboardInterrupt):
+                group.run()
+        log_results.assert_not_called()
+
+    def test_movers_on_the_same_device_take_turns(self):
+        group = MoverGroup(**self._config(max_workers=3, max_movers_per_device=1))
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+        for mover in group.movers:
+            original = mover.move_files
+            def move_files(original=original):
+                nonlocal running, max_running
+                with lock:
+                    running += 1
+                    max_running = max(max_running, running)
+                try:
+                    return original()
+                finally:
+                    with lock:
+                        running -= 1
+            mover.move_files = move_files
+        results = group.run()
+        self.assertEqual(results.moved, 6)
+        # Every directory is inside the same temporary directory, so on the same device
+        self.assertEqual(max_running, 1)
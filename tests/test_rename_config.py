@@ -1,6 +1,10 @@
 import unittest
+from unittest import mock
 import pytz
-from filemover.rename_config import RenameConfig, RenameRule, AddTimestampConfig, TimestampPosition
+from filemover.rename_config import RenameConfig, RenameRule, AddTimestampConfig, TimestampPosition, TimestampSource
+from filemover.scanner import ScannedFile
+import tempfile
+import os
 
 class TestRenameConfig(unittest.TestCase):
     def test_rename_rule_repr(self):
@@ -61,6 +65,36 @@ class TestRenameConfig(unittest.TestCase):
         self.assertIsInstance(timestamp, str)
         self.assertRegex(timestamp, r'^\d{8}_\d{6}$')
 
+    def test_timestamp_source_from_string_invalid(self):
+        with self.assertRaises(ValueError):
+            TimestampSource.from_string('birthday')
+
+    def test_add_timestamp_config_file_mtime_source(self):
+        cfg = AddTimestampConfig(enabled=True, source='file_mtime', timezone='UTC', format='%Y-%m-%d')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "file.txt")
+            open(path, "w").close()
+            os.utime(path, (1_000_000_000, 1_000_000_000))
+            self.assertEqual(cfg.get_timestamp(ScannedFile.from_path(path)), "2001-09-09")
+        with self.assertRaises(ValueError):
+            cfg.get_timestamp()
+
+    def test_add_timestamp_config_refresh_run_start(self):
+        cfg = AddTimestampConfig(enabled=True, timezone='UTC')
+        with mock.patch("filemover.rename_config.time.time", return_value=0.5):
+            cfg.refresh_timestamp()
+        self.assertEqual(cfg.get_timestamp(), "1970-01-01_00-00-00")
+
+    def test_add_timestamp_config_caches_formatting_per_second(self):
+        cfg = AddTimestampConfig(enabled=True, source='now', timezone='UTC')
+        with mock.patch("filemover.rename_config.time.time", side_effect=[100.1, 100.7, 101.2]):
+            timestamps = [cfg.get_timestamp() for _ in range(3)]
+        self.assertEqual(timestamps, ["1970-01-01_00-01-40", "1970-01-01_00-01-40", "1970-01-01_00-01-41"])
+        self.assertEqual(cfg._format_second.cache_info().hits, 1)
+        # Microseconds differ within a second, so they're formatted every time
+        cfg = AddTimestampConfig(enabled=True, source='now', timezone='UTC', format='%S.%f')
+        self.assertEqual(cfg.format_time(1.25), "01.250000")
+
     def test_rename_config_defaults(self):
         cfg = RenameConfig()
         self.assertFalse(cfg.enabled)
@@ -87,6 +121,20 @@ class TestRenameConfig(unittest.TestCase):
         )
         self.assertEqual(cfg.apply_rename("FOO.txt"), "bar.txt")
 
+    def test_rename_config_apply_rename_replace_case_insensitive_keeps_case(self):
+        cfg = RenameConfig(
+            enabled=True,
+            replace=[{"search": "draft", "replace": "Final"}, {"search": "\\", "replace": "\\1"}],
+            case_sensitive=False
+        )
+        self.assertEqual(cfg.apply_rename("Report_DRAFT_v2.PDF"), "Report_Final_v2.PDF")
+        self.assertEqual(cfg.apply_rename("a\\b.txt"), "a\\1b.txt")
+
+    def test_rename_config_compile_is_cached(self):
+        cfg = RenameConfig(enabled=True, prefix="PRE_")
+        self.assertIs(cfg.compile(), cfg.compile())
+        self.assertEqual(cfg.compile()("file.txt"), "PRE_file.txt")
+
     def test_rename_config_apply_rename_replace_case_sensitive(self):
         cfg = RenameConfig(
             enabled=True,
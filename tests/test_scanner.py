@@ -0,0 +1,57 @@
+import unittest
+from filemover.scanner import ScannedFile, scan_directory
+import tempfile
+import pickle
+import os
+
+class TestScanDirectory(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.sub_dir = os.path.join(self.root, "sub")
+        os.makedirs(self.sub_dir)
+        for path in [os.path.join(self.root, "a.txt"), os.path.join(self.root, "b.csv"), os.path.join(self.sub_dir, "c.txt")]:
+            with open(path, "w") as f:
+                f.write("test")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_non_recursive_yields_only_top_level_files(self):
+        names = [scanned.name for scanned in scan_directory(self.root)]
+        self.assertCountEqual(names, ["a.txt", "b.csv"])
+
+    def test_recursive_yields_nested_files(self):
+        paths = [scanned.path for scanned in scan_directory(self.root, recursive=True)]
+        self.assertCountEqual(paths, [
+            os.path.join(self.root, "a.txt"),
+            os.path.join(self.root, "b.csv"),
+            os.path.join(self.sub_dir, "c.txt"),
+        ])
+
+    def test_missing_directory_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            list(scan_directory(os.path.join(self.root, "missing")))
+
+    def test_scanned_file_caches_stat(self):
+        scanned = next(iter(scan_directory(self.sub_dir)))
+        self.assertTrue(scanned.is_file)
+        self.assertEqual(scanned.size, 4)
+        self.assertIs(scanned.stat, scanned.stat)
+        self.assertEqual(os.fspath(scanned), os.path.join(self.sub_dir, "c.txt"))
+
+    def test_scanned_file_can_be_pickled(self):
+        scanned = next(iter(scan_directory(self.sub_dir)))
+        restored = pickle.loads(pickle.dumps(scanned))
+        self.assertEqual(restored.path, scanned.path)
+        self.assertEqual(restored.stat, scanned.stat)
+        self.assertIsNone(restored.entry)
+
+    def test_from_path(self):
+        path = os.path.join(self.root, "a.txt")
+        scanned = ScannedFile.from_path(path)
+        self.assertEqual(scanned.name, "a.txt")
+        self.assertEqual(scanned.size, 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+from filemover import Mover
+from filemover.scanner import ScannedFile
+from filemover.settle import SettleConfig, SettleChecker, get_files_open_for_writing
+from tests.mover_test_mixin import MoverTestMixin
+import subprocess
+import tempfile
+import time
+import sys
+import os
+
+class TestSettleChecker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "file.txt")
+        with open(self.path, "w") as f:
+            f.write("contents")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _checker(self, **config):
+        return SettleChecker(SettleConfig(enabled=True, check_open_files=False, **config))
+
+    def test_recently_modified_file_is_not_settled(self):
+        checker = self._checker(window=10)
+        delay = checker.check(ScannedFile.from_path(self.path))
+        self.assertGreater(delay, 9)
+        os.utime(self.path, (time.time() - 60, time.time() - 60))
+        self.assertEqual(checker.check(ScannedFile.from_path(self.path)), 0)
+
+    def test_unchanged_file_with_future_mtime_settles(self):
+        future = time.time() + 3600
+        os.utime(self.path, (future, future))
+        checker = self._checker(window=1)
+        scanned = ScannedFile.from_path(self.path)
+        observation = checker.observe(scanned)
+        self.assertGreater(checker.check(scanned, observation), 0)
+        # The same size and mtime seen a whole window ago
+        self.assertEqual(checker.check(scanned, (*observation[:2], time.monotonic() - 2)), 0)
+        with open(self.path, "a") as f:
+            f.write("more")
+        os.utime(self.path, (future + 1, future + 1))
+        changed = ScannedFile.from_path(self.path)
+        self.assertGreater(checker.check(changed, (*observation[:2], time.monotonic() - 2)), 0)
+
+    def test_invalid_config(self):
+        with self.assertRaises(ValueError):
+            SettleConfig(window=-1)
+        with self.assertRaises(TypeError):
+            SettleConfig(check_open_files="yes")
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fdinfo"), "Open file detection needs /proc")
+    def test_detects_files_open_for_writing(self):
+        writer = subprocess.Popen(
+            [sys.executable, "-c", "import sys, time; f = open(sys.argv[1], 'a'); print('ready', flush=True); time.sleep(30)", self.path],
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            writer.stdout.readline()
+            file_stat = os.stat(self.path)
+            self.assertIn((file_stat.st_dev, file_stat.st_ino), get_files_open_for_writing())
+        finally:
+            writer.kill()
+            writer.wait()
+            writer.stdout.close()
+
+class TestMoverSettle(MoverTestMixin, unittest.TestCase):
+    mover_name = "TestSettleMover"
+
+    def setUp(self):
+        super().setUp()
+        old = time.time() - 60
+        for fname in self.source_files:
+            os.utime(os.path.join(self.source_dir, fname), (old, old))
+        # b.txt is still being written
+        os.utime(os.path.join(self.source_dir, "b.txt"))
+
+    def _config(self, **settle):
+        return super()._config(settle={"enabled": True, "window": 0.3, "check_open_files": False, **settle})
+
+    def test_unsettled_file_is_deferred_without_blocking_others(self):
+        mover = Mover(**self._config())
+        with mock.patch.object(mover, "_execute_task", wraps=mover._execute_task) as execute:
+            results = mover._run_move_files()
+        self.assertEqual([call.args[0].source.name for call in execute.call_args_list][-1], "b.txt")
+        self.assertEqual(results.deferred, 1)
+        self.assertEqual(results.moved, 3)
+        self.assertEqual(os.listdir(self.source_dir), [])
+
+    def test_file_still_changing_after_max_wait_is_skipped(self):
+        results = Mover(**self._config(window=60, max_wait=0))._run_move_files()
+        self.assertEqual(results.deferred, 1)
+        self.assertEqual(results.skipped, 1)
+        self.assertEqual(results.moved, 2)
+        self.assertEqual(os.listdir(self.source_dir), ["b.txt"])
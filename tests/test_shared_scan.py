@@ -0,0 +1,157 @@
+import unittest
+from unittest import mock
+from filemover import Mover, MoverGroup
+from filemover.shared_scan import SharedScanCoordinator, group_movers_by_source
+from filemover import scanner
+from tests.mover_test_mixin import MoverTestMixin
+import tempfile
+import errno
+import os
+
+def extension_rule(extension):
+    return {
+        "enabled": True,
+        "operator": "and",
+        "rules": [{"type": "file_type", "mode": "single_exact", "value": extension}],
+    }
+
+class TestGroupMoversBySource(unittest.TestCase):
+    def _mover(self, name, sources):
+        return Mover(mover_name=name, source_directories=sources, destination_directories=["dst"], verbose=False)
+
+    def test_groups_movers_sharing_sources(self):
+        a = self._mover("a", ["one"])
+        b = self._mover("b", ["two"])
+        c = self._mover("c", ["one", "three"])
+        d = self._mover("d", ["three"])
+        groups = group_movers_by_source([a, b, c, d])
+        self.assertEqual(groups, [[a, c, d], [b]])
+
+    def test_merges_groups_joined_by_a_later_mover(self):
+        a = self._mover("a", ["one"])
+        b = self._mover("b", ["two"])
+        c = self._mover("c", ["two", "one"])
+        self.assertEqual(group_movers_by_source([a, b, c]), [[a, b, c]])
+
+class TestSharedScanCoordinator(MoverTestMixin, unittest.TestCase):
+    source_files = ["a.txt", "b.csv", "c.log", os.path.join("sub", "d.txt")]
+
+    def _mover(self, name, extension, **overrides):
+        config = self._config(
+            mover_name=name,
+            destination_directories=[os.path.join(self.temp_dir.name, name)],
+            match_files=extension_rule(extension),
+        )
+        config.update(overrides)
+        return Mover(**config)
+
+    def _listdir(self, name):
+        path = os.path.join(self.temp_dir.name, name)
+        return os.listdir(path) if os.path.exists(path) else []
+
+    def test_scans_each_source_once_and_dispatches_by_rules(self):
+        movers = [self._mover("text", "txt"), self._mover("csv", "csv")]
+        with mock.patch("filemover.shared_scan.scan_directory", wraps=scanner.scan_directory) as scan:
+            results = SharedScanCoordinator(movers).run()
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(results[movers[0]].moved, 1)
+        self.assertEqual(results[movers[1]].moved, 1)
+        self.assertCountEqual(self._listdir("text"), ["a.txt"])
+        self.assertCountEqual(self._listdir("csv"), ["b.csv"])
+        self.assertCountEqual(os.listdir(self.source_dir), ["c.log", "sub"])
+
+    def test_recursive_files_only_go_to_recursive_movers(self):
+        movers = [self._mover("flat", "txt", keep_source_behavior="keep_source"), self._mover("deep", "txt", keep_source_behavior="keep_source", recursive=True)]
+        SharedScanCoordinator(movers).run()
+        self.assertCountEqual(self._listdir("flat"), ["a.txt"])
+        self.assertCountEqual(self._listdir("deep"), ["a.txt", "d.txt"])
+
+    def test_first_moving_mover_claims_file_and_copies_run_first(self):
+        movers = [
+            self._mover("first", "txt"),
+            self._mover("second", "txt"),
+            self._mover("copy", "txt", keep_source_behavior="keep_source"),
+        ]
+        results = SharedScanCoordinator(movers, max_workers=2).run()
+        self.assertEqual(results[movers[0]].moved, 1)
+        self.assertEqual(results[movers[1]].moved, 0)
+        self.assertEqual(results[movers[2]].copied, 1)
+        self.assertCountEqual(self._listdir("first"), ["a.txt"])
+        self.assertCountEqual(self._listdir("second"), [])
+        self.assertCountEqual(self._listdir("copy"), ["a.txt"])
+        self.assertFalse(os.path.exists(os.path.join(self.source_dir, "a.txt")))
+
+    def _fail_copies(self, mover, failures):
+        execute_task = mover._execute_task
+        def failing_execute_task(task):
+            if failures:
+                failures.pop()
+                raise OSError(errno.EBUSY, "Device or resource busy", task.source.path)
+            return execute_task(task)
+        return mock.patch.object(mover, "_execute_task", side_effect=failing_execute_task)
+
+    def test_failed_copy_keeps_source_for_copying_mover(self):
+        movers = [self._mover("move", "txt"), self._mover("copy", "txt", keep_source_behavior="keep_source", retry={"attempts": 1})]
+        with self._fail_copies(movers[1], [True]):
+            results = SharedScanCoordinator(movers, max_workers=1).run()
+        self.assertEqual(results[movers[1]].errors, 1)
+        self.assertEqual(results[movers[0]].moved, 0)
+        self.assertEqual(results[movers[0]].skipped, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "a.txt")))
+
+    def test_source_is_moved_once_failed_copy_is_retried(self):
+        for max_workers in [1, 2]:
+            with self.subTest(max_workers=max_workers):
+                with open(os.path.join(self.source_dir, "a.txt"), "w") as f:
+                    f.write("a.txt")
+                movers = [self._mover(f"move{max_workers}", "txt"), self._mover(f"copy{max_workers}", "txt", keep_source_behavior="keep_source", retry={"attempts": 3, "delay": 0.01})]
+                with self._fail_copies(movers[1], [True]):
+                    results = SharedScanCoordinator(movers, max_workers=max_workers).run()
+                self.assertEqual(results[movers[1]].errors, 0)
+                self.assertEqual(results[movers[1]].copied, 1)
+                self.assertEqual(results[movers[0]].moved, 1)
+                self.assertCountEqual(self._listdir(f"copy{max_workers}"), ["a.txt"])
+                self.assertFalse(os.path.exists(os.path.join(self.source_dir, "a.txt")))
+
+    def test_interrupt_stops_the_scan(self):
+        for max_workers in [1, 2]:
+            with self.subTest(max_workers=max_workers):
+                mover = self._mover("text", "txt", keep_source_behavior="keep_source", recursive=True)
+                with mock.patch.object(mover, "_execute_task", side_effect=KeyboardInterrupt) as execute_task, \
+                        mock.patch.object(mover, "_finish_run") as finish_run:
+                    with self.assertRaises(KeyboardInterrupt):
+                        SharedScanCoordinator([mover], max_workers=max_workers).run()
+                finish_run.assert_called_once()
+                if max_workers == 1:
+                    self.assertEqual(execute_task.call_count, 1)
+
+class TestMoverGroupSharedScan(unittest.TestCase):
+    def test_shared_scan_rejects_settle_and_journal(self):
+        with tempfile.TemporaryDirectory() as root:
+            for option in [{"settle": {"enabled": True}}, {"journal": {"enabled": True, "journal_file": os.path.join(root, "journal.jsonl")}}]:
+                with self.subTest(option=option):
+                    mover_config = {"mover_name": "mover", "source_directory": root, "destination_directory": os.path.join(root, "dst"), **option}
+                    with self.assertRaises(ValueError):
+                        MoverGroup(shared_scan=True, verbose=False, movers=[mover_config])
+                    MoverGroup(verbose=False, movers=[mover_config])
+
+    def test_shared_scan_runs_movers_sharing_sources_together(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_dir = os.path.join(root, "src")
+            os.makedirs(source_dir)
+            for name in ["a.txt", "b.csv"]:
+                with open(os.path.join(source_dir, name), "w") as f:
+                    f.write(name)
+            group = MoverGroup(
+                shared_scan=True,
+                verbose=False,
+                movers=[
+                    {"mover_name": "text", "source_directory": source_dir, "destination_directory": os.path.join(root, "text"), "match_files": extension_rule("txt")},
+                    {"mover_name": "csv", "source_directory": source_dir, "destination_directory": os.path.join(root, "csv"), "match_files": extension_rule("csv")},
+                ],
+            )
+            with mock.patch("filemover.shared_scan.scan_directory", wraps=scanner.scan_directory) as scan:
+                results = group.run()
+            self.assertEqual(scan.call_count, 1)
+            self.assertEqual(results.moved, 2)
+            self.assertEqual(results.executions, 2)
@@ -0,0 +1,86 @@
+import unittest
+from filemover.watcher import PollingWatcher, InotifyWatcher, create_watcher
+import tempfile
+import sys
+import os
+
+def write_file(path, content="test"):
+    with open(path, "w") as f:
+        f.write(content)
+
+class TestPollingWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        write_file(os.path.join(self.root, "existing.txt"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_existing_files_are_not_reported(self):
+        with PollingWatcher([self.root], poll_interval=0) as watcher:
+            self.assertEqual(watcher.wait_for_changes(timeout=0), set())
+
+    def test_reports_new_and_modified_files(self):
+        with PollingWatcher([self.root], poll_interval=0) as watcher:
+            new_path = os.path.join(self.root, "new.txt")
+            write_file(new_path)
+            write_file(os.path.join(self.root, "existing.txt"), "changed")
+            self.assertEqual(watcher.wait_for_changes(timeout=0), {new_path, os.path.join(self.root, "existing.txt")})
+            self.assertEqual(watcher.wait_for_changes(timeout=0), set())
+
+    def test_recursive_reports_nested_files(self):
+        with PollingWatcher([self.root], recursive=True, poll_interval=0) as watcher:
+            os.makedirs(os.path.join(self.root, "sub"))
+            nested_path = os.path.join(self.root, "sub", "nested.txt")
+            write_file(nested_path)
+            self.assertEqual(watcher.wait_for_changes(timeout=0), {nested_path})
+
+    def test_waits_for_poll_interval(self):
+        with PollingWatcher([self.root], poll_interval=60) as watcher:
+            write_file(os.path.join(self.root, "new.txt"))
+            self.assertEqual(watcher.wait_for_changes(timeout=0.01), set())
+
+@unittest.skipUnless(sys.platform.startswith('linux'), "inotify is only available on Linux")
+class TestInotifyWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_reports_closed_files(self):
+        with InotifyWatcher([self.root]) as watcher:
+            path = os.path.join(self.root, "new.txt")
+            write_file(path)
+            self.assertEqual(watcher.wait_for_changes(timeout=1), {path})
+            self.assertEqual(watcher.wait_for_changes(timeout=0), set())
+
+    def test_reports_files_moved_in(self):
+        with tempfile.TemporaryDirectory() as other_dir:
+            staged_path = os.path.join(other_dir, "staged.txt")
+            write_file(staged_path)
+            with InotifyWatcher([self.root]) as watcher:
+                path = os.path.join(self.root, "staged.txt")
+                os.rename(staged_path, path)
+                self.assertEqual(watcher.wait_for_changes(timeout=1), {path})
+
+    def test_recursive_watches_new_subdirectories(self):
+        with InotifyWatcher([self.root], recursive=True) as watcher:
+            sub_dir = os.path.join(self.root, "sub")
+            os.makedirs(sub_dir)
+            watcher.wait_for_changes(timeout=1)
+            path = os.path.join(sub_dir, "nested.txt")
+            write_file(path)
+            self.assertEqual(watcher.wait_for_changes(timeout=1), {path})
+
+    def test_missing_directory_raises(self):
+        with self.assertRaises(OSError):
+            InotifyWatcher([os.path.join(self.root, "missing")])
+
+class TestCreateWatcher(unittest.TestCase):
+    def test_force_polling(self):
+        with tempfile.TemporaryDirectory() as root:
+            with create_watcher([root], force_polling=True) as watcher:
+                self.assertIsInstance(watcher, PollingWatcher)